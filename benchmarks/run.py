@@ -0,0 +1,325 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.server import BackgroundServer, StandInServer
+
+
+@dataclass
+class Run:
+    seconds: float
+    exit_code: int
+    peak_memory_kb: int
+
+
+@dataclass
+class Environment:
+    """
+    An isolated app dir with a config pointing to the stand-in server, in which the CLI runs.
+    """
+
+    directory: Path
+    env: Dict[str, str]
+
+    @classmethod
+    def create(cls, directory: Path, url: str, private_key_path: Optional[Path]) -> "Environment":
+        env: Dict[str, str] = {
+            **os.environ,
+            "HOME": str(directory),
+            "XDG_CONFIG_HOME": str(directory / "config"),
+            # Make sure no running agent serves the commands.
+            "OMMNIA_SSO_AGENT_SOCK": str(directory / "agent.sock"),
+        }
+
+        # Generate a throwaway key, the stand-in server does not verify the signatures.
+        if private_key_path is None:
+            private_key_path = directory / "client_private_key.pem"
+            private_key_path.write_bytes(_generate_private_key())
+
+        # Write the config with the repository itself, so it ends up where the CLI looks for it.
+        os.environ.update({key: env[key] for key in ["HOME", "XDG_CONFIG_HOME"]})
+        from ommnia_sso_cli.data.models import AuthConfigModel, ConfigModel
+        from ommnia_sso_cli.data.repositories.config_repository import ConfigRepository
+        from ommnia_sso_cli.shared import APP_NAME
+
+        ConfigRepository(APP_NAME).save(
+            ConfigModel(
+                app_name="benchmarks",
+                graphql_endpoint_url=url,
+                client_private_key_path=str(private_key_path),
+                server_public_key_path=str(private_key_path),
+                auth=AuthConfigModel(email="benchmarks@example.com", password="benchmarks"),
+            )
+        )
+
+        return cls(directory=directory, env=env)
+
+    def run(self, *args: str) -> Run:
+        """
+        Run the CLI in a fresh process, measuring its wall time and peak memory.
+        """
+
+        with tempfile.TemporaryFile() as stderr:
+            start: float = time.perf_counter()
+            process = subprocess.Popen(
+                [sys.executable, "-m", "ommnia_sso_cli.main", *args],
+                env=self.env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+            )
+            _, status, usage = os.wait4(process.pid, 0)
+            seconds: float = time.perf_counter() - start
+            process.returncode = os.waitstatus_to_exitcode(status)
+
+            if process.returncode not in [0, 1]:
+                stderr.seek(0)
+                sys.stderr.write(stderr.read().decode(errors="replace"))
+
+        # The maximum resident set size is in kilobytes on Linux, but in bytes on macOS.
+        peak_memory_kb: int = usage.ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+        return Run(seconds=seconds, exit_code=process.returncode, peak_memory_kb=peak_memory_kb)
+
+
+def _generate_private_key() -> bytes:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+def _latencies(runs: List[Run]) -> Dict[str, float]:
+    seconds: List[float] = sorted(run.seconds for run in runs)
+    return {
+        "mean_ms": statistics.fmean(seconds) * 1000,
+        "p50_ms": seconds[len(seconds) // 2] * 1000,
+        "p95_ms": seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))] * 1000,
+        "max_ms": seconds[-1] * 1000,
+        "peak_memory_kb": max(run.peak_memory_kb for run in runs),
+        "failures": sum(1 for run in runs if run.exit_code != 0),
+    }
+
+
+def cli_latency(environment: Environment, server: StandInServer, repeat: int) -> Dict[str, Any]:
+    # Log in once, so that the runs reuse the cached bearer token.
+    environment.run("users", "create-regular", "warmup", "warmup@example.com", "secret")
+
+    runs: List[Run] = [
+        environment.run(
+            "users", "create-regular", f"user{index}", f"latency{index}@example.com", "secret"
+        )
+        for index in range(repeat)
+    ]
+    return {"scenario": "cli_latency", "parameters": {"repeat": repeat}, **_latencies(runs)}
+
+
+def login_overhead(
+    environment: Environment, server: StandInServer, repeat: int
+) -> Dict[str, Any]:
+    cold: List[Run] = []
+    warm: List[Run] = []
+    for index in range(repeat):
+        # Time the same command without and with a cached bearer token.
+        environment.run("login", "logout")
+        cold.append(
+            environment.run(
+                "users", "create-regular", "cold", f"cold{index}@example.com", "secret"
+            )
+        )
+        warm.append(
+            environment.run(
+                "users", "create-regular", "warm", f"warm{index}@example.com", "secret"
+            )
+        )
+
+    cold_latencies: Dict[str, float] = _latencies(cold)
+    warm_latencies: Dict[str, float] = _latencies(warm)
+    return {
+        "scenario": "login_overhead",
+        "parameters": {"repeat": repeat},
+        "cold_mean_ms": cold_latencies["mean_ms"],
+        "warm_mean_ms": warm_latencies["mean_ms"],
+        "overhead_ms": cold_latencies["mean_ms"] - warm_latencies["mean_ms"],
+        "failures": cold_latencies["failures"] + warm_latencies["failures"],
+    }
+
+
+def _write_users_file(path: Path, rows: int) -> None:
+    with path.open("w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "email", "password", "permissions", "groups"])
+        for index in range(rows):
+            writer.writerow([f"User {index}", f"user{index}@example.com", "secret", "", ""])
+
+
+def import_throughput(
+    environment: Environment, server: StandInServer, rows: int, concurrency: int, batch_size: int
+) -> Dict[str, Any]:
+    users_file_path: Path = environment.directory / f"users-{rows}.csv"
+    if not users_file_path.exists():
+        _write_users_file(users_file_path, rows)
+
+    # Start from an empty server, so that every row is created.
+    server.reset()
+    run: Run = environment.run(
+        "users",
+        "import",
+        str(users_file_path),
+        "--report",
+        os.devnull,
+        "--concurrency",
+        str(concurrency),
+        "--batch-size",
+        str(batch_size),
+    )
+    return {
+        "scenario": "import_throughput",
+        "parameters": {"rows": rows, "concurrency": concurrency, "batch_size": batch_size},
+        "seconds": run.seconds,
+        "rows_per_second": rows / run.seconds,
+        "requests": server.stats["requests"],
+        "request_bytes": server.stats["request_bytes"],
+        "transient_failures": server.stats["failures"],
+        "throttled": server.stats["throttled"],
+        "peak_memory_kb": run.peak_memory_kb,
+        "exit_code": run.exit_code,
+    }
+
+
+def _version() -> Dict[str, Optional[str]]:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        package_version: Optional[str] = version("ommnia-sso-cli")
+    except PackageNotFoundError:
+        package_version = None
+
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {"version": package_version, "commit": commit}
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, str]:
+    return result["scenario"], json.dumps(result["parameters"], sort_keys=True)
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> None:
+    """
+    Print the change of every metric against the baseline results with the same parameters.
+    """
+
+    baseline_results: Dict[Tuple[str, str], Dict[str, Any]] = {
+        _key(result): result for result in baseline
+    }
+    for result in results:
+        previous: Optional[Dict[str, Any]] = baseline_results.get(_key(result))
+        if previous is None:
+            continue
+
+        print(f"{result['scenario']} {result['parameters']}", file=sys.stderr)
+        for metric, value in result.items():
+            if isinstance(value, float) and previous.get(metric):
+                change: float = (value - previous[metric]) / previous[metric] * 100
+                print(
+                    f"  {metric}: {previous[metric]:.1f} -> {value:.1f} ({change:+.1f}%)",
+                    file=sys.stderr,
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the CLI against an in-process stand-in SSO server."
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--compare", type=Path, help="Earlier results to compare against.")
+    parser.add_argument("--private-key", type=Path, help="A client private key to sign with.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds per request.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of 503s.")
+    parser.add_argument("--capacity", type=int, default=0, help="Requests in flight before 429s.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per latency scenario.")
+    parser.add_argument("--rows", type=int, default=2000, help="Users per import.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 10, 50])
+    arguments = parser.parse_args()
+
+    server: StandInServer = StandInServer(
+        latency=arguments.latency,
+        jitter=arguments.jitter,
+        failure_rate=arguments.failure_rate,
+        capacity=arguments.capacity,
+        seed=arguments.seed,
+    )
+
+    results: List[Dict[str, Any]] = []
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        BackgroundServer(server) as background_server,
+    ):
+        environment: Environment = Environment.create(
+            Path(directory), background_server.url, arguments.private_key
+        )
+
+        # Run the scenarios, printing the results as they come in.
+        scenarios = [
+            lambda: cli_latency(environment, server, arguments.repeat),
+            lambda: login_overhead(environment, server, arguments.repeat),
+            *(
+                lambda concurrency=concurrency, batch_size=batch_size: import_throughput(
+                    environment, server, arguments.rows, concurrency, batch_size
+                )
+                for concurrency in arguments.concurrency
+                for batch_size in arguments.batch_size
+            ),
+        ]
+        for scenario in scenarios:
+            result: Dict[str, Any] = scenario()
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+
+    arguments.output.write_text(
+        json.dumps(
+            {
+                **_version(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "server": {
+                    "latency": arguments.latency,
+                    "jitter": arguments.jitter,
+                    "failure_rate": arguments.failure_rate,
+                    "capacity": arguments.capacity,
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+    if arguments.compare is not None:
+        compare(results, json.loads(arguments.compare.read_text())["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from aiohttp import web
+from graphql import DocumentNode, FieldNode, OperationDefinitionNode, VariableNode, parse
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+
+
+@lru_cache(maxsize=None)
+def _parse(query: str) -> DocumentNode:
+    return parse(query)
+
+
+def _bearer_token(lifetime: int) -> str:
+    # An unsigned JWT, the CLI only reads its expiry claim.
+    def encode(value: Dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'none'})}.{encode({'exp': int(time.time()) + lifetime})}."
+
+
+def _bearer_token_expired(authorization: Optional[str]) -> bool:
+    # Only the tokens given by the stand-in are checked, a missing one is let through.
+    if not authorization or not authorization.startswith("Bearer "):
+        return False
+
+    try:
+        payload: str = authorization.removeprefix("Bearer ").split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return int(claims["exp"]) <= time.time()
+    except (IndexError, KeyError, TypeError, ValueError):
+        return False
+
+
+# The operations that are answered without a valid bearer token.
+LOGIN_FIELDS: List[str] = ["createLoginSession", "regularLogin"]
+
+
+def _errors_response(message: str, code: str, status: int = 200) -> web.Response:
+    return web.json_response(
+        {"errors": [{"message": message, "extensions": {"code": code}}]}, status=status
+    )
+
+
+@dataclass
+class StandInServer:
+    """
+    An in-process stand-in for the SSO GraphQL API, implementing `createLoginSession`,
+    `regularLogin`, `createUser`, `createGroup` (aliased batches included) and `deleteGroup`,
+    and the cursor-paginated `users` and `groups` queries in memory.
+
+    Every request waits `latency` seconds (plus up to `jitter` more), and fails with a 503 with
+    probability `failure_rate`. With a `capacity`, the requests beyond that many in flight are
+    throttled with a 429. The bearer tokens given at login expire after `token_lifetime`
+    seconds, after which the requests sent with them are rejected with a 401.
+
+    Operations can be sent as the SHA-256 hash of their text (automatic persisted queries),
+    unless `persisted_queries` is off: the text is asked for the first time a hash is seen.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    capacity: int = 0
+    token_lifetime: int = 900
+    persisted_queries: bool = True
+    seed: Optional[int] = None
+
+    users: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    groups: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # The texts of the persisted queries, by their hash.
+    queries: Dict[str, str] = field(default_factory=dict)
+    stats: Dict[str, int] = field(
+        default_factory=lambda: {
+            "requests": 0,
+            "failures": 0,
+            "throttled": 0,
+            "rejected": 0,
+            "logins": 0,
+            "persisted_query_hits": 0,
+            "persisted_query_misses": 0,
+            "fields": 0,
+            "request_bytes": 0,
+        }
+    )
+
+    def __post_init__(self) -> None:
+        self.random: random.Random = random.Random(self.seed)
+        self.next_uid: int = 1
+        self.in_flight: int = 0
+        self.resolvers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "createLoginSession": self.create_login_session,
+            "regularLogin": self.regular_login,
+            "createUser": self.create_user,
+            "createGroup": self.create_group,
+            "deleteGroup": self.delete_group,
+            "users": lambda arguments: self.page(list(self.users.values()), arguments),
+            "groups": lambda arguments: self.page(list(self.groups.values()), arguments),
+        }
+
+    def reset(self) -> None:
+        self.users.clear()
+        self.groups.clear()
+        for key in self.stats:
+            self.stats[key] = 0
+
+    def uid(self) -> int:
+        self.next_uid += 1
+        return self.next_uid - 1
+
+    def create_login_session(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return {"typename": "CreateLoginSessionSuccessResponse", "token": "login-session-token"}
+
+    def regular_login(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["logins"] += 1
+        return {
+            "typename": "RegularLoginSuccessResponse",
+            "token": _bearer_token(self.token_lifetime),
+        }
+
+    def create_user(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        args: Dict[str, Any] = arguments["args"]
+        if args["email"] in self.users:
+            return {
+                "typename": "CreateUserMutationFailure",
+                "code": "EMAIL_ALREADY_USED",
+                "message": f"The email {args['email']} is already used",
+            }
+
+        self.users[args["email"]] = {
+            "typename": "RegularUserSchema",
+            "uid": self.uid(),
+            "name": args["name"],
+            "email": args["email"],
+            "status": args["status"],
+            "passwordHash": "$argon2id$stand-in",
+        }
+        return self.users[args["email"]]
+
+    def create_group(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        args: Dict[str, Any] = arguments["args"]
+        if args["name"] in self.groups:
+            return {
+                "typename": "CreateGroupMutationFailure",
+                "code": "NAME_ALREADY_USED",
+                "message": f"The name {args['name']} is already used",
+            }
+
+        self.groups[args["name"]] = {
+            "typename": "GroupSchema",
+            "uid": self.uid(),
+            "name": args["name"],
+            "description": args.get("description"),
+        }
+        return self.groups[args["name"]]
+
+    def delete_group(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if arguments["name"] not in self.groups:
+            return {
+                "typename": "DeleteGroupMutationFailure",
+                "code": "GROUP_NOT_FOUND",
+                "message": f"There is no group {arguments['name']}",
+            }
+
+        return self.groups.pop(arguments["name"])
+
+    def page(self, nodes: List[Dict[str, Any]], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        # The cursors are the offsets of the nodes.
+        start: int = int(arguments.get("after") or 0)
+        end: int = start + arguments["first"]
+        return {
+            "edges": [
+                {"cursor": str(start + index + 1), "node": node}
+                for index, node in enumerate(nodes[start:end])
+            ],
+            "pageInfo": {"endCursor": str(min(end, len(nodes))), "hasNextPage": end < len(nodes)},
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body: bytes = await request.read()
+        self.stats["requests"] += 1
+        # Count the bytes sent, before they were decompressed (if they were compressed).
+        self.stats["request_bytes"] += request.content_length or len(body)
+
+        # Throttle the requests beyond the capacity.
+        if self.capacity and self.in_flight >= self.capacity:
+            self.stats["throttled"] += 1
+            return web.Response(status=429, text="Too Many Requests")
+
+        # Simulate the network and server latency, and the transient failures.
+        delay: float = self.latency + self.random.uniform(0.0, self.jitter)
+        if delay > 0:
+            self.in_flight += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.in_flight -= 1
+        if self.random.random() < self.failure_rate:
+            self.stats["failures"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        # Resolve every (aliased) top-level field of the operation.
+        payload: Dict[str, Any] = json.loads(body)
+        variables: Dict[str, Any] = payload.get("variables") or {}
+        query: Optional[str] = payload.get("query")
+
+        # Look up the text of an operation sent as its hash, or register it with its hash.
+        persisted: Optional[Dict[str, Any]] = (payload.get("extensions") or {}).get(
+            "persistedQuery"
+        )
+        if persisted is not None:
+            if not self.persisted_queries:
+                return _errors_response(
+                    "PersistedQueryNotSupported", "PERSISTED_QUERY_NOT_SUPPORTED"
+                )
+
+            sha256_hash: str = persisted.get("sha256Hash", "")
+            if query is None:
+                query = self.queries.get(sha256_hash)
+                if query is None:
+                    self.stats["persisted_query_misses"] += 1
+                    return _errors_response("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+                self.stats["persisted_query_hits"] += 1
+            elif hashlib.sha256(query.encode()).hexdigest() == sha256_hash:
+                self.queries[sha256_hash] = query
+            else:
+                return _errors_response(
+                    "The hash does not match the query", "BAD_USER_INPUT", status=400
+                )
+
+        if query is None:
+            return _errors_response("Must provide a query string", "BAD_USER_INPUT", status=400)
+        operation = _parse(query).definitions[0]
+        assert isinstance(operation, OperationDefinitionNode), "Expected an operation"
+
+        # Reject the expired bearer tokens, except for logging in.
+        if _bearer_token_expired(request.headers.get("Authorization")) and any(
+            isinstance(selection, FieldNode) and selection.name.value not in LOGIN_FIELDS
+            for selection in operation.selection_set.selections
+        ):
+            self.stats["rejected"] += 1
+            return web.Response(status=401, text="Unauthorized")
+
+        data: Dict[str, Any] = {}
+        for selection in operation.selection_set.selections:
+            assert isinstance(selection, FieldNode), "Expected a field"
+            arguments: Dict[str, Any] = {
+                argument.name.value: variables.get(argument.value.name.value)
+                for argument in selection.arguments
+                if isinstance(argument.value, VariableNode)
+            }
+            key: str = (selection.alias or selection.name).value
+            data[key] = self.resolvers[selection.name.value](arguments)
+            self.stats["fields"] += 1
+
+        return web.json_response({"data": data})
+
+    def app(self) -> web.Application:
+        app: web.Application = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/graphql", self.handle)
+        return app
+
+
+@dataclass
+class BackgroundServer:
+    """
+    Runs a stand-in server on its own event loop in a background thread.
+    """
+
+    server: StandInServer
+    host: str = "127.0.0.1"
+    port: int = 0
+
+    def __post_init__(self) -> None:
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.thread: threading.Thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.runner: web.AppRunner = web.AppRunner(self.server.app(), access_log=None)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/graphql"
+
+    async def _start(self) -> None:
+        await self.runner.setup()
+        site: web.TCPSite = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+
+        # Get the port that was picked, if any.
+        sockets = getattr(site._server, "sockets", None) or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the stand-in SSO GraphQL server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of 503s.")
+    parser.add_argument("--capacity", type=int, default=0, help="Requests in flight before 429s.")
+    parser.add_argument("--token-lifetime", type=int, default=900, help="Seconds per login.")
+    parser.add_argument(
+        "--no-persisted-queries",
+        dest="persisted_queries",
+        action="store_false",
+        help="Answer the operations sent as hashes as a server without support for them.",
+    )
+    arguments = parser.parse_args()
+
+    server: StandInServer = StandInServer(
+        latency=arguments.latency,
+        jitter=arguments.jitter,
+        failure_rate=arguments.failure_rate,
+        capacity=arguments.capacity,
+        token_lifetime=arguments.token_lifetime,
+        persisted_queries=arguments.persisted_queries,
+    )
+    web.run_app(server.app(), host=arguments.host, port=arguments.port)
+
+
+if __name__ == "__main__":
+    main()
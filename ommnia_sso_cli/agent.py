@@ -0,0 +1,253 @@
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, TextIO
+import io
+import json
+import os
+import shutil
+import socket
+import socketserver
+import sys
+import threading
+import typer
+
+from ommnia_sso_cli.shared import APP_NAME, PROFILE_ENV
+from ommnia_sso_cli.streams import ContextStream
+
+# The environment variable that overrides the agent socket path, like SSH_AUTH_SOCK.
+AGENT_SOCKET_ENV: str = "OMMNIA_SSO_AGENT_SOCK"
+
+
+def agent_socket_path() -> Path:
+    return Path(
+        os.environ.get(AGENT_SOCKET_ENV) or Path(typer.get_app_dir(APP_NAME)) / "agent.sock"
+    )
+
+
+def _send(wfile: BinaryIO, lock: threading.Lock, message: Dict[str, Any]) -> None:
+    with lock:
+        wfile.write(json.dumps(message).encode() + b"\n")
+        wfile.flush()
+
+
+class _MessageWriter(io.TextIOBase):
+    """
+    A text stream that sends whatever is written to it to the client as stream messages.
+    """
+
+    def __init__(self, wfile: BinaryIO, lock: threading.Lock, stream: str) -> None:
+        super().__init__()
+        self.wfile: BinaryIO = wfile
+        self.lock: threading.Lock = lock
+        self.stream: str = stream
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if not isinstance(data, str):
+            raise TypeError(f"write() argument must be str, not {type(data).__name__}")
+        if data:
+            _send(self.wfile, self.lock, {"stream": self.stream, "data": data})
+        return len(data)
+
+
+class _RemoteStdin:
+    """
+    The standard input of the client, which only asks the client to send it once it is used.
+    """
+
+    def __init__(self, rfile: BinaryIO, wfile: BinaryIO, lock: threading.Lock) -> None:
+        self._rfile: BinaryIO = rfile
+        self._wfile: BinaryIO = wfile
+        self._lock: threading.Lock = lock
+        self._stream: Optional[TextIO] = None
+
+    @property
+    def stream(self) -> TextIO:
+        if self._stream is None:
+            _send(self._wfile, self._lock, {"stdin": True})
+            self._stream = io.TextIOWrapper(self._rfile, encoding="utf-8")  # type: ignore
+        return self._stream
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.stream)
+
+
+class _AgentServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, run: Callable[[List[str]], int], profile: str) -> None:
+        # Make sure the socket is only accessible by the owner from the start.
+        umask: int = os.umask(0o177)
+        try:
+            super().__init__(str(path), _AgentRequestHandler)
+        finally:
+            os.umask(umask)
+
+        self.run: Callable[[List[str]], int] = run
+        self.profile: str = profile
+        self.stdin: ContextStream = ContextStream("stdin", sys.stdin)
+        self.stdout: ContextStream = ContextStream("stdout", sys.stdout)
+        self.stderr: ContextStream = ContextStream("stderr", sys.stderr)
+
+
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    server: _AgentServer
+
+    def handle(self) -> None:
+        lock: threading.Lock = threading.Lock()
+        request: Dict[str, Any] = json.loads(self.rfile.readline() or b"{}")
+
+        # Handle the control requests.
+        if request.get("control") == "ping":
+            _send(self.wfile, lock, {"exit": 0, "pid": os.getpid()})
+            return
+        if request.get("control") == "stop":
+            _send(self.wfile, lock, {"exit": 0})
+            threading.Thread(target=self.server.shutdown).start()
+            return
+
+        from ommnia_sso_cli.data.models import DEFAULT_PROFILE
+        from ommnia_sso_cli.dispatch import CALLER_DIRECTORY
+        from ommnia_sso_cli.state import PROFILE
+
+        # Leave the commands for other profiles to the client, which runs them itself.
+        if (request.get("profile") or DEFAULT_PROFILE) != self.server.profile:
+            _send(self.wfile, lock, {"declined": True})
+            return
+
+        # Run the command against the profile of the agent (this thread starts with the default
+        # one), with its paths relative to the directory of the client, and its standard streams
+        # connected to the client.
+        PROFILE.set(self.server.profile)
+        CALLER_DIRECTORY.set(request.get("cwd"))
+        with (
+            self.server.stdin.redirect(_RemoteStdin(self.rfile, self.wfile, lock)),  # type: ignore
+            self.server.stdout.redirect(_MessageWriter(self.wfile, lock, "stdout")),
+            self.server.stderr.redirect(_MessageWriter(self.wfile, lock, "stderr")),
+        ):
+            exit_code: int = self.server.run(request.get("args") or [])
+
+        _send(self.wfile, lock, {"exit": exit_code})
+
+
+def serve(run: Callable[[List[str]], int], profile: str) -> None:
+    """
+    Serve the commands for the profile on the agent socket until stopped, running each with
+    `run`.
+    """
+
+    path: Path = agent_socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Refuse to start twice, but clean up the socket of an agent that did not stop properly.
+    if ping() is not None:
+        raise RuntimeError(f"An agent is already listening on {path}")
+    path.unlink(missing_ok=True)
+
+    server: _AgentServer = _AgentServer(path, run, profile)
+    sys.stdin, sys.stdout, sys.stderr = server.stdin, server.stdout, server.stderr  # type: ignore
+    try:
+        server.serve_forever()
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+def _request(message: Dict[str, Any]) -> Optional[socket.socket]:
+    # Connect to the agent, if there is one.
+    path: Path = agent_socket_path()
+    if not path.exists():
+        return None
+
+    connection: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(str(path))
+    except OSError:
+        connection.close()
+        return None
+
+    connection.sendall(json.dumps(message).encode() + b"\n")
+    return connection
+
+
+def _control(control: str) -> Optional[Dict[str, Any]]:
+    connection: Optional[socket.socket] = _request({"control": control})
+    if connection is None:
+        return None
+
+    with connection, connection.makefile("rb") as rfile:
+        return json.loads(rfile.readline() or b"{}")
+
+
+def ping() -> Optional[int]:
+    """
+    Get the process id of the running agent, if any.
+    """
+
+    response: Optional[Dict[str, Any]] = _control("ping")
+    return response.get("pid") if response is not None else None
+
+
+def stop() -> bool:
+    return _control("stop") is not None
+
+
+def _pump_stdin(connection: socket.socket) -> None:
+    try:
+        with connection.makefile("wb") as wfile:
+            shutil.copyfileobj(sys.stdin.buffer, wfile)
+    except OSError:
+        pass
+    finally:
+        try:
+            connection.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+def forward(args: List[str]) -> Optional[int]:
+    """
+    Run the command on the agent, returning its exit code, or `None` if no agent is running.
+    """
+
+    # Send the profile selected by the environment (the options of the main command are never
+    # forwarded), and run the commands against several profiles locally.
+    profile: str = os.environ.get(PROFILE_ENV, "").strip()
+    if "," in profile:
+        return None
+
+    # The agent runs in another directory, so send the one the paths are relative to.
+    connection: Optional[socket.socket] = _request(
+        {"args": args, "profile": profile or None, "cwd": os.getcwd()}
+    )
+    if connection is None:
+        return None
+
+    with connection, connection.makefile("rb") as rfile:
+        # Write the output of the command as it comes in, until it exits, and send the standard
+        # input once the command asks for it.
+        for line in rfile:
+            message: Dict[str, Any] = json.loads(line)
+            if "exit" in message:
+                return message["exit"]
+            if "declined" in message:
+                return None
+            if "stdin" in message:
+                threading.Thread(target=_pump_stdin, args=(connection,), daemon=True).start()
+                continue
+
+            stream: TextIO = sys.stderr if message["stream"] == "stderr" else sys.stdout
+            stream.write(message["data"])
+            stream.flush()
+
+    typer.secho("The agent closed the connection unexpectedly", fg="red", err=True)
+    return 1
@@ -0,0 +1,126 @@
+from functools import partial
+from pathlib import Path
+from typing import Annotated, Optional
+import signal
+import subprocess
+import sys
+import time
+import click
+import typer
+
+from ommnia_sso_cli.agent import agent_socket_path, ping, serve, stop
+from ommnia_sso_cli.dispatch import dispatch
+from ommnia_sso_cli.shared import APP_NAME
+
+app: typer.Typer = typer.Typer()
+
+# How long (in seconds) `agent start` waits for the background agent to come up.
+AGENT_START_TIMEOUT: float = 30.0
+
+
+@app.callback()
+def callback() -> None:
+    """
+    Manage the agent, which keeps one authenticated session open for all the commands.
+    """
+
+
+@app.command()
+def start(
+    ctx: typer.Context,
+    foreground: Annotated[
+        bool, typer.Option(help="Run the agent in this process instead of the background.")
+    ] = False,
+) -> None:
+    """
+    Start the agent, the following commands are forwarded to it while it runs.
+    """
+
+    from ommnia_sso_cli.state import PROFILE
+
+    # Check if the agent is already running.
+    pid: Optional[int] = ping()
+    if pid is not None:
+        typer.echo(f"The agent is already running (pid {pid}).")
+        return
+
+    profile: str = PROFILE.get()
+
+    if not foreground:
+        # Start the agent as a detached process, logging to the app dir.
+        log_path: Path = Path(typer.get_app_dir(APP_NAME)) / "agent.log"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_path.open("ab") as log_file:
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "ommnia_sso_cli.main",
+                    "--profile",
+                    profile,
+                    "agent",
+                    "start",
+                    "--foreground",
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=log_file,
+                start_new_session=True,
+            )
+
+        # Wait for the agent to log in and start listening.
+        deadline: float = time.monotonic() + AGENT_START_TIMEOUT
+        while time.monotonic() < deadline:
+            pid = ping()
+            if pid is not None:
+                typer.echo(
+                    f"Agent started for profile {profile} (pid {pid}), listening on "
+                    f"{agent_socket_path()}."
+                )
+                return
+            time.sleep(0.1)
+
+        typer.secho(f"The agent did not start, see {log_path}", fg="red")
+        raise typer.Exit(1)
+
+    # Log in and keep the loop running, so the commands of all the clients share the session.
+    from ommnia_sso_cli.bootstrap import bootstrap
+
+    root: click.Context = ctx.find_root()
+    assert isinstance(root.command, click.Group), "The agent should be run from the main group"
+    state = bootstrap(root, profile)
+    state.run_in_background()
+
+    # Stop serving on SIGTERM the same way as on Ctrl-C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    typer.echo(f"Agent listening on {agent_socket_path()}.")
+    try:
+        serve(partial(dispatch, root.command, root), profile)
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command("stop")
+def stop_() -> None:
+    """
+    Stop the running agent.
+    """
+
+    if stop():
+        typer.echo("Agent stopped.")
+    else:
+        typer.echo("The agent is not running.")
+
+
+@app.command()
+def status() -> None:
+    """
+    Show whether the agent is running.
+    """
+
+    pid: Optional[int] = ping()
+    if pid is None:
+        typer.echo("The agent is not running.")
+        raise typer.Exit(1)
+
+    typer.echo(f"The agent is running (pid {pid}), listening on {agent_socket_path()}.")
@@ -1,6 +1,22 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 import typer
 
+from ommnia_sso_cli.bootstrap import bootstrap_cached
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE
+from ommnia_sso_cli.data.repositories.mirror_repository import MirrorRepository
+from ommnia_sso_cli.data.models.group import GroupSchema
+from ommnia_sso_cli.data.repositories.groups_repository import CreateGroupMutationArguments
+from ommnia_sso_cli.output import Column, Writer, writer
+from ommnia_sso_cli.permissions import permissions_callback
+from ommnia_sso_cli.state import State
+
+# The columns of the groups in the table and CSV output.
+GROUP_COLUMNS: List[Column] = [
+    Column("uid", "UID"),
+    Column("name", "Name"),
+    Column("description", "Description"),
+]
+
 app: typer.Typer = typer.Typer()
 
 
@@ -12,13 +28,27 @@ def callback() -> None:
 @app.command()
 def create(
     name: Annotated[str, typer.Argument()],
-    permission: Annotated[List[str], typer.Option()] = [],
+    permission: Annotated[List[str], typer.Option(callback=permissions_callback)] = [],
+    description: Annotated[Optional[str], typer.Option()] = None,
 ) -> None:
     """
     Create a new group.
     """
 
-    pass
+    # Get the state.
+    state: State = State.instance()
+
+    # Create the group, a failure response is raised as a `CreateGroupError`.
+    group: GroupSchema = state.run(
+        state.admin.create_group(
+            CreateGroupMutationArguments(
+                name=name, description=description, permissions=permission
+            )
+        )
+    )
+
+    with writer(GROUP_COLUMNS) as group_writer:
+        group_writer.write(group)
 
 
 @app.command()
@@ -27,4 +57,41 @@ def delete(name: Annotated[str, typer.Argument()]) -> None:
     Delete a group.
     """
 
-    pass
+    # Get the state.
+    state: State = State.instance()
+
+    # Delete the group, a failure response is raised as a `DeleteGroupError`.
+    group: GroupSchema = state.run(state.admin.delete_group(name))
+
+    typer.echo(f"Group {group.name} deleted successfully.")
+
+
+@app.command("list")
+def list_(
+    cached: Annotated[
+        bool, typer.Option(help="Answer from the local cache (see sync), without logging in.")
+    ] = False,
+    page_size: Annotated[
+        int, typer.Option(min=1, help="The number of groups fetched per request.")
+    ] = DEFAULT_PAGE_SIZE,
+) -> None:
+    """
+    List all the groups, printed as soon as their page arrives.
+    """
+
+    if cached:
+        mirror_repository: MirrorRepository = bootstrap_cached()
+        with writer(GROUP_COLUMNS, many=True) as groups_writer:
+            for group in mirror_repository.iter_groups():
+                groups_writer.write(group)
+        return
+
+    # Get the state.
+    state: State = State.instance()
+
+    async def write_groups(groups_writer: Writer) -> None:
+        async for group in state.admin.iter_groups(page_size):
+            groups_writer.write(group)
+
+    with writer(GROUP_COLUMNS, many=True) as groups_writer:
+        state.run(write_groups(groups_writer))
@@ -0,0 +1,74 @@
+from typing import Annotated, Callable, List, Optional
+import importlib
+import typer
+
+from ommnia_sso_cli.data.models.job import JobModel
+from ommnia_sso_cli.data.repositories.jobs_repository import JobsRepository
+from ommnia_sso_cli.jobs import JOB_RUNNERS
+from ommnia_sso_cli.output import Column, writer
+from ommnia_sso_cli.shared import APP_NAME
+from ommnia_sso_cli.state import PROFILE
+
+# The columns of the jobs in the table and CSV output.
+JOB_COLUMNS: List[Column] = [
+    Column("id", "ID"),
+    Column("kind", "Kind"),
+    Column("profile", "Profile"),
+    Column("created_at", "Created at"),
+    Column("input_name", "Input"),
+]
+
+app: typer.Typer = typer.Typer()
+
+
+def load_job(job_id: str) -> JobModel:
+    job: Optional[JobModel] = JobsRepository(APP_NAME).load(job_id)
+    if job is None:
+        typer.secho(f"There is no job {job_id}", fg="red", err=True)
+        raise typer.Exit(1)
+
+    return job
+
+
+@app.command("list")
+def list_() -> None:
+    """
+    List the bulk jobs that were interrupted or left items with errors.
+    """
+
+    with writer(JOB_COLUMNS, many=True) as jobs_writer:
+        for job in JobsRepository(APP_NAME).iter_jobs():
+            jobs_writer.write(job)
+
+
+@app.command()
+def resume(
+    job_id: Annotated[str, typer.Argument()],
+    report_file: Annotated[
+        typer.FileTextWrite,
+        typer.Option("--report", help="The JSONL file the per-item results are written to."),
+    ] = "-",  # type: ignore[assignment]
+) -> None:
+    """
+    Run the items of the job that were not completed, with the options it was started with.
+    """
+
+    job: JobModel = load_job(job_id)
+
+    # Import the function running this kind of job.
+    module_name, attribute_name = JOB_RUNNERS[job.kind].split(":")
+    run_job: Callable[..., None] = getattr(importlib.import_module(module_name), attribute_name)
+
+    # Run it against the profile it was started with.
+    PROFILE.set(job.profile)
+    run_job(job, report_file)
+
+
+@app.command()
+def remove(job_id: Annotated[str, typer.Argument()]) -> None:
+    """
+    Remove a job (and its copy of the input) without resuming it.
+    """
+
+    JobsRepository(APP_NAME).remove(load_job(job_id))
+    typer.echo(f"Job {job_id} removed.")
@@ -1,8 +1,21 @@
-from typing import Annotated, List
-from ommnia_sso_tokens.token_signer import asyncio
+from typing import Annotated, List, Optional, TextIO
 import typer
 
-from ommnia_sso_cli.functions import create_login_session
+from ommnia_sso_cli.data.models.credentials import CredentialsModel
+from ommnia_sso_cli.data.models.job import JobModel
+from ommnia_sso_cli.data.repositories.credentials_repository import CredentialsRepository
+from ommnia_sso_cli.data.repositories.jobs_repository import JobsRepository
+from ommnia_sso_cli.bulk import RowFormat, read_rows
+from ommnia_sso_cli.functions import create_login_session, create_login_sessions
+from ommnia_sso_cli.functions.create_login_sessions import (
+    LOGIN_SESSION_ROW_LIST_FIELDS,
+    LoginSessionRow,
+)
+from ommnia_sso_cli.jobs import journaled
+from ommnia_sso_cli.permissions import permissions_callback
+from ommnia_sso_cli.reporting import BulkReport
+from ommnia_sso_cli.shared import APP_NAME
+from ommnia_sso_cli.state import PROFILE, State
 
 app: typer.Typer = typer.Typer()
 
@@ -11,11 +24,15 @@ app: typer.Typer = typer.Typer()
 def create_session(
     target_app_name: Annotated[str, typer.Argument()],
     redirect_url: Annotated[str, typer.Option()],
-    required_permissions: Annotated[List[str], typer.Option()] = [],
-    optional_permissions: Annotated[List[str], typer.Option()] = [],
+    required_permissions: Annotated[
+        List[str], typer.Option(callback=permissions_callback)
+    ] = [],
+    optional_permissions: Annotated[
+        List[str], typer.Option(callback=permissions_callback)
+    ] = [],
 ):
     # Create the login session and get the token.
-    token: str = asyncio.run(
+    token: str = State.instance().run(
         create_login_session(
             redirect_url,
             target_app_name=target_app_name,
@@ -28,3 +45,133 @@ def create_session(
     typer.echo(
         f"Login session created successfully, token: {typer.style(token, fg="green", bold=True)}"
     )
+
+
+@app.command("create-sessions")
+def create_sessions(
+    input_file: Annotated[
+        typer.FileText,
+        typer.Argument(help="The CSV or JSONL file with one login session per row, - for stdin."),
+    ],
+    format: Annotated[
+        Optional[RowFormat],
+        typer.Option(help="The input format, derived from the file extension by default."),
+    ] = None,
+    report_file: Annotated[
+        typer.FileTextWrite,
+        typer.Option("--report", help="The JSONL file the per-row results are written to."),
+    ] = "-",  # type: ignore[assignment]
+    concurrency: Annotated[
+        int, typer.Option(min=1, help="The number of login sessions created at the same time.")
+    ] = 16,
+    processes: Annotated[
+        Optional[int],
+        typer.Option(
+            min=0,
+            help="The number of processes signing the tokens, from the configuration by default.",
+        ),
+    ] = None,
+) -> None:
+    """
+    Create the login sessions read from a CSV or JSONL file, with their tokens in the report.
+
+    The columns are target_app_name, redirect_url, required_permissions and
+    optional_permissions, CSV list cells are separated by semicolons. An interrupted run can be
+    resumed with 'jobs resume'.
+    """
+
+    # Keep a copy of the input in a job, so that the run can be resumed.
+    job: JobModel = JobsRepository(APP_NAME).create(
+        "create-login-sessions",
+        input_file,
+        {
+            "format": RowFormat.of(input_file, format),
+            "concurrency": concurrency,
+            "processes": processes,
+        },
+        profile=PROFILE.get(),
+    )
+
+    run_create_sessions_job(job, report_file)
+
+
+def run_create_sessions_job(job: JobModel, report_file: TextIO) -> None:
+    """
+    Create the login sessions of the job that were not created (or refused) yet.
+    """
+
+    # Get the state.
+    state: State = State.instance()
+
+    # Override the number of signing processes if given.
+    if job.options["processes"] is not None:
+        state.signing_service.processes = job.options["processes"]
+
+    # Create the pending login sessions, reporting the result of each row.
+    with (
+        journaled(job, lambda result: str(result.line)) as journal,
+        JobsRepository(APP_NAME).input_file_path(job).open("r", newline="") as input_file,
+        BulkReport("Creating login sessions", report_file, journal=journal) as report,
+    ):
+        state.run(
+            create_login_sessions(
+                journal.pending(
+                    read_rows(
+                        input_file,
+                        RowFormat(job.options["format"]),
+                        LoginSessionRow,
+                        LOGIN_SESSION_ROW_LIST_FIELDS,
+                    ),
+                    lambda row: str(row[0]),
+                ),
+                report,
+                concurrency=job.options["concurrency"],
+            )
+        )
+
+    # Fail the command if any of the rows did not get a login session.
+    if report.failed:
+        raise typer.Exit(1)
+
+
+@app.command()
+def status() -> None:
+    """
+    Show the cached bearer token used by the other commands.
+    """
+
+    # Load the cached credentials.
+    credentials: Optional[CredentialsModel] = CredentialsRepository(
+        APP_NAME, PROFILE.get()
+    ).load()
+    if credentials is None:
+        typer.echo("Not logged in, the next command will perform a fresh login.")
+        return
+
+    # Print the credentials details.
+    usable: bool = credentials.is_usable_for(State.instance().config)
+    typer.echo(f"Endpoint: {credentials.graphql_endpoint_url}")
+    typer.echo(f"Email: {credentials.email}")
+    typer.echo(f"Expires at: {credentials.expires_at.astimezone().isoformat(timespec="seconds")}")
+    if usable:
+        typer.echo(
+            f"Status: {typer.style("valid", fg="green", bold=True)} "
+            f"({credentials.remaining} remaining)"
+        )
+    else:
+        typer.echo(
+            f"Status: {typer.style("stale", fg="yellow", bold=True)}, "
+            "the next command will perform a fresh login"
+        )
+
+
+@app.command()
+def logout() -> None:
+    """
+    Remove the cached bearer token.
+    """
+
+    if CredentialsRepository(APP_NAME, PROFILE.get()).clear():
+        typer.echo("Logged out successfully.")
+    else:
+        typer.echo("Not logged in.")
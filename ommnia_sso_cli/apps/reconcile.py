@@ -0,0 +1,164 @@
+from pathlib import Path
+from typing import Annotated, Any, List, TextIO
+from pydantic import ValidationError
+import tomllib
+import typer
+
+from ommnia_sso_cli.data.models.job import JobModel
+from ommnia_sso_cli.data.models.manifest import ManifestModel
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE
+from ommnia_sso_cli.data.repositories.jobs_repository import JobsRepository
+from ommnia_sso_cli.functions import apply as apply_changes, plan as plan_changes
+from ommnia_sso_cli.functions.reconcile import Change
+from ommnia_sso_cli.jobs import journaled
+from ommnia_sso_cli.output import Column, writer
+from ommnia_sso_cli.reporting import BulkReport
+from ommnia_sso_cli.shared import APP_NAME
+from ommnia_sso_cli.state import PROFILE, State
+
+plan_app: typer.Typer = typer.Typer()
+apply_app: typer.Typer = typer.Typer()
+
+# The columns of the changes in the table and CSV output.
+CHANGE_COLUMNS: List[Column] = [
+    Column("action", "Action"),
+    Column("kind", "Kind"),
+    Column("key", "Name / Email"),
+    Column("detail", "Detail"),
+]
+
+ManifestPath = Annotated[
+    Path,
+    typer.Argument(
+        exists=True, dir_okay=False, help="The TOML manifest with the desired groups and users."
+    ),
+]
+
+
+def load_manifest(manifest_path: Path) -> ManifestModel:
+    try:
+        with manifest_path.open("rb") as manifest_file:
+            return ManifestModel.model_validate(tomllib.load(manifest_file))
+    except (tomllib.TOMLDecodeError, ValidationError) as exception:
+        typer.secho(f"Invalid manifest: {exception}", fg="red", err=True)
+        raise typer.Exit(1)
+
+
+def compute_changes(manifest_path: Path, page_size: int) -> List[Change]:
+    # Compute the changes and print them.
+    changes: List[Change] = State.instance().run(
+        plan_changes(load_manifest(manifest_path), page_size)
+    )
+    if not changes:
+        typer.echo("No users or groups to create or delete, and no drift.", err=True)
+        return changes
+
+    with writer(CHANGE_COLUMNS, many=True) as changes_writer:
+        for change in changes:
+            changes_writer.write(change)
+
+    return changes
+
+
+def applicable_changes(manifest_path: Path, page_size: int) -> List[Change]:
+    # Only the creations and deletions can be applied.
+    return [
+        change
+        for change in compute_changes(manifest_path, page_size)
+        if change.action in ["create", "delete"]
+    ]
+
+
+def change_key(change: Any) -> str:
+    # Identifies both the changes and their results.
+    return f"{change.action} {change.kind} {change.key}"
+
+
+@plan_app.command()
+def plan(
+    manifest_path: ManifestPath,
+    page_size: Annotated[
+        int, typer.Option(min=1, help="The number of users or groups fetched per request.")
+    ] = DEFAULT_PAGE_SIZE,
+) -> None:
+    """
+    Show the changes that would make the users and groups match the manifest.
+    """
+
+    compute_changes(manifest_path, page_size)
+
+
+@apply_app.command()
+def apply(
+    manifest_path: ManifestPath,
+    yes: Annotated[bool, typer.Option("--yes", "-y", help="Apply without asking.")] = False,
+    report_file: Annotated[
+        typer.FileTextWrite,
+        typer.Option("--report", help="The JSONL file the per-change results are written to."),
+    ] = "-",  # type: ignore[assignment]
+    concurrency: Annotated[
+        int, typer.Option(min=1, help="The number of changes applied at the same time.")
+    ] = 16,
+    page_size: Annotated[
+        int, typer.Option(min=1, help="The number of users or groups fetched per request.")
+    ] = DEFAULT_PAGE_SIZE,
+) -> None:
+    """
+    Make the users and groups match the manifest, applying only the changes.
+
+    Drift (differences in existing users and groups) and the fields that cannot be compared are
+    shown but cannot be applied. An interrupted run can be resumed with 'jobs resume'.
+    """
+
+    changes: List[Change] = applicable_changes(manifest_path, page_size)
+    if not changes:
+        return
+
+    if not yes:
+        typer.confirm(f"Apply {len(changes)} changes?", abort=True, err=True)
+
+    # Keep a copy of the manifest in a job, so that the run can be resumed.
+    with manifest_path.open("r") as manifest_file:
+        job: JobModel = JobsRepository(APP_NAME).create(
+            "apply",
+            manifest_file,
+            {"concurrency": concurrency, "page_size": page_size},
+            profile=PROFILE.get(),
+        )
+
+    apply_job(job, changes, report_file)
+
+
+def run_apply_job(job: JobModel, report_file: TextIO) -> None:
+    """
+    Plan the job's manifest again and apply the changes that were not applied (or refused) yet.
+    """
+
+    apply_job(
+        job,
+        applicable_changes(
+            JobsRepository(APP_NAME).input_file_path(job), job.options["page_size"]
+        ),
+        report_file,
+    )
+
+
+def apply_job(job: JobModel, changes: List[Change], report_file: TextIO) -> None:
+    # Apply the pending changes, reporting the result of each one.
+    with (
+        journaled(job, change_key) as journal,
+        BulkReport(
+            "Applying changes", report_file, ["done", "failed", "error"], journal=journal
+        ) as report,
+    ):
+        State.instance().run(
+            apply_changes(
+                list(journal.pending(changes, change_key)),
+                report,
+                concurrency=job.options["concurrency"],
+            )
+        )
+
+    # Fail the command if any of the changes was not applied.
+    if report.failed:
+        raise typer.Exit(1)
@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import List, Optional
+import shlex
+import click
+import typer
+
+from ommnia_sso_cli.dispatch import TOP_LEVEL_COMMANDS, dispatch
+from ommnia_sso_cli.shared import APP_NAME
+
+try:
+    import readline
+except ImportError:  # pragma: no cover, readline is not available on every platform.
+    readline = None  # type: ignore[assignment]
+
+app: typer.Typer = typer.Typer()
+
+
+def _complete(group: click.Group, ctx: click.Context, words: List[str], text: str) -> List[str]:
+    # Walk down the groups along the words that were already typed.
+    command: Optional[click.Command] = group
+    for word in words:
+        if not isinstance(command, click.Group):
+            return []
+        command = command.get_command(ctx, word)
+
+    if isinstance(command, click.Group):
+        names: List[str] = [
+            name
+            for name in command.list_commands(ctx)
+            if command is not group or name not in TOP_LEVEL_COMMANDS
+        ]
+    elif command is not None:
+        names = [option for param in command.params for option in param.opts if option[:1] == "-"]
+    else:
+        names = []
+
+    return [f"{name} " for name in names if name.startswith(text)]
+
+
+def _setup_readline(group: click.Group, ctx: click.Context, history_path: Path) -> None:
+    if readline is None:
+        return
+
+    # Load the history of the previous sessions.
+    try:
+        readline.read_history_file(history_path)
+    except (FileNotFoundError, OSError):
+        pass
+
+    matches: List[str] = []
+
+    def completer(text: str, index: int) -> Optional[str]:
+        # Compute the matches for the first call, then hand them out one by one.
+        if index == 0:
+            line: str = readline.get_line_buffer()[: readline.get_endidx()]
+            words: List[str] = line.split()
+            if words and not line.endswith(" "):
+                words = words[:-1]
+            matches[:] = _complete(group, ctx, words, text)
+
+        return matches[index] if index < len(matches) else None
+
+    readline.set_completer(completer)
+    readline.set_completer_delims(" \t")
+    readline.parse_and_bind("tab: complete")
+
+
+@app.command()
+def shell(ctx: typer.Context) -> None:
+    """
+    Run commands in an interactive shell that keeps one authenticated session open.
+    """
+
+    # Get the main group, whose sub commands are run from the shell.
+    assert ctx.parent is not None, "The shell should be run as a sub command"
+    group = ctx.parent.command
+    assert isinstance(group, click.Group), "The shell should be run as a sub command of a group"
+
+    history_path: Path = Path(typer.get_app_dir(APP_NAME)) / "shell_history"
+    _setup_readline(group, ctx.parent, history_path)
+
+    typer.echo("Type a command (e.g. users create-regular --help), help, or exit.")
+    while True:
+        # Read the next command, stopping at the end of the input.
+        try:
+            line: str = input("admin> ")
+        except KeyboardInterrupt:
+            typer.echo()
+            continue
+        except EOFError:
+            typer.echo()
+            break
+
+        # Split the command into its arguments.
+        try:
+            args: List[str] = shlex.split(line)
+        except ValueError as exception:
+            typer.secho(f"Invalid command: {exception}", fg="red")
+            continue
+
+        if not args:
+            continue
+        if args[0] in ["exit", "quit"]:
+            break
+        if args[0] == "help":
+            names: List[str] = [name.strip() for name in _complete(group, ctx.parent, [], "")]
+            typer.echo(f"Commands: {', '.join(names)}, exit")
+            continue
+
+        # Run the command, without leaving the shell when it exits or fails.
+        dispatch(group, ctx.parent, args)
+
+    # Keep the history for the next sessions.
+    if readline is not None:
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        readline.write_history_file(history_path)
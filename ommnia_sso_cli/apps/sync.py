@@ -0,0 +1,44 @@
+from typing import Annotated, List
+import typer
+
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE
+from ommnia_sso_cli.data.repositories.mirror_repository import MirrorRepository, SyncResult
+from ommnia_sso_cli.functions import sync_mirror
+from ommnia_sso_cli.output import Column, writer
+from ommnia_sso_cli.shared import APP_NAME
+from ommnia_sso_cli.state import State
+
+app: typer.Typer = typer.Typer()
+
+
+@app.command()
+def sync(
+    page_size: Annotated[
+        int, typer.Option(min=1, help="The number of users or groups fetched per request.")
+    ] = DEFAULT_PAGE_SIZE,
+) -> None:
+    """
+    Refresh the local cache of the users and groups, which the --cached commands answer from.
+    """
+
+    # Get the state.
+    state: State = State.instance()
+
+    # Sync the mirror of the configured deployment.
+    mirror_repository: MirrorRepository = MirrorRepository(
+        APP_NAME, state.config.graphql_endpoint_url
+    )
+    sync_results: List[SyncResult] = state.run(sync_mirror(mirror_repository, page_size))
+
+    with writer(
+        [
+            Column("name", "Table"),
+            Column("total", "Total"),
+            Column("added", "Added"),
+            Column("updated", "Updated"),
+            Column("removed", "Removed"),
+        ],
+        many=True,
+    ) as sync_results_writer:
+        for sync_result in sync_results:
+            sync_results_writer.write(sync_result)
@@ -1,17 +1,30 @@
-from typing import Annotated, List
-from rich.table import Table
-from ommnia_sso_cli.shared import console
-import asyncio
+from typing import Annotated, List, Optional, TextIO, Union
 import typer
 
-from ommnia_sso_cli.data.models.user import RegularUserSchema, UserStatus
-from ommnia_sso_cli.data.repositories.users_repository import (
-    CreateUserMutationArguments,
-    CreateUserMutationFailure,
-    CreateUserResponse,
-    UsersRepository,
-)
-from ommnia_sso_cli.state import State
+from ommnia_sso_cli.bootstrap import bootstrap_cached
+from ommnia_sso_cli.bulk import RowFormat, read_rows
+from ommnia_sso_cli.functions import import_users
+from ommnia_sso_cli.functions.import_users import IMPORT_USER_ROW_LIST_FIELDS, ImportUserRow
+from ommnia_sso_cli.data.models.job import JobModel
+from ommnia_sso_cli.data.models.user import MirroredUserSchema, RegularUserSchema, UserStatus
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE
+from ommnia_sso_cli.data.repositories.jobs_repository import JobsRepository
+from ommnia_sso_cli.data.repositories.mirror_repository import MirrorRepository
+from ommnia_sso_cli.data.repositories.users_repository import CreateUserMutationArguments
+from ommnia_sso_cli.output import Column, Writer, writer
+from ommnia_sso_cli.permissions import permissions_callback
+from ommnia_sso_cli.jobs import journaled
+from ommnia_sso_cli.reporting import BulkReport
+from ommnia_sso_cli.shared import APP_NAME
+from ommnia_sso_cli.state import PROFILE, State
+
+# The columns of the users in the table and CSV output.
+USER_COLUMNS: List[Column] = [
+    Column("uid", "UID"),
+    Column("name", "Name"),
+    Column("email", "Email"),
+    Column("status", "Status"),
+]
 
 app: typer.Typer = typer.Typer()
 
@@ -21,47 +34,183 @@ def create_regular(
     name: Annotated[str, typer.Argument()],
     email: Annotated[str, typer.Argument()],
     password: Annotated[str, typer.Argument()],
-    permissions: Annotated[List[str], typer.Option()] = [],
+    permissions: Annotated[List[str], typer.Option(callback=permissions_callback)] = [],
     groups: Annotated[List[str], typer.Option()] = [],
     status: Annotated[UserStatus, typer.Option()] = UserStatus.ACTIVE,
 ) -> None:
     # Get the state.
     state: State = State.instance()
 
-    # Create the users repository.
-    users_repository: UsersRepository = UsersRepository(state.client)
-
-    # Create the user creation arguments.
-    create_user_args: CreateUserMutationArguments = CreateUserMutationArguments(
-        name=name,
-        email=email,
-        password=password,
-        permissions=permissions,
-        groups=groups,
-        status=status,
+    # Create the user, a failure response is raised as a `CreateUserError`.
+    user: RegularUserSchema = state.run(
+        state.admin.create_user(
+            CreateUserMutationArguments(
+                name=name,
+                email=email,
+                password=password,
+                permissions=permissions,
+                groups=groups,
+                status=status,
+            )
+        )
     )
 
-    # Create the user and handle a failure response.
-    create_user_response: CreateUserResponse = asyncio.run(
-        users_repository.create_user(create_user_args)
+    with writer([*USER_COLUMNS, Column("password_hash", "Password")]) as user_writer:
+        user_writer.write(user)
+
+
+@app.command("import")
+def import_(
+    input_file: Annotated[
+        typer.FileText,
+        typer.Argument(help="The CSV or JSONL file with one user per row, - for stdin."),
+    ],
+    format: Annotated[
+        Optional[RowFormat],
+        typer.Option(help="The input format, derived from the file extension by default."),
+    ] = None,
+    report_file: Annotated[
+        typer.FileTextWrite,
+        typer.Option("--report", help="The JSONL file the per-row results are written to."),
+    ] = "-",  # type: ignore[assignment]
+    concurrency: Annotated[
+        int, typer.Option(min=1, help="The number of users created at the same time.")
+    ] = 16,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help="The number of users created per request, a failing request fails all of them.",
+        ),
+    ] = 1,
+) -> None:
+    """
+    Create the users read from a CSV or JSONL file.
+
+    CSV files need a header row, list cells (permissions, groups) are separated by semicolons.
+    An interrupted import can be resumed with 'jobs resume'.
+    """
+
+    # Keep a copy of the input in a job, so that the import can be resumed.
+    job: JobModel = JobsRepository(APP_NAME).create(
+        "import-users",
+        input_file,
+        {
+            "format": RowFormat.of(input_file, format),
+            "concurrency": concurrency,
+            "batch_size": batch_size,
+        },
+        profile=PROFILE.get(),
     )
-    if isinstance(create_user_response, CreateUserMutationFailure):
-        typer.echo(
-            f"Failed to create user ({create_user_response.code}): {create_user_response.message}"
+
+    run_import_job(job, report_file)
+
+
+def run_import_job(job: JobModel, report_file: TextIO) -> None:
+    """
+    Create the users of the job that were not created (or refused) yet.
+    """
+
+    # Create the pending users, reporting the result of each row.
+    with (
+        journaled(job, lambda result: str(result.line)) as journal,
+        JobsRepository(APP_NAME).input_file_path(job).open("r", newline="") as input_file,
+        BulkReport(
+            "Importing users",
+            report_file,
+            ["created", "exists", "failed", "error", "unknown"],
+            journal=journal,
+        ) as report,
+    ):
+        State.instance().run(
+            import_users(
+                journal.pending(
+                    read_rows(
+                        input_file,
+                        RowFormat(job.options["format"]),
+                        ImportUserRow,
+                        IMPORT_USER_ROW_LIST_FIELDS,
+                    ),
+                    lambda row: str(row[0]),
+                ),
+                report,
+                concurrency=job.options["concurrency"],
+                batch_size=job.options["batch_size"],
+                uncertain={int(key) for key in journal.uncertain},
+            )
         )
-        raise typer.Exit(-1)
-
-    # Make sure that the response was successful.
-    assert isinstance(
-        create_user_response, RegularUserSchema
-    ), "If the create user response was not a failure, it should return a user schema."
-
-    table = Table("UID", "Name", "Email", "Status", "Password")
-    table.add_row(
-        str(create_user_response.uid),
-        create_user_response.name,
-        create_user_response.email,
-        create_user_response.status,
-        create_user_response.password_hash,
-    )
-    console.print(table)
+
+    # Fail the command if any of the rows was not imported.
+    if report.failed:
+        raise typer.Exit(1)
+
+
+@app.command("list")
+def list_(
+    status: Annotated[
+        Optional[UserStatus], typer.Option(help="Only list the users with this status.")
+    ] = None,
+    cached: Annotated[
+        bool, typer.Option(help="Answer from the local cache (see sync), without logging in.")
+    ] = False,
+    page_size: Annotated[
+        int, typer.Option(min=1, help="The number of users fetched per request.")
+    ] = DEFAULT_PAGE_SIZE,
+) -> None:
+    """
+    List all the users, printed as soon as their page arrives.
+    """
+
+    if cached:
+        mirror_repository: MirrorRepository = bootstrap_cached()
+        with writer(USER_COLUMNS, many=True) as users_writer:
+            for user in mirror_repository.iter_users(status):
+                users_writer.write(user)
+        return
+
+    # Get the state.
+    state: State = State.instance()
+
+    async def write_users(users_writer: Writer) -> None:
+        async for user in state.admin.iter_users(page_size):
+            if status is None or user.status == status:
+                users_writer.write(user)
+
+    with writer(USER_COLUMNS, many=True) as users_writer:
+        state.run(write_users(users_writer))
+
+
+@app.command()
+def show(
+    email: Annotated[str, typer.Argument()],
+    cached: Annotated[
+        bool, typer.Option(help="Answer from the local cache (see sync), without logging in.")
+    ] = False,
+) -> None:
+    """
+    Show the user with the given email.
+
+    Without --cached, the users are paged through until the user is found.
+    """
+
+    user: Optional[Union[RegularUserSchema, MirroredUserSchema]]
+    if cached:
+        user = bootstrap_cached().get_user(email)
+    else:
+        # Get the state.
+        state: State = State.instance()
+
+        async def find_user() -> Optional[RegularUserSchema]:
+            async for user in state.admin.iter_users():
+                if user.email == email:
+                    return user
+            return None
+
+        user = state.run(find_user())
+
+    if user is None:
+        typer.secho(f"No user with email {email}", fg="red", err=True)
+        raise typer.Exit(1)
+
+    with writer(USER_COLUMNS) as user_writer:
+        user_writer.write(user)
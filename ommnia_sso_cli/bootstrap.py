@@ -0,0 +1,76 @@
+from typing import Optional
+import typer
+
+from ommnia_sso_cli.data.models import DEFAULT_PROFILE, ConfigModel
+from ommnia_sso_cli.data.repositories.config_repository import ConfigRepository
+from ommnia_sso_cli.data.repositories.credentials_repository import CredentialsRepository
+from ommnia_sso_cli.data.repositories.mirror_repository import MirrorRepository
+from ommnia_sso_cli.functions import authenticate
+from ommnia_sso_cli.sdk import SSOAdminClient
+from ommnia_sso_cli.shared import APP_NAME
+from ommnia_sso_cli.state import PROFILE, State
+from ommnia_sso_cli.timings import span
+
+
+def load_config(profile: str = DEFAULT_PROFILE) -> ConfigModel:
+    # Read the configuration file.
+    with span("config load"):
+        config: Optional[ConfigModel] = ConfigRepository(APP_NAME).load()
+    if config is None:
+        typer.secho("Could not read configuration file", fg="red")
+        raise typer.Exit(-1)
+
+    # Get the config of the profile.
+    try:
+        return config.profile(profile)
+    except KeyError:
+        typer.secho(f"There is no profile {profile} in the configuration file", fg="red")
+        raise typer.Exit(-1)
+
+
+def bootstrap(
+    ctx: typer.Context, profile: str = DEFAULT_PROFILE, authenticated: bool = True
+) -> State:
+    """
+    Load the config of the profile and create its state with a connected (and optionally
+    authenticated) client, which is closed once the given context is.
+    """
+
+    config: ConfigModel = load_config(profile)
+
+    # Create the SSO admin client, caching its bearer token per profile, and put it in the state.
+    try:
+        admin: SSOAdminClient = SSOAdminClient(config, CredentialsRepository(APP_NAME, profile))
+    except ImportError as exception:
+        # The transport of the config needs an optional dependency that is not installed.
+        typer.secho(str(exception), fg="red", err=True)
+        raise typer.Exit(-1)
+    state: State = State.instantiate(admin, profile)
+
+    # Open the connection shared by all the requests, and close it once the command is done.
+    with span("connect"):
+        state.connect()
+    ctx.call_on_close(state.close)
+
+    # Authorize the client with the cached bearer token, or log in if there is none.
+    if authenticated:
+        with span("authenticate"):
+            state.run(authenticate())
+
+    return state
+
+
+def bootstrap_cached() -> MirrorRepository:
+    """
+    Get the local mirror of the deployment of the current profile, for the commands answering
+    from it without connecting or logging in.
+    """
+
+    mirror_repository: MirrorRepository = MirrorRepository(
+        APP_NAME, load_config(PROFILE.get()).graphql_endpoint_url
+    )
+    if not mirror_repository.exists:
+        typer.secho("There is no local cache yet, run 'admin sync' first", fg="red", err=True)
+        raise typer.Exit(1)
+
+    return mirror_repository
@@ -0,0 +1,138 @@
+from enum import Enum
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from pydantic import BaseModel, ValidationError
+import asyncio
+import csv
+import json
+
+from ommnia_sso_cli.output import CSV_LIST_SEPARATOR
+
+M = TypeVar("M", bound=BaseModel)
+T = TypeVar("T")
+
+# The code of the results of rows that could not be parsed, which are not retried.
+INVALID_ROW_CODE: str = "INVALID_ROW"
+
+# Marks the end of the items for the workers of `for_each`.
+_DONE: Any = object()
+
+
+class RowFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+    @classmethod
+    def of(cls, file: TextIO, format: Optional["RowFormat"] = None) -> "RowFormat":
+        """
+        Get the format of the file, derived from its extension if not given.
+        """
+
+        if format is not None:
+            return format
+        return cls.JSONL if Path(str(file.name)).suffix in [".jsonl", ".ndjson"] else cls.CSV
+
+
+class RowError(BaseModel):
+    message: str
+    row: Optional[Dict[str, Any]] = None
+
+
+def _parse_csv_row(row: Dict[str, Any], list_fields: List[str]) -> Dict[str, Any]:
+    # Split the list cells, and leave out empty cells so the defaults apply.
+    for key in list_fields:
+        if key in row:
+            row[key] = [value for value in (row[key] or "").split(CSV_LIST_SEPARATOR) if value]
+    return {key: value for key, value in row.items() if value not in [None, ""]}
+
+
+def read_rows(
+    file: TextIO, format: RowFormat, model: Type[M], list_fields: List[str] = []
+) -> Iterator[Tuple[int, Union[M, RowError]]]:
+    """
+    Lazily read the rows of a CSV (with a header row) or JSONL file, one row at a time, as
+    models.
+
+    CSV cells of the list fields are split on semicolons. Rows that cannot be parsed are yielded
+    as errors instead of models.
+    """
+
+    rows: Iterator[Tuple[int, Any]]
+    if format == RowFormat.CSV:
+        reader = csv.DictReader(file)
+        rows = ((reader.line_num, _parse_csv_row(row, list_fields)) for row in reader)
+    else:
+        rows = ((index + 1, line) for index, line in enumerate(file) if line.strip())
+
+    for line, row in rows:
+        try:
+            if format == RowFormat.JSONL:
+                row = json.loads(row)
+            yield line, model.model_validate(row)
+        except ValueError as exception:
+            message: str = (
+                "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                    for error in exception.errors()
+                )
+                if isinstance(exception, ValidationError)
+                else str(exception)
+            )
+            yield line, RowError(message=message, row=row if isinstance(row, dict) else None)
+
+
+def batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+async def for_each(
+    items: Iterable[T], handle: Callable[[T], Awaitable[None]], concurrency: int
+) -> None:
+    """
+    Handle the items with at most `concurrency` of them in flight at once.
+
+    The items are pulled from the iterable only as workers free up, so it can be streamed.
+    """
+
+    queue: asyncio.Queue[T] = asyncio.Queue(maxsize=concurrency)
+
+    async def worker() -> None:
+        while (item := await queue.get()) is not _DONE:
+            await handle(item)
+
+    # Start the workers, then feed them the items and stop them once the queue has been drained.
+    # If a worker fails, the group stops the feeding (which would otherwise wait for it forever)
+    # and the other workers.
+    try:
+        async with asyncio.TaskGroup() as group:
+            for _ in range(concurrency):
+                group.create_task(worker())
+
+            for item in items:
+                await queue.put(item)
+            for _ in range(concurrency):
+                await queue.put(_DONE)
+    except BaseExceptionGroup as exception_group:
+        raise exception_group.exceptions[0]
@@ -0,0 +1,203 @@
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+import asyncio
+from gql import Client
+from gql.client import AsyncClientSession
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+from graphql import DocumentNode, OperationDefinitionNode, OperationType
+from pydantic import TypeAdapter
+
+from ommnia_sso_cli.data.decoding import GraphQLResponse, decode_response, validate_data
+from ommnia_sso_cli.data.scheduler import Scheduler
+from ommnia_sso_cli.data.transport import RawTransport
+from ommnia_sso_cli.timings import span
+
+T = TypeVar("T")
+
+# Set while the current task is logging in again, so the login mutations are never retried.
+_reauthenticating: ContextVar[bool] = ContextVar("reauthenticating", default=False)
+
+# The codes of the GraphQL errors (in their extensions) that mean the token was rejected.
+AUTH_FAILURE_ERROR_CODES: List[str] = ["UNAUTHENTICATED", "SESSION_EXPIRED", "TOKEN_EXPIRED"]
+
+
+def is_auth_failure(exception: BaseException) -> bool:
+    """
+    Check if a request failed because the server rejected the bearer token: an unauthorized
+    response, or a GraphQL error saying so.
+    """
+
+    if isinstance(exception, TransportServerError):
+        return exception.code == 401
+
+    if isinstance(exception, TransportQueryError):
+        return any(
+            isinstance(error, dict)
+            and (error.get("extensions") or {}).get("code") in AUTH_FAILURE_ERROR_CODES
+            for error in exception.errors or []
+        )
+
+    return False
+
+
+def is_mutation(document: DocumentNode) -> bool:
+    return any(
+        isinstance(definition, OperationDefinitionNode)
+        and definition.operation == OperationType.MUTATION
+        for definition in document.definitions
+    )
+
+
+class ReauthenticatingClient(Client):
+    """
+    A GraphQL client that performs a fresh login and retries once when the server rejects the
+    bearer token it was given.
+
+    While the client is connected (`async with client:`) all requests share the open connection,
+    so they can be executed concurrently. With a scheduler, every request goes through it, the
+    mutations being retried only when the server did not process them.
+
+    `execute_decoded` decodes the raw response body straight into models, instead of decoding
+    it to dicts first and validating those.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        reauthenticate: Optional[Callable[[], Awaitable[None]]] = None,
+        scheduler: Optional[Scheduler] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.reauthenticate: Optional[Callable[[], Awaitable[None]]] = reauthenticate
+        self.scheduler: Optional[Scheduler] = scheduler
+        self._reauthenticate_lock: asyncio.Lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        if isinstance(self.transport, RawTransport):
+            return self.transport.connected
+
+        return getattr(self.transport, "session", None) is not None
+
+    async def _execute(self, request: Callable[[], Awaitable[T]], idempotent: bool) -> T:
+        # Each attempt takes its own slot, so that logging in again never waits on a slot held by
+        # the request that needs it.
+        if self.scheduler is not None:
+            return await self.scheduler.run(request, idempotent)
+
+        return await request()
+
+    @property
+    def _extra_args(self) -> Dict[str, Any]:
+        # The headers are sent per request, since the open connection keeps the ones it was
+        # created with.
+        return {"headers": getattr(self.transport, "headers", None) or {}}
+
+    async def _execute_once(self, document: DocumentNode, *args: Any, **kwargs: Any) -> Any:
+        # Without an open connection, connect for this request only.
+        if not self.connected:
+            return await super().execute_async(document, *args, **kwargs)
+
+        assert isinstance(self.session, AsyncClientSession)
+        return await self.session.execute(
+            document, *args, extra_args=self._extra_args, **kwargs
+        )
+
+    async def _execute_decoded_once(
+        self,
+        document: DocumentNode,
+        variable_values: Dict[str, Any],
+        adapter: TypeAdapter[GraphQLResponse[T]],
+    ) -> T:
+        # Without an open connection, go through gql and validate the decoded data.
+        if not self.connected or not isinstance(self.transport, RawTransport):
+            data: Any = await self._execute_once(document, variable_values)
+            with span("validation"):
+                return validate_data(adapter, data)
+
+        status, body = await self.transport.execute_raw(
+            document, variable_values, extra_args=self._extra_args
+        )
+        with span("validation"):
+            return decode_response(adapter, status, body)
+
+    async def execute_async(self, document: DocumentNode, *args: Any, **kwargs: Any) -> Any:
+        return await self._reauthenticating(
+            partial(self._execute_once, document, *args, **kwargs), not is_mutation(document)
+        )
+
+    async def execute_decoded(
+        self,
+        document: DocumentNode,
+        variable_values: Dict[str, Any],
+        adapter: TypeAdapter[GraphQLResponse[T]],
+    ) -> T:
+        """
+        Execute the operation and decode its data with the adapter (see `response_adapter`).
+        """
+
+        return await self._reauthenticating(
+            partial(self._execute_decoded_once, document, variable_values, adapter),
+            not is_mutation(document),
+        )
+
+    async def reauthenticate_once(
+        self, headers: Any, reauthenticate: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> None:
+        """
+        Log in again (with the given function, or the reauthentication callback), unless the
+        headers were already replaced since they were read, by a concurrent login.
+        """
+
+        async with self._reauthenticate_lock:
+            if getattr(self.transport, "headers", None) is not headers:
+                return
+
+            login: Optional[Callable[[], Awaitable[None]]] = reauthenticate or self.reauthenticate
+            assert login is not None, "There should be a function to log in again with"
+
+            token = _reauthenticating.set(True)
+            try:
+                await login()
+            finally:
+                _reauthenticating.reset(token)
+
+    async def _reauthenticating(self, request: Callable[[], Awaitable[T]], idempotent: bool) -> T:
+        headers: Any = getattr(self.transport, "headers", None)
+
+        try:
+            return await self._execute(request, idempotent)
+        except (TransportServerError, TransportQueryError) as exception:
+            # Only a rejected token is worth logging in again, and the login mutations
+            # themselves are never retried.
+            if (
+                not is_auth_failure(exception)
+                or self.reauthenticate is None
+                or _reauthenticating.get()
+            ):
+                raise
+
+        # Log in again, unless a concurrent request already did so, then retry the request once.
+        await self.reauthenticate_once(headers)
+        return await self._execute(request, idempotent)
+
+
+async def execute_decoded(
+    client: Client,
+    document: DocumentNode,
+    variable_values: Dict[str, Any],
+    adapter: TypeAdapter[GraphQLResponse[T]],
+) -> T:
+    """
+    Execute the operation with any client, decoding the raw response body straight into the
+    models when the client supports it.
+    """
+
+    if isinstance(client, ReauthenticatingClient):
+        return await client.execute_decoded(document, variable_values, adapter)
+
+    data: Any = await client.execute_async(document, variable_values)
+    with span("validation"):
+        return validate_data(adapter, data)
@@ -0,0 +1,85 @@
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from gql.transport.exceptions import (
+    TransportProtocolError,
+    TransportQueryError,
+    TransportServerError,
+)
+from pydantic import BaseModel, TypeAdapter, ValidationError
+import json
+import sys
+
+T = TypeVar("T")
+
+# How much of an unexpected response body is kept in the error message.
+ERROR_BODY_LENGTH: int = 200
+
+
+class GraphQLResponse(BaseModel, Generic[T]):
+    data: Optional[T] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+def response_adapter(data_type: Any) -> TypeAdapter[GraphQLResponse[Any]]:
+    """
+    Create the adapter that decodes a whole response body with the given data type in one pass.
+
+    Creating an adapter builds its validator, so it is done once per type at import time.
+    """
+
+    # The data type may refer to models of the calling module by name.
+    response_type: Type[GraphQLResponse[Any]] = GraphQLResponse[data_type]
+    response_type.model_rebuild(_types_namespace=sys._getframe(1).f_globals)
+    return TypeAdapter(response_type)
+
+
+def validate_data(adapter: TypeAdapter[GraphQLResponse[T]], data: Any) -> T:
+    """
+    Validate data that was already decoded (by gql) with the adapter.
+    """
+
+    response: GraphQLResponse[T] = adapter.validate_python({"data": data})
+    assert response.data is not None, "The data should have been returned"
+    return response.data
+
+
+def _error(status: int, body: bytes) -> Optional[Exception]:
+    # Tell the GraphQL errors (like gql does) from the responses that are not GraphQL at all, and
+    # from data that does not match the models (None).
+    try:
+        result: Any = json.loads(body)
+    except ValueError:
+        result = None
+
+    if isinstance(result, dict) and result.get("data") is not None and not result.get("errors"):
+        return None
+    if isinstance(result, dict) and result.get("errors"):
+        return TransportQueryError(
+            str(result["errors"][0]), errors=result["errors"], data=result.get("data")
+        )
+    if status >= 400:
+        return TransportServerError(f"{status}: {body[:ERROR_BODY_LENGTH]!r}", status)
+    return TransportProtocolError(
+        f"Server did not return a GraphQL result: {body[:ERROR_BODY_LENGTH]!r}"
+    )
+
+
+def decode_response(adapter: TypeAdapter[GraphQLResponse[T]], status: int, body: bytes) -> T:
+    """
+    Decode the raw body of a response straight into the models of its data, raising the same
+    errors as gql would for the responses that hold GraphQL errors or are not GraphQL results.
+    """
+
+    try:
+        response: GraphQLResponse[T] = adapter.validate_json(body)
+    except ValidationError as exception:
+        error: Optional[Exception] = _error(status, body)
+        if error is None:
+            raise
+        raise error from exception
+
+    if response.errors:
+        raise TransportQueryError(str(response.errors[0]), errors=response.errors)
+    if response.data is None:
+        raise _error(status, body) or TransportProtocolError("The response holds no data")
+
+    return response.data
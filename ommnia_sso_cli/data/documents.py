@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from gql import gql
+from graphql import (
+    ArgumentNode,
+    DocumentNode,
+    FieldNode,
+    NameNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    VariableDefinitionNode,
+    VariableNode,
+    print_ast,
+)
+import hashlib
+import weakref
+
+
+@lru_cache(maxsize=None)
+def document(source: str) -> DocumentNode:
+    """
+    Parse a GraphQL document, only once and only when it is first used.
+    """
+
+    return gql(source)
+
+
+@dataclass(frozen=True)
+class PrintedDocument:
+    """
+    The text of a document as it is sent, and its SHA-256 hash, identifying it as a persisted
+    query.
+    """
+
+    query: str
+    sha256_hash: str
+
+
+# The printed documents, by the id of the document (which is only valid while it lives).
+_printed_documents: Dict[int, Tuple["weakref.ref[DocumentNode]", PrintedDocument]] = {}
+
+
+def printed_document(document: DocumentNode) -> PrintedDocument:
+    """
+    Print and hash a document, only once per document.
+
+    The documents are not hashable cheaply, so they are looked up by id, and forgotten when they
+    are collected.
+    """
+
+    key: int = id(document)
+    entry = _printed_documents.get(key)
+    if entry is not None and entry[0]() is document:
+        return entry[1]
+
+    query: str = print_ast(document)
+    printed: PrintedDocument = PrintedDocument(
+        query=query, sha256_hash=hashlib.sha256(query.encode()).hexdigest()
+    )
+    _printed_documents[key] = (
+        weakref.ref(document, lambda _: _printed_documents.pop(key, None)),
+        printed,
+    )
+    return printed
+
+
+def batch_document(single_document: DocumentNode, count: int, alias_prefix: str) -> DocumentNode:
+    """
+    Repeat the single top-level field of an operation `count` times in one operation.
+
+    The copies are aliased `<alias_prefix><i>` and each uses its own set of variables, named
+    after the original ones with the index appended (`$args` becomes `$args0`, `$args1`, ...).
+    """
+
+    # Get the operation and its field.
+    assert len(single_document.definitions) == 1, "The document should contain a single operation"
+    operation = single_document.definitions[0]
+    assert isinstance(operation, OperationDefinitionNode), "The definition should be an operation"
+    assert len(operation.selection_set.selections) == 1, "The operation should select one field"
+    field = operation.selection_set.selections[0]
+    assert isinstance(field, FieldNode), "The selection should be a field"
+
+    variable_definitions: List[VariableDefinitionNode] = []
+    fields: List[FieldNode] = []
+    for index in range(count):
+        # Rename the variables of this copy.
+        names: Dict[str, str] = {
+            definition.variable.name.value: f"{definition.variable.name.value}{index}"
+            for definition in operation.variable_definitions
+        }
+        variable_definitions.extend(
+            VariableDefinitionNode(
+                variable=VariableNode(name=NameNode(value=names[definition.variable.name.value])),
+                type=definition.type,
+                default_value=definition.default_value,
+                directives=definition.directives,
+            )
+            for definition in operation.variable_definitions
+        )
+
+        # Copy the field under its alias, pointing the arguments to the renamed variables.
+        arguments: Tuple[ArgumentNode, ...] = tuple(
+            ArgumentNode(
+                name=argument.name,
+                value=(
+                    VariableNode(name=NameNode(value=names[argument.value.name.value]))
+                    if isinstance(argument.value, VariableNode)
+                    else argument.value
+                ),
+            )
+            for argument in field.arguments
+        )
+        fields.append(
+            FieldNode(
+                alias=NameNode(value=f"{alias_prefix}{index}"),
+                name=field.name,
+                arguments=arguments,
+                directives=field.directives,
+                selection_set=field.selection_set,
+            )
+        )
+
+    return DocumentNode(
+        definitions=(
+            OperationDefinitionNode(
+                operation=operation.operation,
+                name=(
+                    NameNode(value=f"{operation.name.value}Batch{count}")
+                    if operation.name is not None
+                    else None
+                ),
+                variable_definitions=tuple(variable_definitions),
+                directives=operation.directives,
+                selection_set=SelectionSetNode(selections=tuple(fields)),
+            ),
+        )
+    )
+
+
+def batch_variables(variables: List[Dict[str, object]]) -> Dict[str, object]:
+    """
+    Merge the variables of the copies made by `batch_document` into one set.
+    """
+
+    return {
+        f"{name}{index}": value
+        for index, copy_variables in enumerate(variables)
+        for name, value in copy_variables.items()
+    }
@@ -0,0 +1,25 @@
+from contextlib import suppress
+from pathlib import Path
+import os
+import tempfile
+
+
+def write_private_file(path: Path, text: str) -> None:
+    """
+    Write the file so that only the owner may read or write it, atomically: the text goes to a
+    temporary file in the same directory first, which then replaces the file, so that a crash or
+    a concurrent reader never sees it half written.
+    """
+
+    # The temporary file is created only readable and writable by the owner.
+    fd, temporary_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temporary_path)
+        raise
@@ -0,0 +1,62 @@
+from typing import Any, Dict, Tuple
+import aiohttp
+import asyncio
+
+from ommnia_sso_cli.data.models import ConnectionConfigModel
+from ommnia_sso_cli.data.transport import RawTransport
+
+try:
+    from gql.transport.httpx import HTTPXAsyncTransport
+    import h2  # noqa: F401, only checked for, httpx speaks HTTP/2 with it.
+    import httpx
+except ImportError as exception:
+    raise ImportError(
+        "The http2 transport needs the http2 extra (poetry install -E http2, or pip install "
+        "'ommnia-sso-cli[http2]')"
+    ) from exception
+
+# How long (in seconds) a request may take, like the default of aiohttp.
+REQUEST_TIMEOUT: float = 300.0
+
+
+class HTTP2Transport(RawTransport, HTTPXAsyncTransport):
+    """
+    An httpx transport speaking HTTP/2, so that all the concurrent requests of an invocation are
+    multiplexed over a single connection (and a single TLS handshake). HTTP/2 is negotiated
+    during the TLS handshake, so plain `http://` endpoints get HTTP/1.1 over the pool instead.
+
+    The connection failures and timeouts of httpx are raised as those of aiohttp and asyncio, so
+    that they are retried and reported like the ones of the default transport.
+    """
+
+    def __init__(self, url: str, connection: ConnectionConfigModel, **kwargs: Any) -> None:
+        super().__init__(
+            url,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=connection.limit or None,
+                max_keepalive_connections=connection.limit or None,
+                keepalive_expiry=connection.keepalive_timeout,
+            ),
+            timeout=REQUEST_TIMEOUT,
+            **kwargs,
+        )
+        self.connection: ConnectionConfigModel = connection
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None
+
+    async def _send(self, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        assert self.client is not None, "The transport should be connected"
+        try:
+            response: httpx.Response = await self.client.post(
+                self.url, content=body, headers=headers
+            )
+        except httpx.TimeoutException as exception:
+            raise asyncio.TimeoutError(str(exception)) from exception
+        except httpx.TransportError as exception:
+            raise aiohttp.ClientConnectionError(str(exception)) from exception
+
+        self.response_headers = response.headers
+        return response.status_code, response.content
@@ -1,9 +1,76 @@
-from pydantic import BaseModel
+from enum import Enum
+from typing import Any, Dict
+from pydantic import BaseModel, model_validator
+
+# The name of the profile configured by the top-level values of the config.
+DEFAULT_PROFILE: str = "default"
+
+
+def _merge(values: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    # Merge the tables key by key, the other values are replaced.
+    merged: Dict[str, Any] = dict(values)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
 
 
 class AuthConfigModel(BaseModel):
     email: str
     password: str
+    # How long (in seconds) before the bearer token expires a new one is obtained in the
+    # background, while the requests keep using the current one.
+    refresh_margin: float = 120.0
+
+
+class TransportKind(str, Enum):
+    # HTTP/1.1 over a pool of connections.
+    AIOHTTP = "aiohttp"
+    # HTTP/2 (negotiated over TLS), multiplexing the requests over one connection, with httpx.
+    HTTP2 = "http2"
+
+
+class ConnectionConfigModel(BaseModel):
+    # The HTTP client the requests are sent with.
+    transport: TransportKind = TransportKind.AIOHTTP
+    # The maximum number of simultaneous connections, 0 for no limit.
+    limit: int = 100
+    # The maximum number of simultaneous connections to the same host, 0 for no limit.
+    limit_per_host: int = 0
+    # How long (in seconds) an idle connection is kept open for reuse.
+    keepalive_timeout: float = 30.0
+    # Whether resolved host names are cached, and for how long (in seconds).
+    dns_cache: bool = True
+    dns_cache_ttl: int = 300
+    # Whether the operations are first sent as the hash of their text (automatic persisted
+    # queries), which costs a server without support for them one extra request per run.
+    persisted_queries: bool = True
+    # Request bodies of at least this many bytes are sent gzip-compressed, 0 to never compress.
+    compression_threshold: int = 0
+
+
+class SigningConfigModel(BaseModel):
+    # The number of worker processes that sign tokens, 0 to sign on the event loop.
+    processes: int = 0
+
+
+class SchedulingConfigModel(BaseModel):
+    # How many times a request is retried after a transient failure (429, 5xx, broken
+    # connection or timeout), waiting a random delay up to base * 2^attempt (at most max) seconds.
+    retries: int = 5
+    backoff_base: float = 0.2
+    backoff_max: float = 10.0
+    # The bounds and the starting point of the number of requests in flight at once, adjusted
+    # to the server while running.
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    # The smoothed latency (as a multiple of the lowest one seen, and in seconds) above which
+    # the server counts as overloaded.
+    latency_tolerance: float = 3.0
+    min_congested_latency: float = 0.5
 
 
 class ConfigModel(BaseModel):
@@ -12,3 +79,31 @@ class ConfigModel(BaseModel):
     client_private_key_path: str
     server_public_key_path: str
     auth: AuthConfigModel
+    connection: ConnectionConfigModel = ConnectionConfigModel()
+    signing: SigningConfigModel = SigningConfigModel()
+    scheduling: SchedulingConfigModel = SchedulingConfigModel()
+    # Other deployments by name, each with the values that differ from the ones above.
+    profiles: Dict[str, Dict[str, Any]] = {}
+
+    @model_validator(mode="after")
+    def check_profiles(self) -> "ConfigModel":
+        # Report an invalid profile when the config is loaded, not once it is used.
+        if DEFAULT_PROFILE in self.profiles:
+            raise ValueError(f"The profile name {DEFAULT_PROFILE!r} is reserved")
+        for name in self.profiles:
+            self.profile(name)
+
+        return self
+
+    def profile(self, name: str) -> "ConfigModel":
+        """
+        Get the config of a profile (raising a `KeyError` if there is none), which is this one
+        for the default profile.
+        """
+
+        if name == DEFAULT_PROFILE:
+            return self
+
+        return ConfigModel.model_validate(
+            _merge(self.model_dump(exclude={"profiles"}), self.profiles[name])
+        )
@@ -0,0 +1,61 @@
+from base64 import urlsafe_b64decode
+from datetime import datetime, timedelta, timezone
+import json
+from typing import Optional
+from pydantic import BaseModel
+
+from ommnia_sso_cli.data.models import ConfigModel
+
+# The lifetime assumed for bearer tokens that do not carry an expiry claim.
+DEFAULT_BEARER_TOKEN_LIFETIME: timedelta = timedelta(minutes=15)
+
+# How long before the expiry a cached bearer token is no longer reused.
+BEARER_TOKEN_EXPIRY_MARGIN: timedelta = timedelta(seconds=60)
+
+
+def bearer_token_expiry(bearer_token: str) -> Optional[datetime]:
+    """
+    Read the expiry claim from a JWT bearer token without verifying it.
+    """
+
+    try:
+        payload: str = bearer_token.split(".")[1]
+        claims = json.loads(urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return datetime.fromtimestamp(int(claims["exp"]), tz=timezone.utc)
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class CredentialsModel(BaseModel):
+    graphql_endpoint_url: str
+    email: str
+    bearer_token: str
+    expires_at: datetime
+
+    @classmethod
+    def from_bearer_token(cls, bearer_token: str, config: ConfigModel) -> "CredentialsModel":
+        expires_at: Optional[datetime] = bearer_token_expiry(bearer_token)
+        if expires_at is None:
+            expires_at = datetime.now(timezone.utc) + DEFAULT_BEARER_TOKEN_LIFETIME
+
+        return cls(
+            graphql_endpoint_url=config.graphql_endpoint_url,
+            email=config.auth.email,
+            bearer_token=bearer_token,
+            expires_at=expires_at,
+        )
+
+    @property
+    def remaining(self) -> timedelta:
+        return self.expires_at - datetime.now(timezone.utc)
+
+    def is_usable_for(self, config: ConfigModel) -> bool:
+        """
+        Check if the credentials belong to the given config and are not close to expiring.
+        """
+
+        return (
+            self.graphql_endpoint_url == config.graphql_endpoint_url
+            and self.email == config.auth.email
+            and self.remaining > BEARER_TOKEN_EXPIRY_MARGIN
+        )
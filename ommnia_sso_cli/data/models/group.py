@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, ConfigDict
 from pydantic.alias_generators import to_camel
 
@@ -10,6 +10,7 @@ class GroupSchema(BaseModel):
         from_attributes=True,
     )
 
+    typename: Literal["GroupSchema"] = "GroupSchema"
     uid: int
     name: str
     description: Optional[str]
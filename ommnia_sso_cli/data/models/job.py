@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Dict
+from pydantic import BaseModel
+
+from ommnia_sso_cli.data.models import DEFAULT_PROFILE
+
+
+class JobModel(BaseModel):
+    """
+    A bulk operation that keeps a copy of its input and a journal of the outcome of each item,
+    so that it can be resumed after an interruption.
+    """
+
+    id: str
+    kind: str
+    # The profile (deployment) the job runs against.
+    profile: str = DEFAULT_PROFILE
+    created_at: datetime
+    # The name of the file the input was copied from.
+    input_name: str
+    # The options the operation was started with, reused when it is resumed.
+    options: Dict[str, Any] = {}
@@ -0,0 +1,45 @@
+from collections import Counter
+from typing import List, Optional
+from pydantic import BaseModel, model_validator
+
+from ommnia_sso_cli.data.models.user import UserStatus
+from ommnia_sso_cli.permissions import Permissions
+
+
+class ManifestGroupModel(BaseModel):
+    name: str
+    description: Optional[str] = None
+    permissions: Permissions = []
+
+
+class ManifestUserModel(BaseModel):
+    name: str
+    email: str
+    # Only used when the user is created.
+    password: str
+    permissions: Permissions = []
+    groups: List[str] = []
+    status: UserStatus = UserStatus.ACTIVE
+
+
+class ManifestModel(BaseModel):
+    """
+    The desired users and groups of a deployment.
+    """
+
+    # Whether the groups that are not in the manifest are deleted.
+    prune_groups: bool = False
+    groups: List[ManifestGroupModel] = []
+    users: List[ManifestUserModel] = []
+
+    @model_validator(mode="after")
+    def check_unique(self) -> "ManifestModel":
+        for kind, keys in [
+            ("group name", [group.name for group in self.groups]),
+            ("user email", [user.email for user in self.users]),
+        ]:
+            duplicates: List[str] = sorted(key for key, count in Counter(keys).items() if count > 1)
+            if duplicates:
+                raise ValueError(f"Duplicate {kind}s: {', '.join(duplicates)}")
+
+        return self
@@ -21,6 +21,14 @@ class UserSchema(BaseModel):
     name: str
 
 
+class MirroredUserSchema(UserSchema):
+    """
+    A regular user as kept in the local mirror, which leaves out the password hash.
+    """
+
+    email: str
+
+
 class RegularUserSchema(UserSchema):
     model_config = ConfigDict(
         alias_generator=to_camel,
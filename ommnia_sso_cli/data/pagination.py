@@ -0,0 +1,69 @@
+from typing import AsyncIterator, Awaitable, Callable, Generic, List, Optional, TypeVar
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+import asyncio
+
+# The default number of items fetched per page.
+DEFAULT_PAGE_SIZE: int = 500
+
+T = TypeVar("T")
+
+
+class PageInfo(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    end_cursor: Optional[str] = None
+    has_next_page: bool
+
+
+class Edge(BaseModel, Generic[T]):
+    node: T
+
+
+class Connection(BaseModel, Generic[T]):
+    """
+    A page of a cursor-paginated (Relay style) GraphQL connection.
+    """
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    edges: List[Edge[T]]
+    page_info: PageInfo
+
+
+async def iter_pages(
+    fetch: Callable[[Optional[str]], Awaitable[Connection[T]]],
+) -> AsyncIterator[T]:
+    """
+    Yield the nodes of all the pages, fetching each page by the cursor of the previous one.
+
+    The next page is already requested while the nodes of the current one are consumed, and only
+    those two pages are held in memory.
+    """
+
+    next_page: Optional[asyncio.Future[Connection[T]]] = asyncio.ensure_future(fetch(None))
+    try:
+        while next_page is not None:
+            page: Connection[T] = await next_page
+
+            # Prefetch the next page before handing out the nodes of this one.
+            next_page = (
+                asyncio.ensure_future(fetch(page.page_info.end_cursor))
+                if page.page_info.has_next_page
+                else None
+            )
+
+            for edge in page.edges:
+                yield edge.node
+    finally:
+        # Do not leave the prefetch running when the consumer stops early.
+        if next_page is not None:
+            next_page.cancel()
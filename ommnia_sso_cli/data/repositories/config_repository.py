@@ -1,12 +1,26 @@
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
+from pydantic import BaseModel, ValidationError
+import os
 import typer
-import tomlkit
 
+from ommnia_sso_cli.data.files import write_private_file
 from ommnia_sso_cli.data.models import ConfigModel
 
 
+class ConfigCacheModel(BaseModel):
+    """
+    The validated config, with the path, modification time and size of the TOML file it was read
+    from.
+    """
+
+    path: str
+    mtime_ns: int
+    size: int
+    config: ConfigModel
+
+
 @dataclass
 class ConfigRepository:
     app_name: str
@@ -19,14 +33,83 @@ class ConfigRepository:
     def config_file_path(self) -> Path:
         return self.app_path / "config.toml"
 
+    @property
+    def config_cache_file_path(self) -> Path:
+        return self.app_path / "config.cache.json"
+
+    def _load_cache(self, stat: os.stat_result) -> Optional[ConfigModel]:
+        try:
+            cache: ConfigCacheModel = ConfigCacheModel.model_validate_json(
+                self.config_cache_file_path.read_bytes()
+            )
+        except (FileNotFoundError, ValidationError):
+            return None
+
+        if (cache.path, cache.mtime_ns, cache.size) != (
+            str(self.config_file_path),
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return None
+
+        return cache.config
+
+    def _save_cache(self, config: ConfigModel, stat: os.stat_result) -> None:
+        # The stat is the one taken before the TOML file was read (or after it was written), so
+        # that an edit in between leaves a cache that does not match the file.
+        cache: ConfigCacheModel = ConfigCacheModel(
+            path=str(self.config_file_path),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            config=config,
+        )
+
+        # The cache holds the password, so only the owner may read or write it. Leave the
+        # defaults out, so that later versions apply their own.
+        write_private_file(self.config_cache_file_path, cache.model_dump_json(exclude_unset=True))
+
     def load(self) -> Optional[ConfigModel]:
+        """
+        Load the config, from the cache unless the TOML file changed since it was written.
+        """
+
+        try:
+            stat: os.stat_result = self.config_file_path.stat()
+        except FileNotFoundError:
+            return None
+
+        config: Optional[ConfigModel] = self._load_cache(stat)
+        if config is not None:
+            return config
+
+        # Parse the TOML file, only imported here since it is slow to import and to parse.
+        import tomlkit
+
         try:
             with self.config_file_path.open("r") as config_file:
-                return ConfigModel.model_validate(tomlkit.load(config_file))
+                config = ConfigModel.model_validate(tomlkit.load(config_file))
         except FileNotFoundError:
             return None
 
+        # Cache the config, unless the app dir is read-only.
+        try:
+            self._save_cache(config, stat)
+        except OSError:
+            pass
+
+        return config
+
     def save(self, config: ConfigModel) -> None:
+        import tomlkit
+
         self.app_path.mkdir(parents=True, exist_ok=True)
         with self.config_file_path.open("w+") as config_file:
             config_file.write(tomlkit.dumps(config.model_dump()))
+            config_file.flush()
+            stat: os.stat_result = os.fstat(config_file.fileno())
+
+        # The config is saved, failing to cache it only makes the next load slower.
+        try:
+            self._save_cache(config, stat)
+        except OSError:
+            pass
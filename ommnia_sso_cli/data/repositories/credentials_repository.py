@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from pydantic import ValidationError
+import typer
+
+from ommnia_sso_cli.data.files import write_private_file
+from ommnia_sso_cli.data.models import DEFAULT_PROFILE
+from ommnia_sso_cli.data.models.credentials import CredentialsModel
+
+
+@dataclass
+class CredentialsRepository:
+    app_name: str
+    profile: str = DEFAULT_PROFILE
+
+    @property
+    def app_path(self) -> Path:
+        return Path(typer.get_app_dir(self.app_name))
+
+    @property
+    def credentials_file_path(self) -> Path:
+        # Each profile keeps its own bearer token.
+        if self.profile == DEFAULT_PROFILE:
+            return self.app_path / "credentials.json"
+        return self.app_path / f"credentials.{self.profile}.json"
+
+    def load(self) -> Optional[CredentialsModel]:
+        try:
+            with self.credentials_file_path.open("r") as credentials_file:
+                return CredentialsModel.model_validate_json(credentials_file.read())
+        except (FileNotFoundError, ValidationError):
+            return None
+
+    def save(self, credentials: CredentialsModel) -> None:
+        self.app_path.mkdir(parents=True, exist_ok=True)
+
+        # The file holds a bearer token, so only the owner may read or write it.
+        write_private_file(self.credentials_file_path, credentials.model_dump_json())
+
+    def clear(self) -> bool:
+        try:
+            self.credentials_file_path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
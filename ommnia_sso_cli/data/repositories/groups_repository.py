@@ -1,14 +1,23 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Annotated, List, Optional, Union
-from gql import Client, gql
+from functools import lru_cache
+from typing import Annotated, AsyncIterator, Dict, List, Literal, Optional, Union
+from gql import Client
 from graphql import DocumentNode
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from pydantic.alias_generators import to_camel
 
+from ommnia_sso_cli.data.client import execute_decoded
+from ommnia_sso_cli.data.decoding import GraphQLResponse, response_adapter
+from ommnia_sso_cli.data.documents import batch_document, batch_variables, document
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE, Connection, iter_pages
 from ommnia_sso_cli.data.models.group import GroupSchema
+from ommnia_sso_cli.timings import span
 
-CREATE_GROUP_MUTATION_DOCUMENT: DocumentNode = gql("""
+# The default number of groups created per request by `GroupsRepository.create_groups`.
+DEFAULT_CREATE_GROUPS_BATCH_SIZE: int = 50
+
+CREATE_GROUP_MUTATION_DOCUMENT: str = """
     mutation CreateGroupMutation($args: CreateGroupMutationArguments!) {
         createGroup(args: $args) {
             typename: __typename
@@ -25,55 +34,238 @@ CREATE_GROUP_MUTATION_DOCUMENT: DocumentNode = gql("""
             }
         }
     }
-""")
+"""
+
+
+class CreateGroupMutationArguments(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    name: str
+    description: Optional[str]
+    permissions: List[str]
+
+
+class CreateGroupMutationFailureCode(str, Enum):
+    PERMISSION_DENIED = "PERMISSION_DENIED"
+    NAME_ALREADY_USED = "NAME_ALREADY_USED"
+
+
+class CreateGroupMutationFailure(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    typename: Literal["CreateGroupMutationFailure"] = "CreateGroupMutationFailure"
+    code: "CreateGroupMutationFailureCode"
+    message: Optional[str] = None
+
+
+CreateGroupResponse = Annotated[
+    Union[GroupSchema, "CreateGroupMutationFailure"],
+    Field(discriminator="typename"),
+]
+
+
+class CreateGroupMutationResponse(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    create_group: CreateGroupResponse
+
+
+CREATE_GROUP_MUTATION_RESPONSE_ADAPTER: TypeAdapter[
+    GraphQLResponse[CreateGroupMutationResponse]
+] = response_adapter(CreateGroupMutationResponse)
+
+# The responses of a batch, by alias.
+CREATE_GROUPS_MUTATION_RESPONSE_ADAPTER: TypeAdapter[
+    GraphQLResponse[Dict[str, CreateGroupResponse]]
+] = response_adapter(Dict[str, CreateGroupResponse])
+
+
+@lru_cache
+def create_groups_mutation_document(count: int) -> DocumentNode:
+    return batch_document(document(CREATE_GROUP_MUTATION_DOCUMENT), count, "g")
+
+
+DELETE_GROUP_MUTATION_DOCUMENT: str = """
+    mutation DeleteGroupMutation($name: String!) {
+        deleteGroup(name: $name) {
+            typename: __typename
+
+            ... on GroupSchema {
+                description
+                name
+                uid
+            }
+
+            ... on DeleteGroupMutationFailure {
+                message
+                code
+            }
+        }
+    }
+"""
+
+
+class DeleteGroupMutationFailureCode(str, Enum):
+    PERMISSION_DENIED = "PERMISSION_DENIED"
+    GROUP_NOT_FOUND = "GROUP_NOT_FOUND"
+
+
+class DeleteGroupMutationFailure(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    typename: Literal["DeleteGroupMutationFailure"] = "DeleteGroupMutationFailure"
+    code: DeleteGroupMutationFailureCode
+    message: Optional[str] = None
+
+
+DeleteGroupResponse = Annotated[
+    Union[GroupSchema, DeleteGroupMutationFailure],
+    Field(discriminator="typename"),
+]
+
+
+class DeleteGroupMutationResponse(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    delete_group: DeleteGroupResponse
+
+
+DELETE_GROUP_MUTATION_RESPONSE_ADAPTER: TypeAdapter[
+    GraphQLResponse[DeleteGroupMutationResponse]
+] = response_adapter(DeleteGroupMutationResponse)
+
+
+GROUPS_QUERY_DOCUMENT: str = """
+    query GroupsQuery($first: Int!, $after: String) {
+        groups(first: $first, after: $after) {
+            edges {
+                node {
+                    typename: __typename
+
+                    ... on GroupSchema {
+                        description
+                        name
+                        uid
+                    }
+                }
+            }
+
+            pageInfo {
+                endCursor
+                hasNextPage
+            }
+        }
+    }
+"""
+
+
+class GroupsQueryResponse(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    groups: Connection[GroupSchema]
+
+
+GROUPS_QUERY_RESPONSE_ADAPTER: TypeAdapter[GraphQLResponse[GroupsQueryResponse]] = (
+    response_adapter(GroupsQueryResponse)
+)
 
 
 @dataclass
 class GroupsRepository:
     client: Client
 
-    class CreateGroupMutationArguments(BaseModel):
-        model_config = ConfigDict(
-            alias_generator=to_camel,
-            populate_by_name=True,
-            from_attributes=True,
-        )
-
-        name: str
-        description: Optional[str]
-        permissions: List[str]
-
-    class CreateGroupMutationFailureCode(str, Enum):
-        PERMISSION_DENIED = "PERMISSION_DENIED"
-        NAME_ALREADY_USED = "NAME_ALREADY_USED"
-
-    class CreateGroupMutationFailure:
-        model_config = ConfigDict(
-            alias_generator=to_camel,
-            populate_by_name=True,
-            from_attributes=True,
-        )
-
-        code: "GroupsRepository.CreateGroupMutationFailureCode"
-        message: Optional[str] = None
-
-    class CreateGroupMutationResponse(BaseModel):
-        model_config = ConfigDict(
-            alias_generator=to_camel,
-            populate_by_name=True,
-            from_attributes=True,
-        )
-
-        create_group: Annotated[
-            Union[GroupSchema, "GroupsRepository.CreateGroupMutationFailure"],
-            Field(discriminator="typename"),
-        ]
-
     async def create_group(
         self, args: CreateGroupMutationArguments
-    ) -> Union[GroupSchema, "GroupsRepository.CreateGroupMutationFailure"]:
-        return GroupsRepository.CreateGroupMutationResponse.model_validate(
-            await self.client.execute_async(
-                CREATE_GROUP_MUTATION_DOCUMENT, {"args": args.model_dump()}
+    ) -> Union[GroupSchema, "CreateGroupMutationFailure"]:
+        with span("create_group"):
+            response: CreateGroupMutationResponse = await execute_decoded(
+                self.client,
+                document(CREATE_GROUP_MUTATION_DOCUMENT),
+                {"args": args.model_dump()},
+                CREATE_GROUP_MUTATION_RESPONSE_ADAPTER,
+            )
+
+        return response.create_group
+
+    async def delete_group(self, name: str) -> Union[GroupSchema, DeleteGroupMutationFailure]:
+        """
+        Delete the group with the given name, returning the deleted group.
+        """
+
+        with span("delete_group"):
+            response: DeleteGroupMutationResponse = await execute_decoded(
+                self.client,
+                document(DELETE_GROUP_MUTATION_DOCUMENT),
+                {"name": name},
+                DELETE_GROUP_MUTATION_RESPONSE_ADAPTER,
             )
-        ).create_group
+
+        return response.delete_group
+
+    async def create_groups(
+        self,
+        args_list: List[CreateGroupMutationArguments],
+        batch_size: int = DEFAULT_CREATE_GROUPS_BATCH_SIZE,
+    ) -> List[Union[GroupSchema, "CreateGroupMutationFailure"]]:
+        """
+        Create the groups with one request per `batch_size` groups, returning the responses in
+        the order of the arguments.
+        """
+
+        responses: List[Union[GroupSchema, "CreateGroupMutationFailure"]] = []
+        for start in range(0, len(args_list), batch_size):
+            batch: List[CreateGroupMutationArguments] = args_list[start : start + batch_size]
+            with span("create_groups"):
+                batch_responses: Dict[str, CreateGroupResponse] = await execute_decoded(
+                    self.client,
+                    create_groups_mutation_document(len(batch)),
+                    batch_variables([{"args": args.model_dump()} for args in batch]),
+                    CREATE_GROUPS_MUTATION_RESPONSE_ADAPTER,
+                )
+
+            responses.extend(batch_responses[f"g{index}"] for index in range(len(batch)))
+
+        return responses
+
+    async def iter_groups(self, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[GroupSchema]:
+        """
+        Iterate over all the groups, fetching them page by page while they are consumed.
+        """
+
+        async def fetch(after: Optional[str]) -> Connection[GroupSchema]:
+            with span("groups page"):
+                response: GroupsQueryResponse = await execute_decoded(
+                    self.client,
+                    document(GROUPS_QUERY_DOCUMENT),
+                    {"first": page_size, "after": after},
+                    GROUPS_QUERY_RESPONSE_ADAPTER,
+                )
+
+            return response.groups
+
+        async for group in iter_pages(fetch):
+            yield group
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, TextIO, TypeVar
+from pydantic import ValidationError
+import json
+import secrets
+import shutil
+import typer
+
+from ommnia_sso_cli.data.models import DEFAULT_PROFILE
+from ommnia_sso_cli.data.models.job import JobModel
+
+T = TypeVar("T")
+
+
+class Journal:
+    """
+    The append-only record of the outcome of the items of a job.
+
+    Items whose last outcome was a transport error (an error without a code) or unknown (their
+    request failed as a whole, after the server may have applied it) are still pending, all the
+    others (including failures like an email that is already used) are completed.
+    """
+
+    def __init__(self, journal_file_path: Path, result_key: Callable[[Any], str]) -> None:
+        self.result_key: Callable[[Any], str] = result_key
+        self.completed: Set[str] = set()
+        # The items whose last outcome was unknown, which an earlier run may have completed.
+        self.uncertain: Set[str] = set()
+        # The number of results of this run that left their item pending.
+        self.left: int = 0
+
+        # Replay the journal, the last outcome of each item wins.
+        try:
+            with journal_file_path.open("r") as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # The last line may have been cut off by a crash.
+                        continue
+                    if entry["done"]:
+                        self.completed.add(entry["key"])
+                    else:
+                        self.completed.discard(entry["key"])
+                    if entry["status"] == "unknown":
+                        self.uncertain.add(entry["key"])
+                    else:
+                        self.uncertain.discard(entry["key"])
+        except FileNotFoundError:
+            pass
+
+        self.journal_file: TextIO = journal_file_path.open("a")
+
+    def pending(self, items: Iterable[T], key: Callable[[T], str]) -> Iterator[T]:
+        """
+        Lazily filter out the items that were completed before.
+        """
+
+        return (item for item in items if key(item) not in self.completed)
+
+    def record(self, result: Any) -> None:
+        status: str = getattr(result, "status")
+        done: bool = (
+            status not in ["error", "unknown"] or getattr(result, "code", None) is not None
+        )
+        if not done:
+            self.left += 1
+
+        # Flush every entry, so that it survives the process being killed.
+        self.journal_file.write(
+            json.dumps({"key": self.result_key(result), "status": status, "done": done}) + "\n"
+        )
+        self.journal_file.flush()
+
+    def close(self) -> None:
+        self.journal_file.close()
+
+
+@dataclass
+class JobsRepository:
+    app_name: str
+
+    @property
+    def app_path(self) -> Path:
+        return Path(typer.get_app_dir(self.app_name))
+
+    @property
+    def jobs_path(self) -> Path:
+        return self.app_path / "jobs"
+
+    def job_path(self, job: JobModel) -> Path:
+        return self.jobs_path / job.id
+
+    def input_file_path(self, job: JobModel) -> Path:
+        return self.job_path(job) / "input"
+
+    def create(
+        self,
+        kind: str,
+        input_file: TextIO,
+        options: Dict[str, Any],
+        profile: str = DEFAULT_PROFILE,
+    ) -> JobModel:
+        """
+        Create a job, with a copy of the input so that it no longer depends on the original file
+        (or stdin) when resumed.
+        """
+
+        job: JobModel = JobModel(
+            id=f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(2)}",
+            kind=kind,
+            profile=profile,
+            created_at=datetime.now(timezone.utc),
+            input_name=str(input_file.name),
+            options=options,
+        )
+
+        # The input may hold passwords, so only the owner may read the job.
+        self.jobs_path.mkdir(parents=True, exist_ok=True)
+        self.job_path(job).mkdir(mode=0o700)
+        with self.input_file_path(job).open("w") as job_input_file:
+            shutil.copyfileobj(input_file, job_input_file)
+        (self.job_path(job) / "job.json").write_text(job.model_dump_json())
+
+        return job
+
+    def load(self, job_id: str) -> Optional[JobModel]:
+        try:
+            return JobModel.model_validate_json(
+                (self.jobs_path / Path(job_id).name / "job.json").read_text()
+            )
+        except (FileNotFoundError, ValidationError):
+            return None
+
+    def iter_jobs(self) -> Iterator[JobModel]:
+        if not self.jobs_path.exists():
+            return
+
+        for job_path in sorted(self.jobs_path.iterdir()):
+            job: Optional[JobModel] = self.load(job_path.name)
+            if job is not None:
+                yield job
+
+    def journal(self, job: JobModel, result_key: Callable[[Any], str]) -> Journal:
+        return Journal(self.job_path(job) / "journal.jsonl", result_key)
+
+    def remove(self, job: JobModel) -> None:
+        shutil.rmtree(self.job_path(job), ignore_errors=True)
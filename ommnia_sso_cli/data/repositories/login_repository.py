@@ -1,13 +1,17 @@
 from dataclasses import dataclass
 from typing import Annotated, Literal, Optional, Union
-from gql import Client, gql
-from graphql import DocumentNode
+from gql import Client
 from enum import Enum
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from pydantic.alias_generators import to_camel
 
+from ommnia_sso_cli.data.client import execute_decoded
+from ommnia_sso_cli.data.decoding import GraphQLResponse, response_adapter
+from ommnia_sso_cli.data.documents import document
+from ommnia_sso_cli.timings import span
 
-CREATE_LOGIN_SESSION_MUTATION: DocumentNode = gql("""
+
+CREATE_LOGIN_SESSION_MUTATION: str = """
     mutation CreateLoginSession($requestToken: String!) {
         createLoginSession(requestToken: $requestToken) {
             typename: __typename
@@ -23,7 +27,7 @@ CREATE_LOGIN_SESSION_MUTATION: DocumentNode = gql("""
             }
         }
     }
-""")
+"""
 
 
 class CreateLoginSessionFailureCode(Enum):
@@ -58,7 +62,12 @@ class CreateLoginSessionMutationResponse(BaseModel):
     create_login_session: CreateLoginSessionResponse
 
 
-REGULAR_LOGIN_MUTATION: DocumentNode = gql("""
+CREATE_LOGIN_SESSION_MUTATION_RESPONSE_ADAPTER: TypeAdapter[
+    GraphQLResponse[CreateLoginSessionMutationResponse]
+] = response_adapter(CreateLoginSessionMutationResponse)
+
+
+REGULAR_LOGIN_MUTATION: str = """
     mutation RegularLoginMutation($request: RegularLoginRequest!) {
         regularLogin(request: $request) {
             typename: __typename
@@ -73,7 +82,7 @@ REGULAR_LOGIN_MUTATION: DocumentNode = gql("""
             }
         }
     }
-""")
+"""
 
 
 class RegularLoginRequest(BaseModel):
@@ -120,20 +129,33 @@ class RegularLoginMutationResponse(BaseModel):
     regular_login: RegularLoginResponse
 
 
+REGULAR_LOGIN_MUTATION_RESPONSE_ADAPTER: TypeAdapter[
+    GraphQLResponse[RegularLoginMutationResponse]
+] = response_adapter(RegularLoginMutationResponse)
+
+
 @dataclass
 class LoginRepository:
     client: Client
 
     async def create_login_session(self, request_token: str) -> CreateLoginSessionResponse:
-        return CreateLoginSessionMutationResponse.model_validate(
-            await self.client.execute_async(
-                CREATE_LOGIN_SESSION_MUTATION, {"requestToken": request_token}
+        with span("create_login_session"):
+            response: CreateLoginSessionMutationResponse = await execute_decoded(
+                self.client,
+                document(CREATE_LOGIN_SESSION_MUTATION),
+                {"requestToken": request_token},
+                CREATE_LOGIN_SESSION_MUTATION_RESPONSE_ADAPTER,
             )
-        ).create_login_session
+
+        return response.create_login_session
 
     async def regular_login(self, request: RegularLoginRequest) -> RegularLoginResponse:
-        return RegularLoginMutationResponse.model_validate(
-            await self.client.execute_async(
-                REGULAR_LOGIN_MUTATION, {"request": request.model_dump()}
+        with span("regular_login"):
+            response: RegularLoginMutationResponse = await execute_decoded(
+                self.client,
+                document(REGULAR_LOGIN_MUTATION),
+                {"request": request.model_dump()},
+                REGULAR_LOGIN_MUTATION_RESPONSE_ADAPTER,
             )
-        ).regular_login
+
+        return response.regular_login
@@ -0,0 +1,211 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+import hashlib
+import os
+import sqlite3
+import typer
+
+from ommnia_sso_cli.data.models.group import GroupSchema
+from ommnia_sso_cli.data.models.user import MirroredUserSchema, RegularUserSchema, UserStatus
+
+# The number of rows written to the mirror per statement while syncing.
+SYNC_CHUNK_SIZE: int = 500
+
+MIRROR_SCHEMA: str = """
+    CREATE TABLE IF NOT EXISTS users (
+        uid INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        status TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS users_email ON users (email);
+    CREATE INDEX IF NOT EXISTS users_status ON users (status);
+
+    CREATE TABLE IF NOT EXISTS groups (
+        uid INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT
+    );
+    CREATE INDEX IF NOT EXISTS groups_name ON groups (name);
+
+    CREATE TABLE IF NOT EXISTS syncs (
+        name TEXT PRIMARY KEY,
+        synced_at TEXT NOT NULL
+    );
+"""
+
+# The password hashes are not mirrored, none of the cached commands show them.
+USER_COLUMNS: List[str] = ["uid", "name", "email", "status"]
+GROUP_COLUMNS: List[str] = ["uid", "name", "description"]
+
+
+class SyncResult(BaseModel):
+    name: str
+    total: int
+    added: int
+    updated: int
+    removed: int
+
+
+def _user_row(user: RegularUserSchema) -> Tuple[Any, ...]:
+    return (user.uid, user.name, user.email, user.status.value)
+
+
+def _group_row(group: GroupSchema) -> Tuple[Any, ...]:
+    return (group.uid, group.name, group.description)
+
+
+@dataclass
+class MirrorRepository:
+    """
+    A local SQLite copy of the users and groups of one SSO deployment, refreshed by `sync` and
+    read without any network access. Only the owner may read or write it.
+    """
+
+    app_name: str
+    graphql_endpoint_url: str
+
+    @property
+    def app_path(self) -> Path:
+        return Path(typer.get_app_dir(self.app_name))
+
+    @property
+    def mirror_file_path(self) -> Path:
+        # Every deployment gets its own mirror.
+        digest: str = hashlib.sha256(self.graphql_endpoint_url.encode()).hexdigest()[:16]
+        return self.app_path / f"mirror-{digest}.sqlite3"
+
+    @property
+    def exists(self) -> bool:
+        return self.mirror_file_path.exists()
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        self.app_path.mkdir(parents=True, exist_ok=True)
+
+        # Create the file only readable and writable by the owner, before SQLite does with the
+        # default mode, and restrict the ones created before.
+        os.close(os.open(self.mirror_file_path, os.O_WRONLY | os.O_CREAT, 0o600))
+        os.chmod(self.mirror_file_path, 0o600)
+
+        connection: sqlite3.Connection = sqlite3.connect(self.mirror_file_path)
+        try:
+            connection.executescript(MIRROR_SCHEMA)
+
+            # Drop the password hashes that earlier versions mirrored, and the pages that held
+            # them.
+            if any(
+                column[1] == "password_hash"
+                for column in connection.execute("PRAGMA table_info(users)")
+            ):
+                connection.executescript("ALTER TABLE users DROP COLUMN password_hash; VACUUM;")
+
+            yield connection
+        finally:
+            connection.close()
+
+    async def _sync(
+        self,
+        connection: sqlite3.Connection,
+        name: str,
+        columns: List[str],
+        items: AsyncIterator[Any],
+        row: Callable[[Any], Tuple[Any, ...]],
+    ) -> SyncResult:
+        # Upsert the rows, only touching the ones that changed, and remember which were seen.
+        seen_table: str = f"seen_{name}"
+        connection.execute(f"CREATE TEMP TABLE {seen_table} (uid INTEGER PRIMARY KEY)")
+        upsert: str = (
+            f"INSERT INTO {name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT (uid) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+            + " WHERE "
+            + " OR ".join(f"{column} IS NOT excluded.{column}" for column in columns[1:])
+        )
+
+        before: int = connection.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        changes: int = 0
+        total: int = 0
+
+        def write(rows: Sequence[Tuple[Any, ...]]) -> int:
+            cursor: sqlite3.Cursor = connection.executemany(upsert, rows)
+            connection.executemany(
+                f"INSERT OR IGNORE INTO {seen_table} (uid) VALUES (?)",
+                ((values[0],) for values in rows),
+            )
+            return cursor.rowcount
+
+        rows: List[Tuple[Any, ...]] = []
+        async for item in items:
+            rows.append(row(item))
+            total += 1
+            if len(rows) >= SYNC_CHUNK_SIZE:
+                changes += write(rows)
+                rows = []
+        if rows:
+            changes += write(rows)
+
+        # Remove the rows that no longer exist.
+        removed: int = connection.execute(
+            f"DELETE FROM {name} WHERE uid NOT IN (SELECT uid FROM {seen_table})"
+        ).rowcount
+        connection.execute(f"DROP TABLE {seen_table}")
+        connection.execute(
+            "INSERT OR REPLACE INTO syncs (name, synced_at) VALUES (?, ?)",
+            (name, datetime.now(timezone.utc).isoformat()),
+        )
+
+        added: int = total - (before - removed)
+        return SyncResult(
+            name=name, total=total, added=added, updated=changes - added, removed=removed
+        )
+
+    async def sync_users(
+        self, connection: sqlite3.Connection, users: AsyncIterator[RegularUserSchema]
+    ) -> SyncResult:
+        return await self._sync(connection, "users", USER_COLUMNS, users, _user_row)
+
+    async def sync_groups(
+        self, connection: sqlite3.Connection, groups: AsyncIterator[GroupSchema]
+    ) -> SyncResult:
+        return await self._sync(connection, "groups", GROUP_COLUMNS, groups, _group_row)
+
+    def synced_at(self, name: str) -> Optional[datetime]:
+        with self.connect() as connection:
+            result = connection.execute(
+                "SELECT synced_at FROM syncs WHERE name = ?", (name,)
+            ).fetchone()
+        return datetime.fromisoformat(result[0]) if result is not None else None
+
+    def iter_users(self, status: Optional[UserStatus] = None) -> Iterator[MirroredUserSchema]:
+        with self.connect() as connection:
+            query: str = f"SELECT {', '.join(USER_COLUMNS)} FROM users"
+            parameters: Tuple[Any, ...] = ()
+            if status is not None:
+                query, parameters = f"{query} WHERE status = ?", (status.value,)
+
+            for values in connection.execute(f"{query} ORDER BY uid", parameters):
+                yield MirroredUserSchema.model_validate(dict(zip(USER_COLUMNS, values)))
+
+    def get_user(self, email: str) -> Optional[MirroredUserSchema]:
+        with self.connect() as connection:
+            values = connection.execute(
+                f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE email = ?", (email,)
+            ).fetchone()
+        return (
+            MirroredUserSchema.model_validate(dict(zip(USER_COLUMNS, values)))
+            if values is not None
+            else None
+        )
+
+    def iter_groups(self) -> Iterator[GroupSchema]:
+        with self.connect() as connection:
+            for values in connection.execute(
+                f"SELECT {', '.join(GROUP_COLUMNS)} FROM groups ORDER BY uid"
+            ):
+                yield GroupSchema.model_validate(dict(zip(GROUP_COLUMNS, values)))
@@ -1,15 +1,24 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Annotated, List, Literal, Optional, Union
-from gql import Client, gql
+from functools import lru_cache
+from typing import Annotated, AsyncIterator, Dict, List, Literal, Optional, Union
+from gql import Client
 from graphql import DocumentNode
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from pydantic.alias_generators import to_camel
 
+from ommnia_sso_cli.data.client import execute_decoded
+from ommnia_sso_cli.data.decoding import GraphQLResponse, response_adapter
+from ommnia_sso_cli.data.documents import batch_document, batch_variables, document
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE, Connection, iter_pages
 from ommnia_sso_cli.data.models.user import RegularUserSchema, UserStatus
+from ommnia_sso_cli.timings import span
 
+# The default number of users created per request by `UsersRepository.create_users`.
+DEFAULT_CREATE_USERS_BATCH_SIZE: int = 50
 
-CREATE_USER_MUTATION_DOCUMENT: DocumentNode = gql("""
+
+CREATE_USER_MUTATION_DOCUMENT: str = """
     mutation CreateUserMutation($args: CreateUserMutationArguments!) {
         createUser(args: $args) {
             typename: __typename
@@ -28,7 +37,7 @@ CREATE_USER_MUTATION_DOCUMENT: DocumentNode = gql("""
             }
         }
     }
-""")
+"""
 
 
 class CreateUserMutationArguments(BaseModel):
@@ -80,6 +89,62 @@ class CreateUserMutationResponse(BaseModel):
     create_user: CreateUserResponse
 
 
+CREATE_USER_MUTATION_RESPONSE_ADAPTER: TypeAdapter[GraphQLResponse[CreateUserMutationResponse]] = (
+    response_adapter(CreateUserMutationResponse)
+)
+
+# The responses of a batch, by alias.
+CREATE_USERS_MUTATION_RESPONSE_ADAPTER: TypeAdapter[
+    GraphQLResponse[Dict[str, CreateUserResponse]]
+] = response_adapter(Dict[str, CreateUserResponse])
+
+
+@lru_cache
+def create_users_mutation_document(count: int) -> DocumentNode:
+    return batch_document(document(CREATE_USER_MUTATION_DOCUMENT), count, "u")
+
+
+USERS_QUERY_DOCUMENT: str = """
+    query UsersQuery($first: Int!, $after: String) {
+        users(first: $first, after: $after) {
+            edges {
+                node {
+                    typename: __typename
+
+                    ... on RegularUserSchema {
+                        email
+                        name
+                        passwordHash
+                        status
+                        uid
+                    }
+                }
+            }
+
+            pageInfo {
+                endCursor
+                hasNextPage
+            }
+        }
+    }
+"""
+
+
+class UsersQueryResponse(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+    users: Connection[RegularUserSchema]
+
+
+USERS_QUERY_RESPONSE_ADAPTER: TypeAdapter[GraphQLResponse[UsersQueryResponse]] = response_adapter(
+    UsersQueryResponse
+)
+
+
 @dataclass
 class UsersRepository:
     client: Client
@@ -87,8 +152,58 @@ class UsersRepository:
     async def create_user(
         self, args: CreateUserMutationArguments
     ) -> Union[RegularUserSchema, "CreateUserMutationFailure"]:
-        return CreateUserMutationResponse.model_validate(
-            await self.client.execute_async(
-                CREATE_USER_MUTATION_DOCUMENT, {"args": args.model_dump()}
+        with span("create_user"):
+            response: CreateUserMutationResponse = await execute_decoded(
+                self.client,
+                document(CREATE_USER_MUTATION_DOCUMENT),
+                {"args": args.model_dump()},
+                CREATE_USER_MUTATION_RESPONSE_ADAPTER,
             )
-        ).create_user
+
+        return response.create_user
+
+    async def create_users(
+        self,
+        args_list: List[CreateUserMutationArguments],
+        batch_size: int = DEFAULT_CREATE_USERS_BATCH_SIZE,
+    ) -> List[Union[RegularUserSchema, "CreateUserMutationFailure"]]:
+        """
+        Create the users with one request per `batch_size` users, returning the responses in the
+        order of the arguments.
+        """
+
+        responses: List[Union[RegularUserSchema, "CreateUserMutationFailure"]] = []
+        for start in range(0, len(args_list), batch_size):
+            batch: List[CreateUserMutationArguments] = args_list[start : start + batch_size]
+            with span("create_users"):
+                batch_responses: Dict[str, CreateUserResponse] = await execute_decoded(
+                    self.client,
+                    create_users_mutation_document(len(batch)),
+                    batch_variables([{"args": args.model_dump()} for args in batch]),
+                    CREATE_USERS_MUTATION_RESPONSE_ADAPTER,
+                )
+
+            responses.extend(batch_responses[f"u{index}"] for index in range(len(batch)))
+
+        return responses
+
+    async def iter_users(
+        self, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncIterator[RegularUserSchema]:
+        """
+        Iterate over all the users, fetching them page by page while they are consumed.
+        """
+
+        async def fetch(after: Optional[str]) -> Connection[RegularUserSchema]:
+            with span("users page"):
+                response: UsersQueryResponse = await execute_decoded(
+                    self.client,
+                    document(USERS_QUERY_DOCUMENT),
+                    {"first": page_size, "after": after},
+                    USERS_QUERY_RESPONSE_ADAPTER,
+                )
+
+            return response.users
+
+        async for user in iter_pages(fetch):
+            yield user
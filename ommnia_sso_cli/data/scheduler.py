@@ -0,0 +1,174 @@
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, TypeVar
+from gql.transport.exceptions import TransportServerError
+import aiohttp
+import asyncio
+import random
+import time
+
+from ommnia_sso_cli.data.models import SchedulingConfigModel
+from ommnia_sso_cli.timings import span
+
+T = TypeVar("T")
+
+# The weight of the latest request in the smoothed latency.
+LATENCY_SMOOTHING: float = 0.2
+
+# The statuses of the responses that mean the server turned the request away without processing
+# it.
+UNPROCESSED_STATUSES: List[int] = [429, 503]
+
+
+def is_transient(exception: BaseException) -> bool:
+    """
+    Check if a request failed in a way that may not happen again: the server throttling or
+    failing (429 or 5xx), the connection breaking, or the request timing out.
+
+    GraphQL errors and the failure responses of the mutations (like an email that is already
+    used) are definitive, the latter are not even exceptions.
+    """
+
+    if isinstance(exception, TransportServerError):
+        return exception.code is not None and (exception.code == 429 or exception.code >= 500)
+
+    return isinstance(
+        exception,
+        (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError),
+    )
+
+
+def is_unprocessed(exception: BaseException) -> bool:
+    """
+    Check if a request failed transiently before the server processed it: the server throttling
+    or being unavailable (429 or 503), or the connection failing to open. Only these failures
+    are safe to retry for a mutation, after the others it may have been applied.
+    """
+
+    if isinstance(exception, TransportServerError):
+        return exception.code in UNPROCESSED_STATUSES
+
+    return isinstance(exception, aiohttp.ClientConnectorError)
+
+
+class Scheduler:
+    """
+    Runs the requests of a client with a concurrency limit that adapts to the server, and retries
+    the transient failures with exponential backoff and jitter. Requests that are not idempotent
+    (the mutations) are only retried when the server did not process them.
+
+    The limit grows by one per request until the server first shows signs of overload (slow start),
+    then by one per window of `limit` requests, and is halved (at most once per round trip) when
+    a request fails transiently or the smoothed latency grows beyond the tolerance.
+    """
+
+    def __init__(self, config: SchedulingConfigModel) -> None:
+        self.config: SchedulingConfigModel = config
+        self.limit: float = float(config.initial_concurrency)
+        self.in_flight: int = 0
+        self.slow_start: bool = True
+        self.min_latency: Optional[float] = None
+        self.smoothed_latency: Optional[float] = None
+        self.decreased_at: float = 0.0
+        self.random: random.Random = random.Random()
+        self.waiters: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def congested(self) -> bool:
+        if self.min_latency is None or self.smoothed_latency is None:
+            return False
+        return self.smoothed_latency > max(
+            self.min_latency * self.config.latency_tolerance, self.config.min_congested_latency
+        )
+
+    def increase(self) -> None:
+        self.limit = min(
+            self.limit + (1.0 if self.slow_start else 1.0 / self.limit),
+            float(self.config.max_concurrency),
+        )
+
+    def decrease(self) -> None:
+        # The requests already in flight when the limit was last halved are still answered from
+        # the overload, so only halve once per round trip.
+        now: float = time.monotonic()
+        if now - self.decreased_at < (self.smoothed_latency or 0.0):
+            return
+
+        self.slow_start = False
+        self.decreased_at = now
+        self.limit = max(self.limit / 2.0, float(self.config.min_concurrency))
+
+    def observe(self, latency: float) -> None:
+        self.min_latency = latency if self.min_latency is None else min(self.min_latency, latency)
+        self.smoothed_latency = (
+            latency
+            if self.smoothed_latency is None
+            else (1.0 - LATENCY_SMOOTHING) * self.smoothed_latency + LATENCY_SMOOTHING * latency
+        )
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: a random delay up to the exponentially growing cap.
+        return self.random.uniform(
+            0.0, min(self.config.backoff_max, self.config.backoff_base * 2.0**attempt)
+        )
+
+    async def acquire(self) -> None:
+        # Wait (in order of arrival) for a free slot under the current limit.
+        while self.in_flight >= int(self.limit):
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+        # Wake up as many waiters as there are free slots, the limit may have grown.
+        for _ in range(int(self.limit) - self.in_flight):
+            while self.waiters and self.waiters[0].done():
+                self.waiters.popleft()
+            if not self.waiters:
+                break
+            self.waiters.popleft().set_result(None)
+
+    async def _attempt(self, request: Callable[[], Awaitable[T]]) -> T:
+        await self.acquire()
+
+        start: float = time.monotonic()
+        try:
+            result: T = await request()
+        except BaseException as exception:
+            if is_transient(exception):
+                self.decrease()
+            raise
+        else:
+            self.observe(time.monotonic() - start)
+            if self.congested:
+                self.decrease()
+            else:
+                self.increase()
+            return result
+        finally:
+            self.release()
+
+    async def run(self, request: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        """
+        Run the request once a slot is free, retrying it while it fails transiently.
+        """
+
+        retriable: Callable[[BaseException], bool] = is_transient if idempotent else is_unprocessed
+
+        attempt: int = 0
+        while True:
+            try:
+                return await self._attempt(request)
+            except Exception as exception:
+                if not retriable(exception) or attempt >= self.config.retries:
+                    raise
+
+            with span("backoff"):
+                await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
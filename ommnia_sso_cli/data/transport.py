@@ -0,0 +1,239 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Set, Tuple
+from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.async_transport import AsyncTransport
+from gql.transport.exceptions import TransportClosed
+from graphql import DocumentNode
+import aiohttp
+import gzip
+import json
+import time
+
+from ommnia_sso_cli.data.documents import PrintedDocument, printed_document
+from ommnia_sso_cli.data.models import ConnectionConfigModel, TransportKind
+from ommnia_sso_cli.timings import TIMINGS
+
+# The endpoints found not to support persisted queries, which get the full text of every
+# operation from then on. Shared by all the transports of the process.
+_persisted_queries_unsupported: Set[str] = set()
+
+# The gzip level of the compressed request bodies, favoring speed over size.
+GZIP_COMPRESSION_LEVEL: int = 5
+
+
+class PersistedQueryAnswer(str, Enum):
+    NOT_FOUND = "not_found"
+    NOT_SUPPORTED = "not_supported"
+
+
+def _persisted_query_answer(body: bytes) -> Optional[PersistedQueryAnswer]:
+    """
+    Tell if the response to an operation sent as its hash only asks for the full text (the
+    server does not know the hash yet, or says that it does not support persisted queries), or
+    is to be handled like any other response (including the failures, which may be retried).
+
+    Other bad requests are the failures of the operation itself (like invalid variables, which
+    some servers answer with a 400), so they do not turn persisted queries off.
+    """
+
+    # Most responses are results, which do not need to be decoded here.
+    if b"PersistedQuery" not in body and b"PERSISTED_QUERY" not in body:
+        return None
+
+    try:
+        result: Any = json.loads(body)
+    except ValueError:
+        result = None
+
+    errors: Any = result.get("errors") if isinstance(result, dict) else None
+    for error in errors if isinstance(errors, list) else []:
+        if not isinstance(error, dict):
+            continue
+        code: Any = (error.get("extensions") or {}).get("code")
+        if code == "PERSISTED_QUERY_NOT_FOUND" or error.get("message") == "PersistedQueryNotFound":
+            return PersistedQueryAnswer.NOT_FOUND
+        if (
+            code == "PERSISTED_QUERY_NOT_SUPPORTED"
+            or error.get("message") == "PersistedQueryNotSupported"
+        ):
+            return PersistedQueryAnswer.NOT_SUPPORTED
+
+    return None
+
+
+def _timings_trace_config() -> aiohttp.TraceConfig:
+    """
+    Record the DNS resolution and the connection setup (TCP and TLS) of the requests as spans.
+    """
+
+    trace_config: aiohttp.TraceConfig = aiohttp.TraceConfig()
+
+    async def on_dns_resolvehost_start(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        TIMINGS.record("dns", context.dns_start, time.perf_counter())
+
+    async def on_connection_create_start(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        context.connection_start = time.perf_counter()
+
+    async def on_connection_create_end(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        TIMINGS.record("connection", context.connection_start, time.perf_counter())
+
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+class RawTransport(ABC):
+    """
+    The part of the transports that posts an operation and returns the raw response, for the
+    client to decode it straight into the models (see `execute_raw`). The transports only
+    implement `_send`.
+
+    With `persisted_queries`, an operation is first sent as the SHA-256 hash of its text, and the
+    text is only sent when the server does not know it yet (automatic persisted queries). An
+    endpoint that turns out not to support them gets the text from then on. Bodies of at least
+    `compression_threshold` bytes are sent gzip-compressed.
+    """
+
+    url: str
+    connection: ConnectionConfigModel
+
+    @property
+    @abstractmethod
+    def connected(self) -> bool: ...
+
+    @property
+    def persisted_queries(self) -> bool:
+        return self.connection.persisted_queries and self.url not in _persisted_queries_unsupported
+
+    @abstractmethod
+    async def _send(self, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        """
+        Post the encoded body with the headers, and return the status and the body of the
+        response.
+        """
+
+    async def _post(
+        self, payload: Dict[str, Any], extra_args: Optional[Dict[str, Any]]
+    ) -> Tuple[int, bytes]:
+        if not self.connected:
+            raise TransportClosed("Transport is not connected")
+
+        # Encode the payload, compressing it when it is large (like batches of mutations).
+        body: bytes = json.dumps(payload).encode()
+        headers: Dict[str, str] = {
+            **((extra_args or {}).get("headers") or {}),
+            "Content-Type": "application/json",
+        }
+        threshold: int = self.connection.compression_threshold
+        if threshold and len(body) >= threshold:
+            body = gzip.compress(body, compresslevel=GZIP_COMPRESSION_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+        return await self._send(body, headers)
+
+    async def execute_raw(
+        self,
+        document: DocumentNode,
+        variable_values: Optional[Dict[str, Any]] = None,
+        extra_args: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, bytes]:
+        """
+        Post the operation and return the status and the body of the response as they are, to be
+        decoded by the caller.
+        """
+
+        printed: PrintedDocument = printed_document(document)
+        payload: Dict[str, Any] = {}
+        if variable_values:
+            payload["variables"] = variable_values
+
+        if not self.persisted_queries:
+            return await self._post({"query": printed.query, **payload}, extra_args)
+
+        # Send the hash of the operation alone first.
+        payload["extensions"] = {
+            "persistedQuery": {"version": 1, "sha256Hash": printed.sha256_hash}
+        }
+        status, body = await self._post(payload, extra_args)
+        answer: Optional[PersistedQueryAnswer] = _persisted_query_answer(body)
+        if answer is None:
+            return status, body
+
+        # Send the text too, with the hash for the server to register it, or without it for a
+        # server that does not support persisted queries.
+        if answer == PersistedQueryAnswer.NOT_SUPPORTED:
+            _persisted_queries_unsupported.add(self.url)
+            del payload["extensions"]
+        return await self._post({"query": printed.query, **payload}, extra_args)
+
+
+class PooledAIOHTTPTransport(RawTransport, AIOHTTPTransport):
+    """
+    An AIOHTTP transport whose session keeps its connections alive according to the connection
+    config, so that one connected transport serves all the requests of an invocation.
+    """
+
+    def __init__(self, url: str, connection: ConnectionConfigModel, **kwargs: Any) -> None:
+        super().__init__(url, **kwargs)
+        self.connection: ConnectionConfigModel = connection
+
+    async def connect(self) -> None:
+        # The connector has to be created on the running event loop.
+        if self.session is None:
+            self.client_session_args = {
+                **(self.client_session_args or {}),
+                "connector": aiohttp.TCPConnector(
+                    limit=self.connection.limit,
+                    limit_per_host=self.connection.limit_per_host,
+                    keepalive_timeout=self.connection.keepalive_timeout,
+                    use_dns_cache=self.connection.dns_cache,
+                    ttl_dns_cache=self.connection.dns_cache_ttl,
+                ),
+            }
+
+            # Time the connection setup too, when the phases of the run are recorded.
+            if TIMINGS.enabled:
+                self.client_session_args["trace_configs"] = [_timings_trace_config()]
+
+        await super().connect()
+
+    @property
+    def connected(self) -> bool:
+        return self.session is not None
+
+    async def _send(self, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        assert self.session is not None, "The transport should be connected"
+        async with self.session.post(
+            self.url, ssl=self.ssl, data=body, headers=headers
+        ) as response:
+            self.response_headers = response.headers
+            return response.status, await response.read()
+
+
+def create_transport(url: str, connection: ConnectionConfigModel) -> AsyncTransport:
+    """
+    Create the transport selected by the connection config.
+    """
+
+    if connection.transport == TransportKind.HTTP2:
+        # httpx is an optional dependency, only imported when the transport is selected.
+        from ommnia_sso_cli.data.http2_transport import HTTP2Transport
+
+        return HTTP2Transport(url, connection)
+
+    return PooledAIOHTTPTransport(url, connection)
@@ -0,0 +1,87 @@
+from contextvars import ContextVar
+from typing import Any, List, Optional
+import click
+import os
+import typer
+
+from ommnia_sso_cli.errors import SSOAdminError
+
+# The commands that only make sense as a top-level invocation, not from a shell or the agent.
+TOP_LEVEL_COMMANDS: List[str] = ["agent", "setup", "shell"]
+
+# The working directory of the client a command is run for (by the agent), which the relative
+# paths given to the command are relative to.
+CALLER_DIRECTORY: ContextVar[Optional[str]] = ContextVar("caller_directory", default=None)
+
+
+class _CallerPath(click.ParamType):
+    """
+    A path or file type whose relative values are taken relative to the caller directory (if
+    any) before they are converted, and so checked and opened.
+    """
+
+    def __init__(self, wrapped: click.ParamType) -> None:
+        self.wrapped: click.ParamType = wrapped
+        self.name: str = wrapped.name
+
+    def convert(
+        self, value: Any, param: Optional[click.Parameter], ctx: Optional[click.Context]
+    ) -> Any:
+        directory: Optional[str] = CALLER_DIRECTORY.get()
+        if directory is not None and isinstance(value, (str, os.PathLike)) and value != "-":
+            # Absolute paths are kept as they are.
+            value = os.path.join(directory, value)
+
+        return self.wrapped.convert(value, param, ctx)
+
+    def get_metavar(self, param: click.Parameter) -> Optional[str]:
+        return self.wrapped.get_metavar(param)
+
+    def shell_complete(self, ctx: click.Context, param: click.Parameter, incomplete: str) -> Any:
+        return self.wrapped.shell_complete(ctx, param, incomplete)
+
+
+def _resolve_caller_paths(command: click.Command) -> None:
+    # Wrap the path and file types of the command and its sub commands.
+    for param in command.params:
+        if isinstance(param.type, (click.Path, click.File)):
+            param.type = _CallerPath(param.type)
+
+    if isinstance(command, click.Group):
+        for sub_command in command.commands.values():
+            _resolve_caller_paths(sub_command)
+
+
+def dispatch(group: click.Group, ctx: click.Context, args: List[str]) -> int:
+    """
+    Run a sub command of the group in-process, on the already initialized state, and return its
+    exit code instead of exiting.
+    """
+
+    # Look up the command.
+    command: Optional[click.Command] = group.get_command(ctx, args[0])
+    if command is None or args[0] in TOP_LEVEL_COMMANDS:
+        typer.secho(f"Unknown command: {args[0]}", fg="red", err=True)
+        return 2
+
+    # Take the paths relative to the directory of the client the command is run for.
+    if CALLER_DIRECTORY.get() is not None:
+        _resolve_caller_paths(command)
+
+    # Run the command, turning exits and failures into exit codes.
+    try:
+        result = command.main(args[1:], prog_name=args[0], standalone_mode=False)
+        return result if isinstance(result, int) else 0
+    except click.ClickException as exception:
+        exception.show()
+        return exception.exit_code
+    except click.exceptions.Exit as exception:
+        return exception.exit_code
+    except click.Abort:
+        return 1
+    except SSOAdminError as exception:
+        typer.secho(str(exception), fg="red", err=True)
+        return -1
+    except Exception as exception:
+        typer.secho(f"{type(exception).__name__}: {exception}", fg="red", err=True)
+        return 1
@@ -0,0 +1,40 @@
+from enum import Enum
+from typing import Optional
+
+
+class SSOAdminError(Exception):
+    """
+    The base of the errors raised by `SSOAdminClient` when the API answers with a failure.
+
+    Failures to reach the API are raised as they are, as the transport errors of gql and aiohttp.
+    """
+
+
+class OperationFailedError(SSOAdminError):
+    """
+    The API answered an operation with a failure response, holding its code and message.
+    """
+
+    def __init__(self, operation: str, code: Enum, message: Optional[str]) -> None:
+        super().__init__(f"Failed to {operation} ({code}): {message}")
+        self.operation: str = operation
+        self.code: Enum = code
+        self.message: Optional[str] = message
+
+
+class LoginError(OperationFailedError):
+    """
+    Creating a login session or logging in with it failed.
+    """
+
+
+class CreateUserError(OperationFailedError):
+    pass
+
+
+class CreateGroupError(OperationFailedError):
+    pass
+
+
+class DeleteGroupError(OperationFailedError):
+    pass
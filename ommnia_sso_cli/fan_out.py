@@ -0,0 +1,344 @@
+from contextvars import copy_context
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO
+import click
+import csv
+import io
+import json
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import typer
+
+from ommnia_sso_cli.bootstrap import load_config
+from ommnia_sso_cli.data.models import DEFAULT_PROFILE, ConfigModel
+from ommnia_sso_cli.dispatch import TOP_LEVEL_COMMANDS, dispatch
+from ommnia_sso_cli.output import OUTPUT_FORMAT, OutputFormat
+from ommnia_sso_cli.state import PROFILE
+from ommnia_sso_cli.streams import ContextStream
+
+# Replaced by the profile name in the arguments of a command run against several profiles, so
+# that each one writes its own files (like `--report results.{profile}.jsonl`).
+PROFILE_PLACEHOLDER: str = "{profile}"
+
+# The separator of the profile names given to `--profile`.
+PROFILE_SEPARATOR: str = ","
+
+
+def resolve_profiles(profiles: Optional[str], all_profiles: bool) -> List[str]:
+    """
+    Get the names of the profiles selected by the `--profile` and `--all-profiles` options,
+    checking that they are configured.
+    """
+
+    config: ConfigModel = load_config()
+    if all_profiles:
+        return [DEFAULT_PROFILE, *config.profiles]
+
+    names: List[str] = []
+    for name in (profiles or DEFAULT_PROFILE).split(PROFILE_SEPARATOR):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name != DEFAULT_PROFILE and name not in config.profiles:
+            raise typer.BadParameter(f"There is no profile {name!r}", param_hint="'--profile'")
+        names.append(name)
+
+    return names
+
+
+class _SharedStdin:
+    """
+    The standard input of the profiles, copied to a temporary file (only readable by the owner)
+    once one of them first uses it, which each profile then reads with its own file handle.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream: TextIO = stream
+        self._lock: threading.Lock = threading.Lock()
+        self._path: Optional[str] = None
+        self._files: List[TextIO] = []
+
+    @property
+    def name(self) -> str:
+        return getattr(self._stream, "name", "<stdin>")
+
+    def open(self) -> TextIO:
+        with self._lock:
+            if self._path is None:
+                # Copy the text as it is, in chunks, whatever its line endings.
+                with tempfile.NamedTemporaryFile(
+                    "w", encoding="utf-8", errors="surrogateescape", newline="", delete=False
+                ) as file:
+                    self._path = file.name
+                    shutil.copyfileobj(self._stream, file)
+
+            file = open(self._path, encoding="utf-8", errors="surrogateescape", newline="")
+            self._files.append(file)
+            return file
+
+    def close(self) -> None:
+        for file in self._files:
+            file.close()
+        if self._path is not None:
+            os.unlink(self._path)
+
+
+class _ProfileStdin:
+    """
+    The handle on the shared standard input for a profile, only opened once it is used.
+    """
+
+    def __init__(self, shared: _SharedStdin) -> None:
+        self._shared: _SharedStdin = shared
+        self._stream: Optional[TextIO] = None
+
+    @property
+    def name(self) -> str:
+        # Keep the name of the stream, like `<stdin>`, which the bulk jobs record.
+        return self._shared.name
+
+    @property
+    def stream(self) -> TextIO:
+        if self._stream is None:
+            self._stream = self._shared.open()
+        return self._stream
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.stream)
+
+
+class _RunOutput(io.TextIOBase):
+    """
+    A standard stream of a run, which passes its complete lines on as they are written, or holds
+    everything until the run finishes (without `forward`), for the outputs that can only be
+    shown as a whole.
+
+    With `quoted`, a line break inside double quotes does not end the line, like in CSV.
+    """
+
+    def __init__(
+        self, forward: Optional[Callable[[List[str]], None]] = None, quoted: bool = False
+    ) -> None:
+        super().__init__()
+        self.forward: Optional[Callable[[List[str]], None]] = forward
+        self.quoted: bool = quoted
+        self.held: io.StringIO = io.StringIO()
+        self._pending: str = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if self.forward is None:
+            return self.held.write(data)
+
+        # Pass on the lines completed by the data, in one go.
+        self._pending += data
+        lines: List[str] = []
+        start: int = 0
+        while (end := self._pending.find("\n", start)) != -1:
+            start = end + 1
+            if self.quoted and self._pending.count('"', 0, start) % 2:
+                continue
+            lines.append(self._pending[:start])
+            self._pending, start = self._pending[start:], 0
+        if lines:
+            self.forward(lines)
+
+        return len(data)
+
+    def finish(self) -> None:
+        # Pass on the last line, even without a line break.
+        if self.forward is not None and self._pending:
+            self.forward([self._pending])
+            self._pending = ""
+
+
+@dataclass
+class ProfileRun:
+    """
+    The run of a command against one profile, with its exit code and output.
+    """
+
+    profile: str
+    stdout: _RunOutput
+    stderr: _RunOutput
+    exit_code: int = 0
+    duration: float = 0.0
+
+
+class _Aggregator:
+    """
+    Writes the outputs of the runs tagged with their profile, in a way that suits the output
+    format: a `profile` field per JSONL record and a `profile` column in CSV, written as soon as
+    the runs write them, and a heading per profile for tables and one JSON object keyed by
+    profile (written at the end) for JSON, which are only complete once a run finishes. The
+    messages of the runs are prefixed with their profile.
+    """
+
+    def __init__(self, output_format: OutputFormat, stdout: TextIO, stderr: TextIO) -> None:
+        self.output_format: OutputFormat = output_format
+        self.stdout: TextIO = stdout
+        self.stderr: TextIO = stderr
+        # The runs write from their own threads.
+        self.lock: threading.Lock = threading.Lock()
+        self.csv_header: bool = False
+        self.csv_headers_seen: Set[str] = set()
+        self.documents: Dict[str, Any] = {}
+
+    def run(self, profile: str) -> ProfileRun:
+        streamed: bool = self.output_format in [OutputFormat.JSONL, OutputFormat.CSV]
+        return ProfileRun(
+            profile,
+            stdout=_RunOutput(
+                partial(self._write_records, profile) if streamed else None,
+                quoted=self.output_format == OutputFormat.CSV,
+            ),
+            stderr=_RunOutput(partial(self._write_messages, profile)),
+        )
+
+    def _write_messages(self, profile: str, lines: List[str]) -> None:
+        text: str = "".join(f"[{profile}] {line.rstrip()}\n" for line in lines if line.strip())
+        with self.lock:
+            self.stderr.write(text)
+            self.stderr.flush()
+
+    def _write_records(self, profile: str, lines: List[str]) -> None:
+        records: List[str] = []
+        for line in lines:
+            if self.output_format == OutputFormat.JSONL:
+                try:
+                    record: Any = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    line = json.dumps({"profile": profile, **record})
+                records.append(line if line.endswith("\n") else f"{line}\n")
+            elif profile not in self.csv_headers_seen:
+                # Keep the header of the first profile only.
+                self.csv_headers_seen.add(profile)
+                if not self.csv_header:
+                    records.append(f"profile,{line}")
+                    self.csv_header = True
+            else:
+                records.append(f"{_csv_cell(profile)},{line}")
+
+        with self.lock:
+            self.stdout.write("".join(records))
+            self.stdout.flush()
+
+    def add(self, run: ProfileRun) -> None:
+        run.stdout.finish()
+        run.stderr.finish()
+
+        output: str = run.stdout.held.getvalue()
+        with self.lock:
+            if self.output_format == OutputFormat.JSON:
+                try:
+                    self.documents[run.profile] = json.loads(output) if output.strip() else None
+                except ValueError:
+                    self.documents[run.profile] = output
+            elif self.output_format == OutputFormat.TABLE and output:
+                typer.secho(f"== {run.profile} ==", bold=True, file=self.stdout)
+                self.stdout.write(output)
+                self.stdout.flush()
+
+    def close(self) -> None:
+        if self.output_format == OutputFormat.JSON:
+            json.dump(self.documents, self.stdout, indent=2)
+            self.stdout.write("\n")
+            self.stdout.flush()
+
+
+def _csv_cell(value: str) -> str:
+    cell: io.StringIO = io.StringIO()
+    csv.writer(cell, lineterminator="").writerow([value])
+    return cell.getvalue()
+
+
+def _run(
+    group: click.Group,
+    ctx: click.Context,
+    args: List[str],
+    run: ProfileRun,
+    stdin: _ProfileStdin,
+    streams: List[ContextStream],
+    finished: "queue.Queue[ProfileRun]",
+) -> None:
+    # Run the command against the profile, with its own copy of the standard streams.
+    PROFILE.set(run.profile)
+    start: float = time.monotonic()
+    try:
+        with (
+            streams[0].redirect(stdin),  # type: ignore[arg-type]
+            streams[1].redirect(run.stdout),
+            streams[2].redirect(run.stderr),
+        ):
+            run.exit_code = dispatch(
+                group, ctx, [arg.replace(PROFILE_PLACEHOLDER, run.profile) for arg in args]
+            )
+    finally:
+        run.duration = time.monotonic() - start
+        finished.put(run)
+
+
+def fan_out(group: click.Group, ctx: click.Context, profiles: List[str], args: List[str]) -> int:
+    """
+    Run a sub command of the group against several profiles at once, each in its own thread
+    (with its own client, login and event loop), and aggregate their outputs. Returns the exit
+    code of the first profile that failed, or 0.
+    """
+
+    if args[0] in TOP_LEVEL_COMMANDS:
+        typer.secho(f"{args[0]} cannot run against several profiles", fg="red", err=True)
+        return 2
+
+    # Capture the standard streams of each profile, only while they run.
+    streams: List[ContextStream] = [
+        ContextStream("stdin", sys.stdin),
+        ContextStream("stdout", sys.stdout),
+        ContextStream("stderr", sys.stderr),
+    ]
+    shared_stdin: _SharedStdin = _SharedStdin(sys.stdin)
+    aggregator: _Aggregator = _Aggregator(OUTPUT_FORMAT.get(), sys.stdout, sys.stderr)
+    sys.stdin, sys.stdout, sys.stderr = streams  # type: ignore[assignment]
+    try:
+        # Start the runs, each in a copy of the current context, which holds the output format.
+        finished: "queue.Queue[ProfileRun]" = queue.Queue()
+        runs: List[ProfileRun] = [aggregator.run(profile) for profile in profiles]
+        for run in runs:
+            threading.Thread(
+                target=copy_context().run,
+                args=(_run, group, ctx, args, run, _ProfileStdin(shared_stdin), streams, finished),
+                daemon=True,
+            ).start()
+
+        # Write the rest of the outputs in the order the runs finish.
+        for _ in runs:
+            aggregator.add(finished.get())
+        aggregator.close()
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = (stream.current for stream in streams)
+        shared_stdin.close()
+
+    # Summarize the runs.
+    for run in runs:
+        if run.exit_code == 0:
+            typer.secho(f"{run.profile}: done in {run.duration:.2f}s", fg="green", err=True)
+        else:
+            typer.secho(
+                f"{run.profile}: failed (exit code {run.exit_code}) in {run.duration:.2f}s",
+                fg="red",
+                err=True,
+            )
+
+    return next((run.exit_code for run in runs if run.exit_code != 0), 0)
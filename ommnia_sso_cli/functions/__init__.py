@@ -1,2 +1,7 @@
 from .create_login_session import create_login_session  # noqa
 from .regular_login import regular_login  # noqa
+from .authenticate import authenticate  # noqa
+from .import_users import import_users  # noqa
+from .create_login_sessions import create_login_sessions  # noqa
+from .sync_mirror import sync_mirror  # noqa
+from .reconcile import apply, plan  # noqa
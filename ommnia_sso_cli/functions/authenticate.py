@@ -0,0 +1,6 @@
+from ommnia_sso_cli.state import State
+
+
+async def authenticate(force: bool = False) -> None:
+    # Authorize the client of the state with the cached bearer token, or log in.
+    await State.instance().admin.authenticate(force)
@@ -0,0 +1,115 @@
+from typing import Callable, Iterable, List, Literal, Optional, Tuple, Union
+from gql.transport.exceptions import TransportError
+from pydantic import BaseModel
+import aiohttp
+import asyncio
+
+from ommnia_sso_cli.bulk import INVALID_ROW_CODE, RowError, for_each
+from ommnia_sso_cli.data.repositories.login_repository import (
+    CreateLoginSessionFailureResponse,
+    CreateLoginSessionResponse,
+    CreateLoginSessionSuccessResponse,
+    LoginRepository,
+)
+from ommnia_sso_cli.permissions import Permissions
+from ommnia_sso_cli.state import State
+
+
+class LoginSessionRow(BaseModel):
+    target_app_name: Optional[str] = None
+    redirect_url: str
+    required_permissions: Permissions = []
+    optional_permissions: Permissions = []
+
+
+# The fields of `LoginSessionRow` that hold lists.
+LOGIN_SESSION_ROW_LIST_FIELDS: List[str] = ["required_permissions", "optional_permissions"]
+
+
+class LoginSessionResult(BaseModel):
+    line: int
+    status: Literal["created", "failed", "error"]
+    target_app_name: Optional[str] = None
+    redirect_url: Optional[str] = None
+    token: Optional[str] = None
+    code: Optional[str] = None
+    message: Optional[str] = None
+
+
+LoginSessionRowInput = Tuple[int, Union[LoginSessionRow, RowError]]
+
+
+async def create_login_sessions(
+    rows: Iterable[LoginSessionRowInput],
+    on_result: Callable[[LoginSessionResult], None],
+    concurrency: int = 16,
+) -> None:
+    # Get the state.
+    state: State = State.instance()
+
+    # Get the login repository of the client.
+    login_repository: LoginRepository = state.admin.login_repository
+
+    async def create(item: LoginSessionRowInput) -> None:
+        line, row = item
+        if isinstance(row, RowError):
+            on_result(
+                LoginSessionResult(
+                    line=line, status="error", code=INVALID_ROW_CODE, message=row.message
+                )
+            )
+            return
+
+        # Sign the token and create the login session, recording transport errors as results.
+        try:
+            create_login_session_request_token: str = await state.admin.sign_login_session(
+                row.redirect_url,
+                row.required_permissions,
+                row.optional_permissions,
+                row.target_app_name,
+            )
+            create_login_session_response: CreateLoginSessionResponse = (
+                await login_repository.create_login_session(create_login_session_request_token)
+            )
+        except (TransportError, aiohttp.ClientError, asyncio.TimeoutError) as exception:
+            on_result(
+                LoginSessionResult(
+                    line=line,
+                    status="error",
+                    target_app_name=row.target_app_name,
+                    redirect_url=row.redirect_url,
+                    message=str(exception) or type(exception).__name__,
+                )
+            )
+            return
+
+        if isinstance(create_login_session_response, CreateLoginSessionFailureResponse):
+            on_result(
+                LoginSessionResult(
+                    line=line,
+                    status="failed",
+                    target_app_name=row.target_app_name,
+                    redirect_url=row.redirect_url,
+                    code=create_login_session_response.code.value,
+                    message=create_login_session_response.message,
+                )
+            )
+            return
+
+        # Make sure the response was successful.
+        assert isinstance(
+            create_login_session_response, CreateLoginSessionSuccessResponse
+        ), "If not a failure, it should always be a success response."
+
+        on_result(
+            LoginSessionResult(
+                line=line,
+                status="created",
+                target_app_name=row.target_app_name,
+                redirect_url=row.redirect_url,
+                token=create_login_session_response.token,
+            )
+        )
+
+    # Create the login sessions, with a bounded number of them in flight.
+    await for_each(rows, create, concurrency)
@@ -0,0 +1,151 @@
+from typing import Callable, Container, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+from gql.transport.exceptions import TransportError
+from pydantic import BaseModel
+import aiohttp
+import asyncio
+
+from ommnia_sso_cli.bulk import INVALID_ROW_CODE, RowError, batches, for_each
+from ommnia_sso_cli.data.models.user import RegularUserSchema, UserStatus
+from ommnia_sso_cli.data.repositories.users_repository import (
+    CreateUserMutationArguments,
+    CreateUserMutationFailure,
+    CreateUserMutationFailureCode,
+    CreateUserResponse,
+    UsersRepository,
+)
+from ommnia_sso_cli.permissions import Permissions
+from ommnia_sso_cli.state import State
+
+
+class ImportUserRow(CreateUserMutationArguments):
+    permissions: Permissions = []
+    groups: List[str] = []
+    status: UserStatus = UserStatus.ACTIVE
+
+
+# The fields of `ImportUserRow` that hold lists.
+IMPORT_USER_ROW_LIST_FIELDS: List[str] = ["permissions", "groups"]
+
+
+class ImportResult(BaseModel):
+    line: int
+    # Unknown when the request of the row failed as a whole, after the server may have applied it,
+    # and exists when the user was found later, but may have been created by someone else.
+    status: Literal["created", "failed", "error", "unknown", "exists"]
+    email: Optional[str] = None
+    uid: Optional[int] = None
+    code: Optional[str] = None
+    message: Optional[str] = None
+
+
+ImportRow = Tuple[int, Union[ImportUserRow, RowError]]
+
+
+def _result(
+    line: int, email: str, create_user_response: CreateUserResponse, uncertain: bool
+) -> ImportResult:
+    # An earlier run whose outcome was unknown may have created the user, or the email may have
+    # been used by another account all along.
+    if (
+        uncertain
+        and isinstance(create_user_response, CreateUserMutationFailure)
+        and create_user_response.code == CreateUserMutationFailureCode.EMAIL_ALREADY_USED
+    ):
+        return ImportResult(
+            line=line,
+            status="exists",
+            email=email,
+            code=create_user_response.code.value,
+            message=(
+                "The user exists, the earlier attempt (whose outcome was unknown) may or may not "
+                "have created it."
+            ),
+        )
+
+    if isinstance(create_user_response, CreateUserMutationFailure):
+        return ImportResult(
+            line=line,
+            status="failed",
+            email=email,
+            code=create_user_response.code.value,
+            message=create_user_response.message,
+        )
+
+    # Make sure that the response was successful.
+    assert isinstance(
+        create_user_response, RegularUserSchema
+    ), "If the create user response was not a failure, it should return a user schema."
+
+    return ImportResult(
+        line=line,
+        status="created",
+        email=email,
+        uid=create_user_response.uid,
+    )
+
+
+async def import_users(
+    rows: Iterable[ImportRow],
+    on_result: Callable[[ImportResult], None],
+    concurrency: int = 16,
+    batch_size: int = 1,
+    uncertain: Container[int] = (),
+) -> None:
+    """
+    Create the users of the rows, passing the result of each row to `on_result`.
+
+    The `uncertain` lines are the ones whose outcome an earlier run could not tell, an email that
+    is already used is reported as existing for them instead of failed.
+    """
+
+    # Get the state.
+    state: State = State.instance()
+
+    # Get the users repository of the client.
+    users_repository: UsersRepository = state.admin.users_repository
+
+    def valid_rows() -> Iterator[Tuple[int, ImportUserRow]]:
+        # Report the unparsable rows right away, passing on the others.
+        for line, row in rows:
+            if isinstance(row, RowError):
+                on_result(
+                    ImportResult(
+                        line=line,
+                        status="error",
+                        email=(row.row or {}).get("email"),
+                        code=INVALID_ROW_CODE,
+                        message=row.message,
+                    )
+                )
+            else:
+                yield line, row
+
+    async def create(batch: List[Tuple[int, ImportUserRow]]) -> None:
+        # Create the users, recording transport errors as results instead of aborting. The whole
+        # request failed, so the server may or may not have created them, which is left to a
+        # resume to find out.
+        try:
+            create_user_responses: List[CreateUserResponse] = (
+                [await users_repository.create_user(batch[0][1])]
+                if len(batch) == 1
+                else await users_repository.create_users(
+                    [args for _, args in batch], batch_size=len(batch)
+                )
+            )
+        except (TransportError, aiohttp.ClientError, asyncio.TimeoutError) as exception:
+            for line, args in batch:
+                on_result(
+                    ImportResult(
+                        line=line,
+                        status="unknown",
+                        email=args.email,
+                        message=str(exception) or type(exception).__name__,
+                    )
+                )
+            return
+
+        for (line, args), create_user_response in zip(batch, create_user_responses):
+            on_result(_result(line, args.email, create_user_response, line in uncertain))
+
+    # Create the users in batches, with a bounded number of requests in flight.
+    await for_each(batches(valid_rows(), batch_size), create, concurrency)
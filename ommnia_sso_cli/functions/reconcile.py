@@ -0,0 +1,212 @@
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from gql.transport.exceptions import TransportError
+from pydantic import BaseModel, Field
+import aiohttp
+import asyncio
+
+from ommnia_sso_cli.bulk import for_each
+from ommnia_sso_cli.data.models.group import GroupSchema
+from ommnia_sso_cli.data.models.manifest import (
+    ManifestGroupModel,
+    ManifestModel,
+    ManifestUserModel,
+)
+from ommnia_sso_cli.data.models.user import RegularUserSchema
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE
+from ommnia_sso_cli.data.repositories.groups_repository import (
+    CreateGroupMutationArguments,
+    CreateGroupMutationFailure,
+    DeleteGroupMutationFailure,
+    GroupsRepository,
+)
+from ommnia_sso_cli.data.repositories.users_repository import (
+    CreateUserMutationArguments,
+    CreateUserMutationFailure,
+    UsersRepository,
+)
+from ommnia_sso_cli.state import State
+
+T = TypeVar("T")
+
+
+class Change(BaseModel):
+    # Unchecked when the manifest sets fields of an existing user or group that the API does not
+    # return, so that they cannot be compared.
+    action: Literal["create", "delete", "drift", "unchecked"]
+    kind: Literal["group", "user"]
+    key: str
+    detail: Optional[str] = None
+
+    # The manifest entry to create, left out of the output since it holds the password.
+    group: Optional[ManifestGroupModel] = Field(default=None, exclude=True)
+    user: Optional[ManifestUserModel] = Field(default=None, exclude=True)
+
+
+class ApplyResult(BaseModel):
+    action: Literal["create", "delete"]
+    kind: Literal["group", "user"]
+    key: str
+    status: Literal["done", "failed", "error"]
+    uid: Optional[int] = None
+    code: Optional[str] = None
+    message: Optional[str] = None
+
+
+def _differences(fields: Dict[str, Tuple[Any, Any]]) -> Optional[str]:
+    differences: List[str] = [
+        f"{name}: {current!r} -> {desired!r}"
+        for name, (current, desired) in fields.items()
+        if current != desired
+    ]
+    return ", ".join(differences) or None
+
+
+def _unchecked(fields: Dict[str, List[str]]) -> Optional[str]:
+    names: List[str] = [name for name, desired in fields.items() if desired]
+    return f"not compared: {', '.join(names)}" if names else None
+
+
+async def plan(manifest: ManifestModel, page_size: int = DEFAULT_PAGE_SIZE) -> List[Change]:
+    """
+    Compare the manifest with the current users and groups, and compute the changes that make
+    them match.
+
+    Users are never deleted. Differences in existing users and groups cannot be applied, since
+    the API has no update mutations, so they are reported as drift. Their permissions and the
+    groups of the users are not returned by the API, so when the manifest sets them they are
+    reported as unchecked.
+    """
+
+    # Get the state.
+    state: State = State.instance()
+
+    # Get the users and groups repositories of the client.
+    users_repository: UsersRepository = state.admin.users_repository
+    groups_repository: GroupsRepository = state.admin.groups_repository
+
+    async def collect(items: AsyncIterator[T], key: Callable[[T], str]) -> Dict[str, T]:
+        return {key(item): item async for item in items}
+
+    # Fetch the current users and groups at the same time.
+    current_groups: Dict[str, GroupSchema]
+    current_users: Dict[str, RegularUserSchema]
+    current_groups, current_users = await asyncio.gather(
+        collect(groups_repository.iter_groups(page_size), lambda group: group.name),
+        collect(users_repository.iter_users(page_size), lambda user: user.email),
+    )
+
+    changes: List[Change] = []
+    for group in manifest.groups:
+        current_group: Optional[GroupSchema] = current_groups.get(group.name)
+        if current_group is None:
+            changes.append(Change(action="create", kind="group", key=group.name, group=group))
+        elif detail := _differences(
+            {"description": (current_group.description, group.description)}
+        ):
+            changes.append(Change(action="drift", kind="group", key=group.name, detail=detail))
+        if current_group is not None and (detail := _unchecked({"permissions": group.permissions})):
+            changes.append(
+                Change(action="unchecked", kind="group", key=group.name, detail=detail)
+            )
+
+    for user in manifest.users:
+        current_user: Optional[RegularUserSchema] = current_users.get(user.email)
+        if current_user is None:
+            changes.append(Change(action="create", kind="user", key=user.email, user=user))
+        elif detail := _differences(
+            {
+                "name": (current_user.name, user.name),
+                "status": (current_user.status.value, user.status.value),
+            }
+        ):
+            changes.append(Change(action="drift", kind="user", key=user.email, detail=detail))
+        if current_user is not None and (
+            detail := _unchecked({"permissions": user.permissions, "groups": user.groups})
+        ):
+            changes.append(
+                Change(action="unchecked", kind="user", key=user.email, detail=detail)
+            )
+
+    if manifest.prune_groups:
+        desired_group_names: Set[str] = {group.name for group in manifest.groups}
+        changes.extend(
+            Change(action="delete", kind="group", key=name)
+            for name in current_groups
+            if name not in desired_group_names
+        )
+
+    return changes
+
+
+async def apply(
+    changes: List[Change],
+    on_result: Callable[[ApplyResult], None],
+    concurrency: int = 16,
+) -> None:
+    """
+    Apply the planned changes concurrently: the groups are created first (the new users may
+    be members), then the users, then the groups are deleted.
+    """
+
+    # Get the state.
+    state: State = State.instance()
+
+    # Get the users and groups repositories of the client.
+    users_repository: UsersRepository = state.admin.users_repository
+    groups_repository: GroupsRepository = state.admin.groups_repository
+
+    async def handle(change: Change) -> None:
+        assert change.action in ["create", "delete"], "Only creations and deletions are applied"
+
+        result: ApplyResult = ApplyResult(
+            action=change.action, kind=change.kind, key=change.key, status="done"
+        )
+        try:
+            if change.kind == "group" and change.action == "create":
+                assert change.group is not None, "The group to create should be given"
+                response = await groups_repository.create_group(
+                    CreateGroupMutationArguments.model_validate(change.group.model_dump())
+                )
+            elif change.kind == "group":
+                response = await groups_repository.delete_group(change.key)
+            else:
+                assert change.user is not None, "The user to create should be given"
+                response = await users_repository.create_user(
+                    CreateUserMutationArguments.model_validate(change.user.model_dump())
+                )
+        except (TransportError, aiohttp.ClientError, asyncio.TimeoutError) as exception:
+            result.status = "error"
+            result.message = str(exception) or type(exception).__name__
+            on_result(result)
+            return
+
+        if isinstance(
+            response,
+            (CreateGroupMutationFailure, DeleteGroupMutationFailure, CreateUserMutationFailure),
+        ):
+            result.status = "failed"
+            result.code = response.code.value
+            result.message = response.message
+        else:
+            result.uid = response.uid
+
+        on_result(result)
+
+    # Run the phases one after the other, and the changes of each phase concurrently.
+    for action, kind in [("create", "group"), ("create", "user"), ("delete", "group")]:
+        await for_each(
+            (change for change in changes if change.action == action and change.kind == kind),
+            handle,
+            concurrency,
+        )
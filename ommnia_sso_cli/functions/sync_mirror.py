@@ -0,0 +1,30 @@
+from typing import List
+import asyncio
+
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE
+from ommnia_sso_cli.data.repositories.groups_repository import GroupsRepository
+from ommnia_sso_cli.data.repositories.mirror_repository import MirrorRepository, SyncResult
+from ommnia_sso_cli.data.repositories.users_repository import UsersRepository
+from ommnia_sso_cli.state import State
+
+
+async def sync_mirror(
+    mirror_repository: MirrorRepository, page_size: int = DEFAULT_PAGE_SIZE
+) -> List[SyncResult]:
+    # Get the state.
+    state: State = State.instance()
+
+    # Get the users and groups repositories of the client.
+    users_repository: UsersRepository = state.admin.users_repository
+    groups_repository: GroupsRepository = state.admin.groups_repository
+
+    # Fetch the users and groups at the same time, and apply all changes in one transaction.
+    with mirror_repository.connect() as connection, connection:
+        return list(
+            await asyncio.gather(
+                mirror_repository.sync_users(connection, users_repository.iter_users(page_size)),
+                mirror_repository.sync_groups(
+                    connection, groups_repository.iter_groups(page_size)
+                ),
+            )
+        )
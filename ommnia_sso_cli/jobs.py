@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+import typer
+
+from ommnia_sso_cli.data.models.job import JobModel
+from ommnia_sso_cli.data.repositories.jobs_repository import Journal, JobsRepository
+from ommnia_sso_cli.shared import APP_NAME
+
+# The functions that run each kind of job, taking the job and the report file, imported when a
+# job is resumed.
+JOB_RUNNERS: Dict[str, str] = {
+    "apply": "ommnia_sso_cli.apps.reconcile:run_apply_job",
+    "create-login-sessions": "ommnia_sso_cli.apps.login:run_create_sessions_job",
+    "import-users": "ommnia_sso_cli.apps.users:run_import_job",
+}
+
+
+@contextmanager
+def journaled(job: JobModel, result_key: Callable[[Any], str]) -> Iterator[Journal]:
+    """
+    Open the journal of the job for a run, and remove the job once nothing is left to do.
+    """
+
+    # Create the jobs repository.
+    jobs_repository: JobsRepository = JobsRepository(APP_NAME)
+
+    journal: Journal = jobs_repository.journal(job, result_key)
+    if journal.completed:
+        typer.echo(
+            f"Resuming job {job.id}, skipping {len(journal.completed)} completed items.", err=True
+        )
+
+    interrupted: bool = False
+    try:
+        yield journal
+    except BaseException:
+        interrupted = True
+        raise
+    finally:
+        journal.close()
+
+        # Keep the job while items are pending, so that it can be resumed.
+        if interrupted or journal.left:
+            typer.secho(
+                f"Job {job.id} has pending items, retry them with 'admin jobs resume {job.id}'.",
+                fg="yellow",
+                err=True,
+            )
+        else:
+            jobs_repository.remove(job)
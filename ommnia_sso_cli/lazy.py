@@ -0,0 +1,50 @@
+from typing import ClassVar, Dict, List, Optional
+import importlib
+import click
+import typer
+from typer.core import TyperGroup
+
+
+class LazyTyperGroup(TyperGroup):
+    """
+    A Typer group whose sub apps are only imported once they are looked up, so invoking one
+    command does not pay for importing all the others.
+
+    Subclasses map the sub app names to `<module>:<attribute>` import paths, and to their short
+    help, which the help of the group lists without importing them.
+    """
+
+    lazy_subcommands: ClassVar[Dict[str, str]] = {}
+    lazy_help: ClassVar[Dict[str, str]] = {}
+
+    # Set while the help of the group is formatted.
+    _formatting_help: bool = False
+
+    def format_help(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        self._formatting_help = True
+        try:
+            super().format_help(ctx, formatter)
+        finally:
+            self._formatting_help = False
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        # List the sub apps that are not imported yet in the help with a placeholder.
+        if (
+            self._formatting_help
+            and cmd_name in self.lazy_subcommands
+            and cmd_name not in self.commands
+        ):
+            return click.Command(cmd_name, help=self.lazy_help.get(cmd_name))
+
+        # Import the sub app and register it the first time it is looked up.
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            module_name, attribute = self.lazy_subcommands[cmd_name].split(":")
+            sub_app: typer.Typer = getattr(importlib.import_module(module_name), attribute)
+            command: click.Command = typer.main.get_command(sub_app)
+            command.name = cmd_name
+            self.add_command(command, cmd_name)
+
+        return super().get_command(ctx, cmd_name)
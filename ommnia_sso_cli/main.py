@@ -1,57 +1,144 @@
-import asyncio
-from typing import Annotated, Optional
-from gql import Client
-from gql.transport.aiohttp import AIOHTTPTransport
+from functools import partial
+from pathlib import Path
+from typing import Annotated, List, Optional
+import click
+import sys
 import typer
 
-from ommnia_sso_cli.apps import groups, login, users
-from ommnia_sso_cli.data.models import AuthConfigModel, ConfigModel
-from ommnia_sso_cli.data.repositories.config_repository import ConfigRepository
-from ommnia_sso_cli.functions import create_login_session, regular_login
-from ommnia_sso_cli.shared import APP_NAME
-from ommnia_sso_cli.state import State
+from ommnia_sso_cli.dispatch import TOP_LEVEL_COMMANDS
+from ommnia_sso_cli.errors import SSOAdminError
+from ommnia_sso_cli.lazy import LazyTyperGroup
+from ommnia_sso_cli.output import OUTPUT_FORMAT, OutputFormat
+from ommnia_sso_cli.shared import APP_NAME, PROFILE_ENV
 
-app: typer.Typer = typer.Typer()
+# The key of the arguments of the sub command in the context metadata.
+SUBCOMMAND_ARGS: str = "ommnia_sso_cli.subcommand_args"
+
+
+class MainGroup(LazyTyperGroup):
+    lazy_subcommands = {
+        "agent": "ommnia_sso_cli.apps.agent:app",
+        "apply": "ommnia_sso_cli.apps.reconcile:apply_app",
+        "groups": "ommnia_sso_cli.apps.groups:app",
+        "jobs": "ommnia_sso_cli.apps.jobs:app",
+        "login": "ommnia_sso_cli.apps.login:app",
+        "plan": "ommnia_sso_cli.apps.reconcile:plan_app",
+        "shell": "ommnia_sso_cli.apps.shell:app",
+        "sync": "ommnia_sso_cli.apps.sync:app",
+        "users": "ommnia_sso_cli.apps.users:app",
+    }
+    lazy_help = {
+        "agent": (
+            "Manage the agent, which keeps one authenticated session open for all the commands."
+        ),
+        "apply": "Make the users and groups match the manifest, applying only the changes.",
+        "groups": "Create, delete and list the groups.",
+        "jobs": "List, resume and remove the resumable bulk jobs.",
+        "login": "Create login sessions, and show or end the session of the CLI.",
+        "plan": "Show the changes that would make the users and groups match the manifest.",
+        "shell": "Run commands in an interactive shell that keeps one authenticated session open.",
+        "sync": (
+            "Refresh the local cache of the users and groups, which the --cached commands "
+            "answer from."
+        ),
+        "users": "Create, import, list and show the users.",
+    }
+
+    def invoke(self, ctx: click.Context):
+        # Keep the arguments of the sub command, which is run by the main command itself when it
+        # runs against several profiles (the group clears them before calling it).
+        ctx.meta[SUBCOMMAND_ARGS] = [*ctx.protected_args, *ctx.args]
+
+        # End the command with the message of a failure response of the API.
+        try:
+            return super().invoke(ctx)
+        except SSOAdminError as exception:
+            typer.secho(str(exception), fg="red", err=True)
+            raise typer.Exit(-1)
+
+
+app: typer.Typer = typer.Typer(cls=MainGroup)
 
 
 @app.callback()
-def load_config(ctx: typer.Context):
+def load_config(
+    ctx: typer.Context,
+    timings: Annotated[
+        bool, typer.Option("--timings", help="Print how long each phase of the run took.")
+    ] = False,
+    trace_file_path: Annotated[
+        Optional[Path],
+        typer.Option("--trace", help="Write the phase spans to the file as a Chrome trace."),
+    ] = None,
+    output_format: Annotated[
+        OutputFormat,
+        typer.Option("--output", "-o", help="The format of the records printed by the commands."),
+    ] = OutputFormat.TABLE,
+    profiles: Annotated[
+        Optional[str],
+        typer.Option(
+            "--profile",
+            "-p",
+            envvar=PROFILE_ENV,
+            help="The profile to run the command against, or several separated by commas.",
+        ),
+    ] = None,
+    all_profiles: Annotated[
+        bool, typer.Option("--all-profiles", help="Run the command against every profile.")
+    ] = False,
+):
+    # Set the output format for the commands run from here.
+    OUTPUT_FORMAT.set(output_format)
+
+    # Record the phases of the run, and report them once everything else has been closed.
+    if timings or trace_file_path is not None:
+        from ommnia_sso_cli.timings import TIMINGS
+
+        TIMINGS.enable()
+        ctx.call_on_close(partial(TIMINGS.report, timings, trace_file_path))
+
     # If we're running the setup command, skip the standard initialization procedure.
-    if ctx.invoked_subcommand in ["setup", "login"]:
+    if ctx.invoked_subcommand == "setup":
         return
 
-    # Read the configuration file.
-    config: Optional[ConfigModel] = ConfigRepository(APP_NAME).load()
-    if config is None:
-        typer.secho("Could not read configuration file", fg="red")
-        raise typer.Exit(-1)
+    # The agent logs in to the profile it is started with, and only serves that one.
+    if ctx.invoked_subcommand == "agent":
+        if profiles is not None or all_profiles:
+            from ommnia_sso_cli.fan_out import resolve_profiles
+            from ommnia_sso_cli.state import PROFILE
+
+            names = resolve_profiles(profiles, all_profiles)
+            if len(names) != 1:
+                raise typer.BadParameter(
+                    "The agent runs against a single profile", param_hint="'--profile'"
+                )
+            PROFILE.set(names[0])
+        return
 
-    # Create the GraphQL client
-    client: Client = Client(transport=AIOHTTPTransport(config.graphql_endpoint_url))
+    # The client, the repositories and the login functions are imported here, so that commands
+    # which do not need them (setup, --help) start quickly.
+    from ommnia_sso_cli.bootstrap import bootstrap
+    from ommnia_sso_cli.state import State
 
-    # Put the client and the config in the state.
-    state: State = State.instantiate(client, config)
+    # Connect and log in to a profile once a command uses its state. The login commands either
+    # work without a bearer token or manage the cached one.
+    State.defer(partial(bootstrap, ctx, authenticated=ctx.invoked_subcommand not in ["login"]))
 
-    # Create a login token then perform a regular login.
-    login_token: str = asyncio.run(create_login_session("", required_permissions=["ommnia_sso"]))
-    bearer_token: str = asyncio.run(
-        regular_login(state.config.auth.email, state.config.auth.password, login_token)
-    )
+    if profiles is None and not all_profiles:
+        return
 
-    # Recreate the client now with the authorization header.
-    state.client = Client(
-        transport=AIOHTTPTransport(
-            url=config.graphql_endpoint_url,
-            headers={
-                "Authorization": f"Bearer {bearer_token}",
-            },
-        )
-    )
+    from ommnia_sso_cli.fan_out import fan_out, resolve_profiles
+    from ommnia_sso_cli.state import PROFILE
 
+    # Run the command against the selected profile, or against all of them at once, in which
+    # case it is done here instead of by the main group.
+    names: List[str] = resolve_profiles(profiles, all_profiles)
+    if len(names) == 1:
+        PROFILE.set(names[0])
+        return
 
-app.add_typer(groups.app, name="groups")
-app.add_typer(login.app, name="login")
-app.add_typer(users.app, name="users")
+    assert isinstance(ctx.command, click.Group), "The main command should be a group"
+    raise typer.Exit(fan_out(ctx.command, ctx, names, ctx.meta[SUBCOMMAND_ARGS]))
 
 
 @app.command()
@@ -68,6 +155,13 @@ def setup(
         ),
     ],
 ):
+    from ommnia_sso_cli.data.models import AuthConfigModel, ConfigModel
+    from ommnia_sso_cli.data.repositories.config_repository import ConfigRepository
+    from ommnia_sso_cli.data.repositories.credentials_repository import CredentialsRepository
+
+    # The cached bearer token may belong to the previous config.
+    CredentialsRepository(APP_NAME).clear()
+
     ConfigRepository(APP_NAME).save(
         ConfigModel(
             app_name=app_name,
@@ -82,5 +176,22 @@ def setup(
     )
 
 
-if __name__ == "__main__":
+def main() -> None:
+    """
+    The entry point, which forwards the command to the agent when one is running.
+    """
+
+    # Options of the main command (like --timings) apply to a local run only.
+    args: List[str] = sys.argv[1:]
+    if args and args[0] not in TOP_LEVEL_COMMANDS and not args[0].startswith("-"):
+        from ommnia_sso_cli.agent import forward
+
+        exit_code: Optional[int] = forward(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
     app()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type
+import csv
+import sys
+import time
+
+from ommnia_sso_cli.timings import span
+
+if TYPE_CHECKING:
+    # Pydantic is not imported at runtime, since the main command imports the output format.
+    from pydantic import BaseModel
+
+# The separator of list values in CSV cells, for both input and output.
+CSV_LIST_SEPARATOR: str = ";"
+
+# The buffered output is written once it reaches this size, or has waited this long.
+BUFFER_SIZE: int = 64 * 1024
+BUFFER_INTERVAL: float = 0.1
+
+# The number of rows rendered per table when streaming a list as a table.
+TABLE_CHUNK_SIZE: int = 100
+
+
+class OutputFormat(str, Enum):
+    TABLE = "table"
+    JSON = "json"
+    JSONL = "jsonl"
+    CSV = "csv"
+
+
+# The output format of the commands, set by the main command.
+OUTPUT_FORMAT: ContextVar[OutputFormat] = ContextVar("output_format", default=OutputFormat.TABLE)
+
+
+@dataclass
+class Column:
+    field: str
+    title: str
+
+
+class _BufferedStdout:
+    """
+    Collects the output and writes it to stdout in large chunks, but without holding it back
+    for long, so streamed rows still show up while they come in.
+    """
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.size: int = 0
+        self.flushed_at: float = time.monotonic()
+
+    def write(self, data: str) -> int:
+        self.parts.append(data)
+        self.size += len(data)
+        if self.size >= BUFFER_SIZE or time.monotonic() - self.flushed_at >= BUFFER_INTERVAL:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        # Look up stdout on every flush, since the agent redirects it per command.
+        if self.parts:
+            sys.stdout.write("".join(self.parts))
+            sys.stdout.flush()
+            self.parts, self.size = [], 0
+        self.flushed_at = time.monotonic()
+
+
+class Writer(ABC):
+    """
+    Writes models to stdout in one of the output formats, either as a single record or as a
+    (streamed) list of records.
+    """
+
+    def __init__(self, columns: List[Column], many: bool) -> None:
+        self.columns: List[Column] = columns
+        self.many: bool = many
+        self.count: int = 0
+
+    @abstractmethod
+    def write(self, model: "BaseModel") -> None: ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "Writer":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        with span("rendering"):
+            self.close()
+
+
+class TableWriter(Writer):
+    """
+    Renders the records as Rich tables, streamed lists in chunks of rows over the full console
+    width, divided between the columns in proportion to the first chunk.
+    """
+
+    def __init__(self, columns: List[Column], many: bool) -> None:
+        super().__init__(columns, many)
+        self.rows: List[List[str]] = []
+        self.widths: Optional[List[int]] = None
+
+    def write(self, model: "BaseModel") -> None:
+        values: Dict[str, Any] = model.model_dump(mode="json")
+        self.rows.append([_cell(values.get(column.field)) for column in self.columns])
+        if self.many and len(self.rows) >= TABLE_CHUNK_SIZE:
+            with span("rendering"):
+                self.flush()
+
+    def flush(self) -> None:
+        from rich import box
+        from rich.table import Table
+        from ommnia_sso_cli.shared import console
+
+        if not self.rows and self.count:
+            return
+
+        # Divide the width by the first chunk, so that the following chunks stay aligned.
+        if self.widths is None:
+            self.widths = [
+                max([len(column.title), *(len(row[index]) for row in self.rows)])
+                for index, column in enumerate(self.columns)
+            ]
+
+        table = Table(
+            box=box.SIMPLE_HEAD if self.many else box.HEAVY_HEAD,
+            show_header=self.count == 0,
+            show_edge=not self.many,
+            expand=self.many,
+        )
+        for column, width in zip(self.columns, self.widths):
+            table.add_column(column.title, ratio=width if self.many else None, overflow="fold")
+        for row in self.rows:
+            table.add_row(*row)
+
+        console.print(table)
+        self.count += len(self.rows)
+        self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JSONWriter(Writer):
+    def __init__(self, columns: List[Column], many: bool) -> None:
+        super().__init__(columns, many)
+        self.stream: _BufferedStdout = _BufferedStdout()
+
+    def write(self, model: "BaseModel") -> None:
+        if self.many:
+            self.stream.write("[\n" if self.count == 0 else ",\n")
+        self.stream.write(model.model_dump_json())
+        self.count += 1
+
+    def close(self) -> None:
+        if self.many:
+            self.stream.write("[]\n" if self.count == 0 else "\n]\n")
+        elif self.count:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+class JSONLWriter(Writer):
+    def __init__(self, columns: List[Column], many: bool) -> None:
+        super().__init__(columns, many)
+        self.stream: _BufferedStdout = _BufferedStdout()
+
+    def write(self, model: "BaseModel") -> None:
+        self.stream.write(model.model_dump_json() + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self.stream.flush()
+
+
+class CSVWriter(Writer):
+    def __init__(self, columns: List[Column], many: bool) -> None:
+        super().__init__(columns, many)
+        self.stream: _BufferedStdout = _BufferedStdout()
+        self.writer = csv.writer(self.stream, lineterminator="\n")
+        self.writer.writerow([column.field for column in columns])
+
+    def write(self, model: "BaseModel") -> None:
+        values: Dict[str, Any] = model.model_dump(mode="json")
+        self.writer.writerow([_cell(values.get(column.field)) for column in self.columns])
+        self.count += 1
+
+    def close(self) -> None:
+        self.stream.flush()
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(map(str, value))
+    return str(value)
+
+
+_WRITERS: Dict[OutputFormat, Type[Writer]] = {
+    OutputFormat.TABLE: TableWriter,
+    OutputFormat.JSON: JSONWriter,
+    OutputFormat.JSONL: JSONLWriter,
+    OutputFormat.CSV: CSVWriter,
+}
+
+
+def writer(columns: List[Column], many: bool = False) -> Writer:
+    """
+    Create a writer for the output format of the command.
+
+    The table columns are also the CSV columns; the JSON formats write whole models.
+    """
+
+    return _WRITERS[OUTPUT_FORMAT.get()](columns, many)
@@ -0,0 +1,152 @@
+from functools import lru_cache
+from typing import Annotated, Dict, Iterable, List, Optional, Set
+from pydantic import AfterValidator
+import difflib
+import typer
+
+# The permissions of the SSO itself known to the CLI, copied from the ones the `test` script grants
+# its admin group. They are neither taken from the server nor from the ommnia-permission-tree
+# package, and were not verified against either, so they may be incomplete: unknown ones under
+# this root are only warned about. Those of other apps (other roots) are only checked for their
+# form.
+SSO_PERMISSIONS: List[str] = [
+    f"ommnia_sso.{resource}.{action}"
+    for resource in [
+        "groups",
+        "users",
+        "permissions",
+        "login_sessions",
+        "restore_sessions",
+    ]
+    for action in ["create", "read", "update", "delete"]
+]
+
+# The separator of the segments of a permission, each one presumably granting the ones below it
+# (which is not checked against the server, so nothing is left out because of it).
+PERMISSION_SEPARATOR: str = "."
+
+# How similar an unknown root has to be to a known one to be taken for a typo of it.
+ROOT_TYPO_CUTOFF: float = 0.8
+
+# The warnings already printed, which are printed once per run.
+_warned: Set[str] = set()
+
+
+def _warn(message: str) -> None:
+    if message not in _warned:
+        _warned.add(message)
+        typer.secho(f"Warning: {message}", fg="yellow", err=True)
+
+
+class PermissionIndex:
+    """
+    The known permissions compiled into the set of every node of their tree, to check that a
+    permission exists with a single lookup.
+    """
+
+    def __init__(self, permissions: Iterable[str]) -> None:
+        self.nodes: Set[str] = set()
+        self.roots: Set[str] = set()
+        for permission in permissions:
+            segments: List[str] = permission.split(PERMISSION_SEPARATOR)
+            self.roots.add(segments[0])
+            self.nodes.update(
+                PERMISSION_SEPARATOR.join(segments[:length])
+                for length in range(1, len(segments) + 1)
+            )
+
+    def check(self, permission: str) -> Optional[str]:
+        """
+        Get the reason the permission is invalid, if it is: malformed, or under a root that looks
+        like a typo of a known one.
+        """
+
+        segments: List[str] = permission.split(PERMISSION_SEPARATOR)
+        if any(not segment or any(c.isspace() for c in segment) for segment in segments):
+            return f"Malformed permission {permission!r}"
+
+        if segments[0] not in self.roots:
+            matches: List[str] = difflib.get_close_matches(
+                segments[0], self.roots, n=1, cutoff=ROOT_TYPO_CUTOFF
+            )
+            if matches:
+                return (
+                    f"Unknown permission root {segments[0]!r} in {permission!r}, "
+                    f"did you mean {matches[0]!r}?"
+                )
+
+        return None
+
+    def warning(self, permission: str) -> Optional[str]:
+        """
+        Get the reason the (valid) permission cannot be vouched for, if any: it is not known
+        under a known root, or its root is not known at all.
+        """
+
+        root: str = permission.split(PERMISSION_SEPARATOR)[0]
+        if root not in self.roots:
+            return f"Permission {permission!r} is not checked, its root {root!r} is unknown"
+        if permission not in self.nodes:
+            return f"Unknown permission {permission!r}, sent as is"
+
+        return None
+
+    def normalize(self, permissions: Iterable[str]) -> List[str]:
+        """
+        Check the permissions (warning about the ones that cannot be vouched for), and leave out
+        the duplicates, keeping the order of the others.
+
+        The ones that a broader permission in the list seems to grant are warned about, but kept,
+        since what a permission grants is up to the server.
+        """
+
+        unique: Dict[str, None] = {}
+        for permission in permissions:
+            permission = permission.strip()
+            error: Optional[str] = self.check(permission)
+            if error is not None:
+                raise ValueError(error)
+
+            warning: Optional[str] = self.warning(permission)
+            if warning is not None:
+                _warn(warning)
+            unique[permission] = None
+
+        for permission in unique:
+            segments: List[str] = permission.split(PERMISSION_SEPARATOR)
+            broader: Optional[str] = next(
+                (
+                    PERMISSION_SEPARATOR.join(segments[:length])
+                    for length in range(1, len(segments))
+                    if PERMISSION_SEPARATOR.join(segments[:length]) in unique
+                ),
+                None,
+            )
+            if broader is not None:
+                _warn(f"Permission {permission!r} is probably already granted by {broader!r}")
+
+        return list(unique)
+
+
+@lru_cache(maxsize=None)
+def permission_index() -> PermissionIndex:
+    return PermissionIndex(SSO_PERMISSIONS)
+
+
+def normalize_permissions(permissions: List[str]) -> List[str]:
+    return permission_index().normalize(permissions)
+
+
+def permissions_callback(permissions: List[str]) -> List[str]:
+    """
+    Normalize the permissions given as options, rejecting the invalid ones before any request.
+    """
+
+    try:
+        return normalize_permissions(permissions)
+    except ValueError as exception:
+        raise typer.BadParameter(str(exception))
+
+
+# A list of permissions in the models, normalized when validated.
+Permissions = Annotated[List[str], AfterValidator(normalize_permissions)]
@@ -0,0 +1,85 @@
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TextIO, Type
+from pydantic import BaseModel
+from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn, TimeElapsedColumn
+import time
+
+from ommnia_sso_cli.shared import err_console
+from ommnia_sso_cli.timings import span
+
+if TYPE_CHECKING:
+    from ommnia_sso_cli.data.repositories.jobs_repository import Journal
+
+
+class BulkReport:
+    """
+    Writes the results of a bulk operation as JSONL and shows live counters per result status,
+    plus the throughput, on stderr.
+
+    The first status counts as success, the others as failures. With a journal, the results
+    are also recorded in it.
+    """
+
+    def __init__(
+        self,
+        description: str,
+        report_file: TextIO,
+        statuses: List[str] = ["created", "failed", "error"],
+        journal: Optional["Journal"] = None,
+    ) -> None:
+        self.report_file: TextIO = report_file
+        self.journal: Optional["Journal"] = journal
+        self.statuses: List[str] = statuses
+        self.counts: Dict[str, int] = {status: 0 for status in statuses}
+        self.progress: Progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            TextColumn("{task.completed} rows"),
+            *(
+                TextColumn(f"[{color}]{{task.fields[{status}]}} {status}")
+                for color, status in zip(["green", *(["red"] * len(statuses))], statuses)
+            ),
+            TextColumn("{task.fields[rate]:.1f} rows/s"),
+            TimeElapsedColumn(),
+            console=err_console,
+        )
+        self.task: TaskID = self.progress.add_task(
+            description, total=None, rate=0.0, **self.counts
+        )
+        self.start: float = time.monotonic()
+
+    @property
+    def failed(self) -> bool:
+        return any(self.counts[status] for status in self.statuses[1:])
+
+    def __call__(self, result: Any) -> None:
+        assert isinstance(result, BaseModel), "The result should be a model"
+
+        # Record the result in the journal first, so that it is not redone after a crash.
+        if self.journal is not None:
+            self.journal.record(result)
+
+        # Write the result to the report, then update the live counters.
+        with span("rendering"):
+            self.report_file.write(result.model_dump_json(exclude_none=True) + "\n")
+            self.counts[getattr(result, "status")] += 1
+            self.progress.update(
+                self.task,
+                advance=1,
+                rate=sum(self.counts.values()) / max(time.monotonic() - self.start, 1e-9),
+                **self.counts,
+            )
+
+    def __enter__(self) -> "BulkReport":
+        self.start = time.monotonic()
+        self.progress.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.progress.stop()
+        self.report_file.flush()
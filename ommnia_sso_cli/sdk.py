@@ -0,0 +1,365 @@
+from datetime import datetime, timezone
+from functools import cached_property, partial
+from types import TracebackType
+from typing import Any, AsyncIterator, List, Optional, Type, Union
+from ommnia_sso_tokens import LoginSessionCreationToken
+import asyncio
+import contextlib
+
+from ommnia_sso_cli.data.client import ReauthenticatingClient
+from ommnia_sso_cli.data.models import ConfigModel
+from ommnia_sso_cli.data.models.credentials import CredentialsModel
+from ommnia_sso_cli.data.models.group import GroupSchema
+from ommnia_sso_cli.data.models.user import RegularUserSchema
+from ommnia_sso_cli.data.pagination import DEFAULT_PAGE_SIZE
+from ommnia_sso_cli.data.repositories.credentials_repository import CredentialsRepository
+from ommnia_sso_cli.data.repositories.groups_repository import (
+    DEFAULT_CREATE_GROUPS_BATCH_SIZE,
+    CreateGroupMutationArguments,
+    CreateGroupMutationFailure,
+    CreateGroupResponse,
+    DeleteGroupMutationFailure,
+    DeleteGroupResponse,
+    GroupsRepository,
+)
+from ommnia_sso_cli.data.repositories.login_repository import (
+    CreateLoginSessionFailureResponse,
+    CreateLoginSessionResponse,
+    LoginRepository,
+    RegularLoginFailureResponse,
+    RegularLoginRequest,
+    RegularLoginResponse,
+)
+from ommnia_sso_cli.data.repositories.users_repository import (
+    DEFAULT_CREATE_USERS_BATCH_SIZE,
+    CreateUserMutationArguments,
+    CreateUserMutationFailure,
+    CreateUserResponse,
+    UsersRepository,
+)
+from ommnia_sso_cli.data.scheduler import Scheduler
+from ommnia_sso_cli.data.transport import create_transport
+from ommnia_sso_cli.errors import (
+    CreateGroupError,
+    CreateUserError,
+    DeleteGroupError,
+    LoginError,
+    SSOAdminError,
+)
+from ommnia_sso_cli.shared import APP_NAME
+from ommnia_sso_cli.signing import SigningService
+
+__all__ = [
+    "CreateGroupError",
+    "CreateUserError",
+    "DeleteGroupError",
+    "LoginError",
+    "SSOAdminClient",
+    "SSOAdminError",
+]
+
+# How long (in seconds) to wait before trying a failed background token refresh again.
+TOKEN_REFRESH_RETRY_DELAY: float = 10.0
+
+
+class SSOAdminClient:
+    """
+    An async client of the SSO admin API, for using it from other Python code.
+
+    Each client owns its connection pool, request scheduler, signing service and bearer token,
+    so any number of them (for one or several deployments) can be used at once on the same event
+    loop. Failure responses are raised as `SSOAdminError`s, except by the batch operations,
+    which return them per item.
+
+        async with SSOAdminClient(config) as client:
+            group = await client.create_group(
+                CreateGroupMutationArguments(name="ops", description=None, permissions=[])
+            )
+
+    With a credentials repository, the bearer token is cached in it and reused while it is
+    valid, like the CLI does. Otherwise the client logs in when it is entered. While the event
+    loop runs, the client logs in again in the background shortly before the token expires, so
+    long runs never wait on an expired token.
+    """
+
+    def __init__(
+        self,
+        config: ConfigModel,
+        credentials_repository: Optional[CredentialsRepository] = None,
+        app_name: str = APP_NAME,
+    ) -> None:
+        self.config: ConfigModel = config
+        self.credentials_repository: Optional[CredentialsRepository] = credentials_repository
+        self.app_name: str = app_name
+
+        # Create the GraphQL client, logging in again if the server rejects the token, and
+        # pacing the requests to what the server handles.
+        self.client: ReauthenticatingClient = ReauthenticatingClient(
+            transport=create_transport(config.graphql_endpoint_url, config.connection),
+            reauthenticate=partial(self.authenticate, force=True),
+            scheduler=Scheduler(config.scheduling),
+        )
+
+        self.login_repository: LoginRepository = LoginRepository(self.client)
+        self.users_repository: UsersRepository = UsersRepository(self.client)
+        self.groups_repository: GroupsRepository = GroupsRepository(self.client)
+
+        # The task renewing the bearer token before it expires.
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+
+    @cached_property
+    def signing_service(self) -> SigningService:
+        return SigningService(
+            self.config.client_private_key_path, processes=self.config.signing.processes
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self.client.connected
+
+    async def connect(self) -> None:
+        """
+        Open the connection pool used by all the following requests.
+        """
+
+        await self.client.connect_async()
+
+    async def close(self) -> None:
+        """
+        Stop renewing the bearer token, close the connection pool (if open) and stop the
+        signing workers (if any).
+        """
+
+        await self._cancel_refresh()
+
+        if self.connected:
+            await self.client.close_async()
+
+        if "signing_service" in self.__dict__:
+            self.signing_service.close()
+
+    async def __aenter__(self) -> "SSOAdminClient":
+        await self.connect()
+        try:
+            await self.authenticate()
+        except BaseException:
+            await self.close()
+            raise
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close()
+
+    def authorize(
+        self, bearer_token: Optional[str], expires_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Set (or remove) the bearer token sent with every following request, renewing it in the
+        background before it expires (when given, and called on a running event loop).
+        """
+
+        # Replace the headers rather than updating them, as the requests in flight hold on to
+        # the ones they were sent with.
+        self.client.transport.headers = (  # type: ignore[attr-defined]
+            {"Authorization": f"Bearer {bearer_token}"} if bearer_token is not None else None
+        )
+
+        # Forget the renewal of the previous token, unless it is the one setting this token.
+        if self._refresh_task is not None and self._refresh_task is not _current_task():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+
+        if bearer_token is not None and expires_at is not None and _current_task() is not None:
+            self._refresh_task = asyncio.create_task(self._refresh_before(expires_at))
+
+    async def _cancel_refresh(self) -> None:
+        task: Optional["asyncio.Task[None]"] = self._refresh_task
+        self._refresh_task = None
+        if task is not None and task is not _current_task():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _refresh_before(self, expires_at: datetime) -> None:
+        """
+        Log in again once the token is about to expire, keeping the current token meanwhile.
+        """
+
+        # Wait at least half the lifetime left, so that tokens shorter lived than the margin
+        # are not renewed over and over.
+        remaining: float = _seconds_until(expires_at)
+        await asyncio.sleep(max(0.0, remaining - self.config.auth.refresh_margin, remaining / 2))
+
+        while True:
+            headers: Any = getattr(self.client.transport, "headers", None)
+            try:
+                # Unless a request was rejected and logged in again meanwhile.
+                await self.client.reauthenticate_once(headers, self._login)
+                return
+            except LoginError:
+                # The credentials are refused, which the next request will report.
+                return
+            except Exception:
+                # Keep trying while the token is valid, then leave it to the requests, which
+                # log in again once it is rejected.
+                if _seconds_until(expires_at) <= TOKEN_REFRESH_RETRY_DELAY:
+                    return
+                await asyncio.sleep(TOKEN_REFRESH_RETRY_DELAY)
+
+    async def authenticate(self, force: bool = False) -> None:
+        """
+        Authorize the client with the cached bearer token, or log in (always with `force`).
+        """
+
+        # Reuse the cached bearer token if it belongs to this config and is not about to expire.
+        if not force and self.credentials_repository is not None:
+            credentials: Optional[CredentialsModel] = self.credentials_repository.load()
+            if credentials is not None and credentials.is_usable_for(self.config):
+                self.authorize(credentials.bearer_token, credentials.expires_at)
+                return
+
+        # Make sure a stale bearer token is not sent along with the login mutations.
+        self.authorize(None)
+        await self._login()
+
+    async def _login(self) -> None:
+        # Create a login token then perform a regular login.
+        login_token: str = await self.create_login_session(
+            "", required_permissions=["ommnia_sso"]
+        )
+        bearer_token: str = await self.regular_login(
+            self.config.auth.email, self.config.auth.password, login_token
+        )
+
+        # Cache the bearer token for the following clients and start using it.
+        credentials: CredentialsModel = CredentialsModel.from_bearer_token(
+            bearer_token, self.config
+        )
+        if self.credentials_repository is not None:
+            self.credentials_repository.save(credentials)
+        self.authorize(bearer_token, credentials.expires_at)
+
+    async def sign_login_session(
+        self,
+        redirect_url: str,
+        required_permissions: List[str] = [],
+        optional_permissions: List[str] = [],
+        target_app_name: Optional[str] = None,
+    ) -> str:
+        """
+        Sign the request token of a login session with the client private key.
+        """
+
+        return await self.signing_service.sign(
+            LoginSessionCreationToken(
+                app_name=self.app_name,
+                target_app_name=target_app_name,
+                required_permissions=required_permissions,
+                optional_permissions=optional_permissions,
+                redirect_url=redirect_url,
+            )
+        )
+
+    async def create_login_session(
+        self,
+        redirect_url: str,
+        required_permissions: List[str] = [],
+        optional_permissions: List[str] = [],
+        target_app_name: Optional[str] = None,
+    ) -> str:
+        """
+        Create a login session, returning its token.
+        """
+
+        response: CreateLoginSessionResponse = await self.login_repository.create_login_session(
+            await self.sign_login_session(
+                redirect_url, required_permissions, optional_permissions, target_app_name
+            )
+        )
+        if isinstance(response, CreateLoginSessionFailureResponse):
+            raise LoginError("create login session", response.code, response.message)
+
+        return response.token
+
+    async def regular_login(self, email: str, password: str, token: str) -> str:
+        """
+        Log in to a login session with an email and a password, returning the bearer token.
+        """
+
+        response: RegularLoginResponse = await self.login_repository.regular_login(
+            RegularLoginRequest(email=email, password=password, token=token)
+        )
+        if isinstance(response, RegularLoginFailureResponse):
+            raise LoginError("perform regular login", response.code, response.message)
+
+        return response.token
+
+    async def create_user(self, args: CreateUserMutationArguments) -> RegularUserSchema:
+        response: CreateUserResponse = await self.users_repository.create_user(args)
+        if isinstance(response, CreateUserMutationFailure):
+            raise CreateUserError("create user", response.code, response.message)
+
+        return response
+
+    async def create_users(
+        self,
+        args_list: List[CreateUserMutationArguments],
+        batch_size: int = DEFAULT_CREATE_USERS_BATCH_SIZE,
+    ) -> List[Union[RegularUserSchema, CreateUserMutationFailure]]:
+        """
+        Create the users in batches, returning the user or the failure of each one in order.
+        """
+
+        return await self.users_repository.create_users(args_list, batch_size)
+
+    def iter_users(self, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[RegularUserSchema]:
+        return self.users_repository.iter_users(page_size)
+
+    async def create_group(self, args: CreateGroupMutationArguments) -> GroupSchema:
+        response: CreateGroupResponse = await self.groups_repository.create_group(args)
+        if isinstance(response, CreateGroupMutationFailure):
+            raise CreateGroupError("create group", response.code, response.message)
+
+        return response
+
+    async def create_groups(
+        self,
+        args_list: List[CreateGroupMutationArguments],
+        batch_size: int = DEFAULT_CREATE_GROUPS_BATCH_SIZE,
+    ) -> List[Union[GroupSchema, CreateGroupMutationFailure]]:
+        """
+        Create the groups in batches, returning the group or the failure of each one in order.
+        """
+
+        return await self.groups_repository.create_groups(args_list, batch_size)
+
+    async def delete_group(self, name: str) -> GroupSchema:
+        """
+        Delete the group with the given name, returning the deleted group.
+        """
+
+        response: DeleteGroupResponse = await self.groups_repository.delete_group(name)
+        if isinstance(response, DeleteGroupMutationFailure):
+            raise DeleteGroupError("delete group", response.code, response.message)
+
+        return response
+
+    def iter_groups(self, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[GroupSchema]:
+        return self.groups_repository.iter_groups(page_size)
+
+
+def _current_task() -> Optional["asyncio.Task[Any]"]:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+def _seconds_until(moment: datetime) -> float:
+    return (moment - datetime.now(timezone.utc)).total_seconds()
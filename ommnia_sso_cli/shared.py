@@ -3,4 +3,8 @@ from rich.console import Console
 
 APP_NAME: str = "ommnia_sso_cli"
 
-console = Console()
\ No newline at end of file
+# The environment variable selecting the profile, like the `--profile` option.
+PROFILE_ENV: str = "OMMNIA_SSO_PROFILE"
+
+console = Console()
+err_console = Console(stderr=True)
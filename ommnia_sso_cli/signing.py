@@ -0,0 +1,121 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Optional, Tuple
+import asyncio
+import os
+from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from ommnia_sso_tokens import LoginSessionCreationToken, TokenSigner
+
+from ommnia_sso_cli.timings import span
+
+
+class PrivateKeyCache:
+    """
+    The private key loaded from its PEM file, which is only read and parsed again when its
+    modification time or size changed.
+
+    The signer is given the loaded key, which PyJWT signs with as it is, instead of the PEM text
+    it would parse on every signature.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._key: Optional[Tuple[Tuple[int, int], PrivateKeyTypes]] = None
+
+    @property
+    def key(self) -> PrivateKeyTypes:
+        stat: os.stat_result = os.stat(self.path)
+        stamp: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        if self._key is None or self._key[0] != stamp:
+            with span("key read"), open(self.path, "rb") as file:
+                self._key = (stamp, load_pem_private_key(file.read(), password=None))
+
+        return self._key[1]
+
+
+def _sign_with_key(
+    signer: TokenSigner, token_value: LoginSessionCreationToken, private_key: PrivateKeyTypes
+) -> Awaitable[str]:
+    """
+    Sign the token with the loaded key. `TokenSigner.sign` declares the PEM text, but hands the
+    key on to PyJWT, which takes loaded keys as well (see `tests/test_signing.py`).
+    """
+
+    return signer.sign(token_value, private_key)  # type: ignore[arg-type]
+
+
+# The signer, loop and private key of a signing worker process, created once per process.
+_worker_signer: Optional[TokenSigner] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_private_key: Optional[PrivateKeyCache] = None
+
+
+def _init_worker(private_key_path: str) -> None:
+    global _worker_signer, _worker_loop, _worker_private_key
+
+    _worker_signer = TokenSigner()
+    _worker_loop = asyncio.new_event_loop()
+    _worker_private_key = PrivateKeyCache(private_key_path)
+
+    # Load the key up front, instead of with the first token.
+    _worker_private_key.key
+
+
+def _sign_in_worker(token_value: LoginSessionCreationToken) -> str:
+    assert (
+        _worker_signer is not None and _worker_loop is not None and _worker_private_key is not None
+    ), "The worker should have been initialized"
+
+    return _worker_loop.run_until_complete(
+        _sign_with_key(_worker_signer, token_value, _worker_private_key.key)
+    )
+
+
+@dataclass
+class SigningService:
+    """
+    Signs tokens with the client private key, reusing one signer and only loading the key file
+    again when it changed on disk.
+
+    With `processes` set, the signing is spread over a pool of worker processes instead of
+    blocking the event loop, for signing many tokens at once. Each worker loads the key itself
+    when it starts, so only the tokens are sent to them.
+    """
+
+    private_key_path: str
+    processes: int = 0
+
+    def __post_init__(self) -> None:
+        self._signer: TokenSigner = TokenSigner()
+        self._private_key: PrivateKeyCache = PrivateKeyCache(self.private_key_path)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def private_key(self) -> PrivateKeyTypes:
+        return self._private_key.key
+
+    async def sign(self, token_value: LoginSessionCreationToken) -> str:
+        with span("signing"):
+            return await self._sign(token_value)
+
+    async def _sign(self, token_value: LoginSessionCreationToken) -> str:
+        if self.processes <= 0:
+            return await _sign_with_key(self._signer, token_value, self.private_key)
+
+        # Start the worker processes the first time they are needed.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=_init_worker,
+                initargs=(self.private_key_path,),
+            )
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, _sign_in_worker, token_value
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -1,25 +1,120 @@
-from dataclasses import dataclass
-from typing import ClassVar, Optional, Type
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Coroutine, Dict, Optional, Type, TypeVar
+import asyncio
+import threading
 
-from gql import Client
+from ommnia_sso_cli.data.client import ReauthenticatingClient
+from ommnia_sso_cli.data.models import DEFAULT_PROFILE, ConfigModel
+from ommnia_sso_cli.sdk import SSOAdminClient
+from ommnia_sso_cli.signing import SigningService
 
-from ommnia_sso_cli.data.models import ConfigModel
+T = TypeVar("T")
+
+# The profile (deployment) the commands run against, set by the main command, and per thread
+# when a command runs against several profiles at once.
+PROFILE: ContextVar[str] = ContextVar("profile", default=DEFAULT_PROFILE)
 
 
 @dataclass
 class State:
-    _instance: ClassVar[Optional["State"]] = None
+    """
+    The SSO admin client of a profile, with the event loop the synchronous commands run its
+    coroutines on.
+    """
+
+    _instances: ClassVar[Dict[str, "State"]] = {}
+    _factory: ClassVar[Optional[Callable[[str], "State"]]] = None
+
+    admin: SSOAdminClient
+    profile: str = DEFAULT_PROFILE
+    runner: asyncio.Runner = field(default_factory=asyncio.Runner)
+    loop_thread: Optional[threading.Thread] = None
 
-    client: Client
-    config: ConfigModel
+    @classmethod
+    def instantiate(
+        cls: Type["State"], admin: SSOAdminClient, profile: str = DEFAULT_PROFILE
+    ) -> "State":
+        assert (
+            profile not in cls._instances
+        ), "The instance should not be instantiated more than once per profile"
+        cls._instances[profile] = State(admin, profile)
+        return cls._instances[profile]
 
     @classmethod
-    def instantiate(cls: Type["State"], client: Client, config: ConfigModel) -> "State":
-        assert cls._instance is None, "The instance should not be instantiated more than once"
-        cls._instance = State(client, config)
-        return cls._instance
+    def defer(cls: Type["State"], factory: Callable[[str], "State"]) -> None:
+        """
+        Instantiate the state of a profile with the factory once it is first used, so that the
+        commands which do not need it (like the ones answering from the local cache) skip the
+        login.
+        """
+
+        cls._factory = factory
 
     @classmethod
     def instance(cls: Type["State"]) -> "State":
-        assert cls._instance is not None, "The instance has not been instantiated"
-        return cls._instance
+        """
+        Get the state of the current profile.
+        """
+
+        profile: str = PROFILE.get()
+        if profile not in cls._instances and cls._factory is not None:
+            cls._factory(profile)
+
+        assert profile in cls._instances, "The instance has not been instantiated"
+        return cls._instances[profile]
+
+    @property
+    def client(self) -> ReauthenticatingClient:
+        return self.admin.client
+
+    @property
+    def config(self) -> ConfigModel:
+        return self.admin.config
+
+    @property
+    def signing_service(self) -> SigningService:
+        return self.admin.signing_service
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Run the coroutine on the event loop shared by the whole invocation.
+        """
+
+        # Once the loop runs in the background, any thread may submit coroutines to it.
+        if self.loop_thread is not None:
+            return asyncio.run_coroutine_threadsafe(coroutine, self.runner.get_loop()).result()
+
+        return self.runner.run(coroutine)
+
+    def run_in_background(self) -> None:
+        """
+        Keep the event loop running in a background thread, so that commands run from several
+        threads at once share it (and the client connection).
+        """
+
+        assert self.loop_thread is None, "The loop is already running in the background"
+        self.loop_thread = threading.Thread(target=self.runner.get_loop().run_forever, daemon=True)
+        self.loop_thread.start()
+
+    def connect(self) -> None:
+        """
+        Open the client connection used by all the following requests.
+        """
+
+        self.run(self.admin.connect())
+
+    def close(self) -> None:
+        """
+        Close the client (its connection and signing workers) and the event loop.
+        """
+
+        self.run(self.admin.close())
+
+        # Stop the background loop, so the runner can close it.
+        if self.loop_thread is not None:
+            self.runner.get_loop().call_soon_threadsafe(self.runner.get_loop().stop)
+            self.loop_thread.join()
+            self.loop_thread = None
+
+        self.runner.close()
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, TextIO
+
+
+class ContextStream:
+    """
+    Stands in for `sys.stdin`/`sys.stdout`/`sys.stderr`, forwarding to the stream set for the
+    current context, or to the original stream.
+
+    A context variable (instead of a thread local) is used since the commands run their
+    coroutines on the shared loop thread, which runs them in the context of the caller.
+    """
+
+    def __init__(self, name: str, default: TextIO) -> None:
+        self._default: TextIO = default
+        self._stream: ContextVar[Optional[TextIO]] = ContextVar(name, default=None)
+
+    @property
+    def current(self) -> TextIO:
+        return self._stream.get() or self._default
+
+    @contextmanager
+    def redirect(self, stream: TextIO) -> Iterator[None]:
+        token = self._stream.set(stream)
+        try:
+            yield
+        finally:
+            self._stream.reset(token)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.current, name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.current)
@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Type
+import json
+import os
+import time
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    end: float
+    track: int
+
+
+@dataclass
+class Timings:
+    """
+    Records how long each phase of a run takes, as spans on the tracks (asyncio tasks or threads)
+    that ran them.
+
+    Nothing is recorded until it is enabled, so the spans cost next to nothing otherwise.
+    """
+
+    enabled: bool = False
+    origin: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)
+    tracks: Dict[int, int] = field(default_factory=dict)
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.origin = time.perf_counter()
+
+    def track(self) -> int:
+        # Imported here, since the timings are imported to start the CLI and rarely enabled.
+        import asyncio
+        import threading
+
+        # Spans of concurrent tasks overlap, so each task (or thread outside of tasks) gets its
+        # own track, numbered in order of appearance.
+        try:
+            key: int = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        return self.tracks.setdefault(key, len(self.tracks) + 1)
+
+    def record(self, name: str, start: float, end: float) -> None:
+        if self.enabled:
+            self.spans.append(Span(name=name, start=start, end=end, track=self.track()))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate the spans per phase, in order of first appearance.
+        """
+
+        phases: Dict[str, List[float]] = {}
+        for span in self.spans:
+            phases.setdefault(span.name, []).append(span.end - span.start)
+
+        return [
+            {
+                "phase": name,
+                "count": len(durations),
+                "total": sum(durations),
+                "mean": sum(durations) / len(durations),
+                "max": max(durations),
+            }
+            for name, durations in phases.items()
+        ]
+
+    def print_summary(self) -> None:
+        from rich.table import Table
+        from ommnia_sso_cli.shared import err_console
+
+        table = Table("Phase", "Count", "Total (ms)", "Mean (ms)", "Max (ms)", title="Timings")
+        for row in self.summary():
+            table.add_row(
+                row["phase"],
+                str(row["count"]),
+                f"{row['total'] * 1000:.1f}",
+                f"{row['mean'] * 1000:.1f}",
+                f"{row['max'] * 1000:.1f}",
+            )
+        table.add_row("wall", "1", f"{(time.perf_counter() - self.origin) * 1000:.1f}", "", "")
+        err_console.print(table)
+
+    def write_trace(self, trace_file_path: Path) -> None:
+        """
+        Write the spans in the Chrome trace event format, viewable in chrome://tracing or
+        Perfetto.
+        """
+
+        pid: int = os.getpid()
+        trace_events: List[Dict[str, Any]] = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": (span.start - self.origin) * 1e6,
+                "dur": (span.end - span.start) * 1e6,
+                "pid": pid,
+                "tid": span.track,
+            }
+            for span in self.spans
+        ]
+        with trace_file_path.open("w") as trace_file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, trace_file)
+
+    def report(self, summary: bool, trace_file_path: Optional[Path]) -> None:
+        if summary:
+            self.print_summary()
+        if trace_file_path is not None:
+            self.write_trace(trace_file_path)
+
+
+# The timings of the current run.
+TIMINGS: Timings = Timings()
+
+
+class _SpanContext:
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.start: float = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        TIMINGS.record(self.name, self.start, time.perf_counter())
+
+
+class _NoSpanContext:
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+_NO_SPAN: _NoSpanContext = _NoSpanContext()
+
+
+def span(name: str) -> Any:
+    """
+    Time the enclosed block as a span of the given phase, if the timings are enabled.
+    """
+
+    return _SpanContext(name) if TIMINGS.enabled else _NO_SPAN
@@ -0,0 +1,29 @@
+from typing import List
+import asyncio
+
+import pytest
+
+from ommnia_sso_cli.bulk import for_each
+
+
+def test_for_each_handles_every_item() -> None:
+    handled: List[int] = []
+
+    async def handle(item: int) -> None:
+        await asyncio.sleep(0)
+        handled.append(item)
+
+    asyncio.run(for_each(range(10), handle, concurrency=3))
+    assert sorted(handled) == list(range(10))
+
+
+def test_for_each_raises_the_failure_of_a_handler() -> None:
+    async def handle(item: int) -> None:
+        raise ValueError(f"Item {item} failed")
+
+    # Once every worker has failed, nothing drains the queue: the feeding used to wait forever.
+    async def run() -> None:
+        await asyncio.wait_for(for_each(range(100), handle, concurrency=2), timeout=5)
+
+    with pytest.raises(ValueError, match="Item 0 failed"):
+        asyncio.run(run())
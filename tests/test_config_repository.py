@@ -0,0 +1,66 @@
+from pathlib import Path
+from typing import Optional
+import os
+
+import pytest
+
+from ommnia_sso_cli.data.models import ConfigModel
+from ommnia_sso_cli.data.repositories.config_repository import ConfigRepository
+
+CONFIG: str = """
+app_name = "admin"
+graphql_endpoint_url = "https://sso.example.com/graphql"
+client_private_key_path = "client.pem"
+server_public_key_path = "server.pem"
+
+[auth]
+email = "admin@example.com"
+password = "secret"
+"""
+
+
+@pytest.fixture
+def config_repository(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ConfigRepository:
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    config_repository: ConfigRepository = ConfigRepository("ommnia_sso_cli")
+    config_repository.app_path.mkdir(parents=True)
+    config_repository.config_file_path.write_text(CONFIG)
+    return config_repository
+
+
+def test_edits_while_parsing_are_not_hidden_by_the_cache(
+    config_repository: ConfigRepository,
+) -> None:
+    path: Path = config_repository.config_file_path
+    stat: os.stat_result = path.stat()
+
+    # The file is edited right after it was parsed.
+    original_save_cache = config_repository._save_cache
+
+    def edit_then_save_cache(config: ConfigModel, stat: os.stat_result) -> None:
+        path.write_text(CONFIG.replace("admin@example.com", "other@example.com"))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        original_save_cache(config, stat)
+
+    config_repository._save_cache = edit_then_save_cache  # type: ignore[method-assign]
+    config: Optional[ConfigModel] = config_repository.load()
+    assert config is not None and config.auth.email == "admin@example.com"
+    assert path.stat().st_mtime_ns != stat.st_mtime_ns
+
+    # The next load sees the edit instead of the cached config.
+    del config_repository._save_cache
+    config = config_repository.load()
+    assert config is not None and config.auth.email == "other@example.com"
+
+
+def test_failing_to_cache_does_not_fail_a_save(
+    config_repository: ConfigRepository, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config: Optional[ConfigModel] = config_repository.load()
+    assert config is not None
+
+    def fail(*args: object) -> None:
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(config_repository, "_save_cache", fail)
+    config_repository.save(config)
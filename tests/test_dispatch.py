@@ -0,0 +1,37 @@
+from pathlib import Path
+from typing import Iterator
+
+import click
+import pytest
+
+from ommnia_sso_cli.dispatch import CALLER_DIRECTORY, _CallerPath
+
+
+@pytest.fixture
+def caller_directory(tmp_path: Path) -> Iterator[Path]:
+    token = CALLER_DIRECTORY.set(str(tmp_path))
+    yield tmp_path
+    CALLER_DIRECTORY.reset(token)
+
+
+def test_relative_paths_are_taken_relative_to_the_caller(caller_directory: Path) -> None:
+    path_type = _CallerPath(click.Path(path_type=Path))
+
+    assert path_type.convert("report.jsonl", None, None) == caller_directory / "report.jsonl"
+    assert path_type.convert("/etc/hosts", None, None) == Path("/etc/hosts")
+
+    # The standard streams are not paths.
+    assert _CallerPath(click.Path(allow_dash=True)).convert("-", None, None) == "-"
+
+
+def test_files_are_opened_relative_to_the_caller(caller_directory: Path) -> None:
+    file_type = _CallerPath(click.File("w", lazy=False))
+
+    with file_type.convert("report.jsonl", None, None) as file:
+        file.write("{}\n")
+
+    assert (caller_directory / "report.jsonl").read_text() == "{}\n"
+
+
+def test_paths_are_kept_without_a_caller() -> None:
+    assert _CallerPath(click.Path()).convert("report.jsonl", None, None) == "report.jsonl"
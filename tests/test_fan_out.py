@@ -0,0 +1,58 @@
+import io
+import os
+
+import pytest
+
+from ommnia_sso_cli.fan_out import ProfileRun, _Aggregator, _ProfileStdin, _SharedStdin
+from ommnia_sso_cli.output import OutputFormat
+
+
+def test_profiles_read_the_standard_input_with_their_own_handles() -> None:
+    stdin = io.StringIO("email\r\na@example.com\n")
+    stdin.name = "<stdin>"  # type: ignore[attr-defined]
+    shared: _SharedStdin = _SharedStdin(stdin)
+
+    first, second = _ProfileStdin(shared), _ProfileStdin(shared)
+    assert first.readline() == "email\r\n"
+    assert list(second) == ["email\r\n", "a@example.com\n"]
+    assert list(first) == ["a@example.com\n"]
+    assert first.name == "<stdin>"
+
+    # The copy is removed once the runs are done.
+    path: str = first.stream.name
+    shared.close()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize(
+    "output_format, written, expected",
+    [
+        (
+            OutputFormat.JSONL,
+            '{"uid": 1}\n{"uid"',
+            '{"profile": "eu", "uid": 1}\n',
+        ),
+        (
+            OutputFormat.CSV,
+            'uid,name\n1,"Jane\nDoe"\n2,"Jo',
+            'profile,uid,name\neu,1,"Jane\nDoe"\n',
+        ),
+        (OutputFormat.TABLE, "UID  Name\n1    Jane\n", ""),
+    ],
+)
+def test_records_are_written_as_soon_as_they_are_complete(
+    output_format: OutputFormat, written: str, expected: str
+) -> None:
+    stdout, stderr = io.StringIO(), io.StringIO()
+    aggregator: _Aggregator = _Aggregator(output_format, stdout, stderr)
+    run: ProfileRun = aggregator.run("eu")
+
+    # Only the complete records are written while the run goes on, tables wait for its end.
+    run.stdout.write(written)
+    run.stderr.write("Resuming job\n")
+    assert stdout.getvalue() == expected
+    assert stderr.getvalue() == "[eu] Resuming job\n"
+
+    aggregator.add(run)
+    assert stdout.getvalue().startswith(expected)
+    assert len(stdout.getvalue()) > len(expected)
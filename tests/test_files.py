@@ -0,0 +1,17 @@
+from pathlib import Path
+import stat
+
+from ommnia_sso_cli.data.files import write_private_file
+
+
+def test_private_files_are_replaced_atomically(tmp_path: Path) -> None:
+    path: Path = tmp_path / "credentials.json"
+    path.write_text("old")
+    path.chmod(0o644)
+
+    write_private_file(path, "new")
+
+    assert path.read_text() == "new"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    # No temporary file is left behind.
+    assert [file.name for file in tmp_path.iterdir()] == ["credentials.json"]
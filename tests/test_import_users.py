@@ -0,0 +1,22 @@
+import pytest
+
+from ommnia_sso_cli.data.repositories.users_repository import (
+    CreateUserMutationFailure,
+    CreateUserMutationFailureCode,
+)
+from ommnia_sso_cli.functions.import_users import _result
+
+EMAIL_ALREADY_USED: CreateUserMutationFailure = CreateUserMutationFailure(
+    code=CreateUserMutationFailureCode.EMAIL_ALREADY_USED, message="The email is already used"
+)
+
+
+@pytest.mark.parametrize("uncertain, status", [(True, "exists"), (False, "failed")])
+def test_used_emails_of_uncertain_rows_are_not_reported_as_created(
+    uncertain: bool, status: str
+) -> None:
+    # The email may belong to another account, so the row is not claimed as created.
+    result = _result(2, "jane@example.com", EMAIL_ALREADY_USED, uncertain)
+
+    assert result.status == status
+    assert result.code == "EMAIL_ALREADY_USED"
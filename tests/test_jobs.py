@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from ommnia_sso_cli.data.repositories.jobs_repository import Journal
+from ommnia_sso_cli.functions.import_users import ImportResult
+
+
+def _journal(path: Path) -> Journal:
+    return Journal(path, lambda result: str(result.line))
+
+
+def test_unknown_outcomes_are_retried_and_remembered(tmp_path: Path) -> None:
+    path: Path = tmp_path / "journal.jsonl"
+
+    journal: Journal = _journal(path)
+    journal.record(ImportResult(line=2, status="unknown", message="503"))
+    journal.record(ImportResult(line=3, status="created", uid=1))
+    journal.record(ImportResult(line=4, status="error", message="Timeout"))
+    journal.close()
+    assert journal.left == 2
+
+    journal = _journal(path)
+    assert journal.completed == {"3"}
+    assert journal.uncertain == {"2"}
+
+    # Once the outcome is known, the item is no longer uncertain.
+    journal.record(ImportResult(line=2, status="created"))
+    journal.close()
+    journal = _journal(path)
+    assert journal.completed == {"2", "3"}
+    assert not journal.uncertain
+    journal.close()
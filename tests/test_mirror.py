@@ -0,0 +1,47 @@
+from pathlib import Path
+import sqlite3
+import stat
+
+import pytest
+
+from ommnia_sso_cli.data.repositories.mirror_repository import MirrorRepository
+
+
+@pytest.fixture
+def mirror_repository(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> MirrorRepository:
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    return MirrorRepository("ommnia_sso_cli", "https://sso.example.com/graphql")
+
+
+def _mode(path: Path) -> int:
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_the_mirror_is_only_readable_by_the_owner(mirror_repository: MirrorRepository) -> None:
+    with mirror_repository.connect():
+        pass
+
+    assert _mode(mirror_repository.mirror_file_path) == 0o600
+
+
+def test_earlier_mirrors_are_restricted_and_lose_their_password_hashes(
+    mirror_repository: MirrorRepository,
+) -> None:
+    path: Path = mirror_repository.mirror_file_path
+    path.parent.mkdir(parents=True)
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE users (uid INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL,"
+            " status TEXT NOT NULL, password_hash TEXT NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO users VALUES (1, 'Jane', 'jane@example.com', 'ACTIVE', 'hash')"
+        )
+    connection.close()
+    path.chmod(0o644)
+
+    assert [user.email for user in mirror_repository.iter_users()] == ["jane@example.com"]
+    assert _mode(path) == 0o600
+    with mirror_repository.connect() as connection:
+        columns = [column[1] for column in connection.execute("PRAGMA table_info(users)")]
+    assert "password_hash" not in columns
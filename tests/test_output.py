@@ -0,0 +1,36 @@
+from contextvars import Token
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from ommnia_sso_cli.output import OUTPUT_FORMAT, Column, OutputFormat, Writer, writer
+
+
+class _Record(BaseModel):
+    uid: int
+    email: str
+
+
+COLUMNS: List[Column] = [Column("uid", "UID"), Column("email", "Email")]
+
+
+def test_writer_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        Writer(COLUMNS, many=True)  # type: ignore[abstract]
+
+
+@pytest.mark.parametrize("output_format", list(OutputFormat))
+def test_writers_count_the_records(
+    output_format: OutputFormat, capsys: pytest.CaptureFixture[str]
+) -> None:
+    token: Token[OutputFormat] = OUTPUT_FORMAT.set(output_format)
+    try:
+        with writer(COLUMNS, many=True) as records_writer:
+            for uid in range(3):
+                records_writer.write(_Record(uid=uid, email=f"user{uid}@example.com"))
+    finally:
+        OUTPUT_FORMAT.reset(token)
+
+    assert records_writer.count == 3
+    assert "user2@example.com" in capsys.readouterr().out
@@ -0,0 +1,67 @@
+from typing import Iterator
+
+import pytest
+
+from ommnia_sso_cli import permissions
+from ommnia_sso_cli.permissions import PermissionIndex, SSO_PERMISSIONS
+
+
+@pytest.fixture
+def index() -> Iterator[PermissionIndex]:
+    # Every test gets the warnings printed again.
+    permissions._warned.clear()
+    yield PermissionIndex(SSO_PERMISSIONS)
+
+
+def test_normalize_removes_duplicates_only(
+    index: PermissionIndex, capsys: pytest.CaptureFixture[str]
+) -> None:
+    assert index.normalize(
+        [
+            "ommnia_sso.users.read",
+            " ommnia_sso.users ",
+            "ommnia_sso.users.read",
+            "other_app.things.read",
+            "ommnia_sso.groups.create",
+        ]
+    ) == [
+        "ommnia_sso.users.read",
+        "ommnia_sso.users",
+        "other_app.things.read",
+        "ommnia_sso.groups.create",
+    ]
+
+    # The permissions that a broader one seems to grant are kept, with a warning.
+    assert (
+        "'ommnia_sso.users.read' is probably already granted by 'ommnia_sso.users'"
+        in capsys.readouterr().err
+    )
+
+
+@pytest.mark.parametrize("permission", ["ommnia_sso..read", "ommnia_sso.users read", ""])
+def test_malformed_permissions_are_rejected(index: PermissionIndex, permission: str) -> None:
+    with pytest.raises(ValueError, match="Malformed"):
+        index.normalize([permission])
+
+
+def test_typo_in_a_known_root_is_rejected(index: PermissionIndex) -> None:
+    with pytest.raises(ValueError, match="did you mean 'ommnia_sso'"):
+        index.normalize(["ommnia_ssoo.users.create"])
+
+
+@pytest.mark.parametrize(
+    "permission, warning",
+    [
+        ("ommnia_sso.users.read", None),
+        ("ommnia_sso.audit.read", "Unknown permission"),
+        ("other_app.things.read", "its root 'other_app' is unknown"),
+    ],
+)
+def test_permissions_that_cannot_be_vouched_for_are_warned_about(
+    index: PermissionIndex, permission: str, warning: str
+) -> None:
+    # They are kept, the server may know them.
+    assert index.normalize([permission]) == [permission]
+
+    message = index.warning(permission)
+    assert message is None if warning is None else warning in message
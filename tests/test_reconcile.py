@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, List
+import asyncio
+
+import pytest
+
+from ommnia_sso_cli.data.models import DEFAULT_PROFILE
+from ommnia_sso_cli.data.models.group import GroupSchema
+from ommnia_sso_cli.data.models.manifest import ManifestModel
+from ommnia_sso_cli.data.models.user import RegularUserSchema, UserStatus
+from ommnia_sso_cli.functions.reconcile import Change, plan
+from ommnia_sso_cli.state import State
+
+
+async def _iterate(items: List[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+@pytest.fixture(autouse=True)
+def deployment(monkeypatch: pytest.MonkeyPatch) -> None:
+    # One existing group and user, without their permissions (the API does not return them).
+    groups: List[GroupSchema] = [GroupSchema(uid=1, name="admins", description=None)]
+    users: List[RegularUserSchema] = [
+        RegularUserSchema(
+            uid=1,
+            name="Jane",
+            email="jane@example.com",
+            status=UserStatus.ACTIVE,
+            password_hash="hash",
+        )
+    ]
+    admin = SimpleNamespace(
+        groups_repository=SimpleNamespace(iter_groups=lambda page_size: _iterate(groups)),
+        users_repository=SimpleNamespace(iter_users=lambda page_size: _iterate(users)),
+    )
+    monkeypatch.setitem(State._instances, DEFAULT_PROFILE, SimpleNamespace(admin=admin))
+
+
+def test_permissions_that_cannot_be_compared_are_reported_as_unchecked() -> None:
+    manifest: ManifestModel = ManifestModel.model_validate(
+        {
+            "groups": [{"name": "admins", "permissions": ["ommnia_sso.users.read"]}],
+            "users": [
+                {
+                    "name": "Jane",
+                    "email": "jane@example.com",
+                    "password": "secret",
+                    "permissions": ["ommnia_sso.groups.read"],
+                }
+            ],
+        }
+    )
+
+    changes: List[Change] = asyncio.run(plan(manifest))
+
+    assert [(change.action, change.kind, change.key) for change in changes] == [
+        ("unchecked", "group", "admins"),
+        ("unchecked", "user", "jane@example.com"),
+    ]
+    assert changes[1].detail == "not compared: permissions"
+
+
+def test_matching_entries_without_permissions_have_no_changes() -> None:
+    manifest: ManifestModel = ManifestModel.model_validate(
+        {
+            "groups": [{"name": "admins"}],
+            "users": [{"name": "Jane", "email": "jane@example.com", "password": "secret"}],
+        }
+    )
+
+    assert asyncio.run(plan(manifest)) == []
@@ -0,0 +1,75 @@
+from typing import Any, Awaitable, Callable, List, Tuple
+import asyncio
+
+import pytest
+from gql.transport.exceptions import TransportServerError
+
+from ommnia_sso_cli.data.client import ReauthenticatingClient
+from ommnia_sso_cli.data.documents import document
+from ommnia_sso_cli.data.models import SchedulingConfigModel
+from ommnia_sso_cli.data.scheduler import Scheduler
+
+RETRIES: int = 3
+
+
+def _scheduler() -> Scheduler:
+    return Scheduler(SchedulingConfigModel(retries=RETRIES, backoff_base=0.0))
+
+
+def _applied_then(exception: BaseException) -> Tuple[List[int], Callable[[], Awaitable[Any]]]:
+    """
+    A request that the server applies every time, after which it fails with the exception.
+    """
+
+    applied: List[int] = [0]
+
+    async def request() -> Any:
+        applied[0] += 1
+        raise exception
+
+    return applied, request
+
+
+def test_mutations_that_timed_out_after_being_applied_are_not_retried() -> None:
+    applied, request = _applied_then(asyncio.TimeoutError())
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_scheduler().run(request, idempotent=False))
+
+    assert applied == [1]
+
+
+def test_queries_that_timed_out_are_retried() -> None:
+    applied, request = _applied_then(asyncio.TimeoutError())
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_scheduler().run(request))
+
+    assert applied == [RETRIES + 1]
+
+
+@pytest.mark.parametrize("status, attempts", [(503, RETRIES + 1), (429, RETRIES + 1), (502, 1)])
+def test_mutations_are_retried_when_the_server_turned_them_away(status: int, attempts: int) -> None:
+    applied, request = _applied_then(TransportServerError(f"{status}", status))
+
+    with pytest.raises(TransportServerError):
+        asyncio.run(_scheduler().run(request, idempotent=False))
+
+    assert applied == [attempts]
+
+
+def test_the_client_does_not_retry_mutations_after_a_timeout() -> None:
+    client: ReauthenticatingClient = ReauthenticatingClient(
+        transport=None, scheduler=_scheduler()
+    )
+    applied, request = _applied_then(asyncio.TimeoutError())
+    client._execute_decoded_once = lambda *args: request()  # type: ignore[method-assign]
+
+    for operation, attempts in [
+        ("mutation { deleteGroup(uid: 1) { typename: __typename } }", 1),
+        ("query { groups(first: 1) { pageInfo { hasNextPage } } }", RETRIES + 1),
+    ]:
+        applied[0] = 0
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(client.execute_decoded(document(operation), {}, None))  # type: ignore
+        assert applied == [attempts]
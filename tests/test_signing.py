@@ -0,0 +1,60 @@
+from pathlib import Path
+from typing import Any, Dict, List
+import asyncio
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from ommnia_sso_tokens import LoginSessionCreationToken, TokenSigner
+
+from ommnia_sso_cli.signing import SigningService
+
+TIME_CLAIMS: List[str] = ["iat", "nbf", "exp"]
+
+
+@pytest.fixture(scope="module")
+def private_key() -> rsa.RSAPrivateKey:
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _token_value() -> LoginSessionCreationToken:
+    return LoginSessionCreationToken(
+        app_name="ommnia_sso_cli",
+        target_app_name=None,
+        required_permissions=["sso:users:read"],
+        optional_permissions=[],
+        redirect_url="https://example.com",
+    )
+
+
+def _claims(token: str, private_key: rsa.RSAPrivateKey) -> Dict[str, Any]:
+    # Decoding checks the signature against the public key. The time claims may differ between
+    # two signatures, so they are left out.
+    claims: Dict[str, Any] = jwt.decode(
+        token,
+        private_key.public_key(),
+        algorithms=[jwt.get_unverified_header(token)["alg"]],
+        options={"verify_aud": False, "verify_exp": False, "verify_iat": False},
+    )
+    return {name: value for name, value in claims.items() if name not in TIME_CLAIMS}
+
+
+def test_the_loaded_key_signs_like_the_pem_text(
+    tmp_path: Path, private_key: rsa.RSAPrivateKey
+) -> None:
+    pem: bytes = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    path: Path = tmp_path / "client_private_key.pem"
+    path.write_bytes(pem)
+
+    # The service passes the signer the loaded key, where the signer declares the PEM text.
+    service: SigningService = SigningService(str(path))
+    with_key: str = asyncio.run(service.sign(_token_value()))
+    with_pem: str = asyncio.run(TokenSigner().sign(_token_value(), pem.decode()))
+
+    assert jwt.get_unverified_header(with_key) == jwt.get_unverified_header(with_pem)
+    assert _claims(with_key, private_key) == _claims(with_pem, private_key)
@@ -0,0 +1,53 @@
+from typing import List, Set
+import subprocess
+import sys
+
+import pytest
+
+from ommnia_sso_cli.main import MainGroup
+
+# The packages that only the commands talking to the server need, which must not be imported to
+# start the CLI, show its help or run `setup`.
+# asyncio is the standard library's, but still takes tens of milliseconds to import (threading
+# cannot be left out, since click imports it).
+HEAVY_PACKAGES: List[str] = ["gql", "aiohttp", "tomlkit", "ommnia_sso_tokens", "asyncio"]
+
+
+def _imported_packages(*args: str) -> Set[str]:
+    """
+    Run Python with `-X importtime` and get the top-level packages it imported.
+    """
+
+    process: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert process.returncode == 0, process.stderr
+
+    # The lines look like `import time:   self [us] |  cumulative | imported package`.
+    return {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in process.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["-c", "import ommnia_sso_cli.main"],
+        ["-m", "ommnia_sso_cli.main", "--help"],
+    ],
+    ids=["import", "help"],
+)
+def test_startup_skips_heavy_packages(args: List[str]) -> None:
+    imported: Set[str] = _imported_packages(*args)
+
+    assert "ommnia_sso_cli" in imported
+    assert not imported.intersection(HEAVY_PACKAGES)
+
+
+def test_help_describes_every_lazy_subcommand() -> None:
+    assert set(MainGroup.lazy_help) == set(MainGroup.lazy_subcommands)
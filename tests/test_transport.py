@@ -0,0 +1,142 @@
+from typing import Iterator, Tuple
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.server import BackgroundServer, StandInServer
+from ommnia_sso_cli.data import transport
+from ommnia_sso_cli.data.documents import document
+from ommnia_sso_cli.data.models import ConnectionConfigModel, TransportKind
+from ommnia_sso_cli.data.transport import (
+    PersistedQueryAnswer,
+    RawTransport,
+    _persisted_query_answer,
+    create_transport,
+)
+
+GROUPS_QUERY: str = """
+    query Groups($first: Int!) {
+        groups(first: $first) {
+            edges { cursor }
+            pageInfo { hasNextPage }
+        }
+    }
+"""
+
+
+def _errors(code: str, message: str) -> bytes:
+    return json.dumps({"errors": [{"message": message, "extensions": {"code": code}}]}).encode()
+
+
+@pytest.fixture(autouse=True)
+def forget_unsupported_endpoints() -> Iterator[None]:
+    transport._persisted_queries_unsupported.clear()
+    yield
+    transport._persisted_queries_unsupported.clear()
+
+
+@pytest.mark.parametrize(
+    "status, body, answer",
+    [
+        (200, b'{"data": {"groups": null}}', None),
+        (
+            200,
+            _errors("PERSISTED_QUERY_NOT_FOUND", "PersistedQueryNotFound"),
+            PersistedQueryAnswer.NOT_FOUND,
+        ),
+        (
+            200,
+            _errors("PERSISTED_QUERY_NOT_SUPPORTED", "PersistedQueryNotSupported"),
+            PersistedQueryAnswer.NOT_SUPPORTED,
+        ),
+        (
+            400,
+            _errors("PERSISTED_QUERY_NOT_SUPPORTED", "PersistedQueryNotSupported"),
+            PersistedQueryAnswer.NOT_SUPPORTED,
+        ),
+        # The failures of the operation itself, even as a bad request, keep persisted queries.
+        (400, b'{"errors": [{"message": "Must provide a query"}]}', None),
+        (400, _errors("BAD_USER_INPUT", "Variable '$first' got invalid value"), None),
+        # Failures that say nothing about persisted queries are handled (and retried) as usual.
+        (500, b"Internal Server Error", None),
+        (503, b"Service Unavailable", None),
+        (429, b"Too Many Requests", None),
+        (401, b"Unauthorized", None),
+    ],
+)
+def test_persisted_query_answer(status: int, body: bytes, answer: PersistedQueryAnswer) -> None:
+    # The answer only depends on the body, whatever the status.
+    assert _persisted_query_answer(body) == answer
+
+
+async def _query_twice(
+    url: str, connection: ConnectionConfigModel = ConnectionConfigModel()
+) -> Tuple[int, int]:
+    client = create_transport(url, connection)
+    assert isinstance(client, RawTransport)
+    await client.connect()
+    try:
+        statuses = [
+            (await client.execute_raw(document(GROUPS_QUERY), {"first": 10}))[0] for _ in range(2)
+        ]
+    finally:
+        await client.close()
+
+    return statuses[0], statuses[1]
+
+
+def test_persisted_queries_are_registered_then_sent_as_hashes() -> None:
+    server: StandInServer = StandInServer()
+    with BackgroundServer(server) as background:
+        assert asyncio.run(_query_twice(background.url)) == (200, 200)
+
+    # The first request asked for the text, the second one was found by its hash.
+    assert server.stats["persisted_query_misses"] == 1
+    assert server.stats["persisted_query_hits"] == 1
+    assert server.stats["requests"] == 3
+    assert not transport._persisted_queries_unsupported
+
+
+def test_servers_without_persisted_queries_get_the_text() -> None:
+    server: StandInServer = StandInServer(persisted_queries=False)
+    with BackgroundServer(server) as background:
+        assert asyncio.run(_query_twice(background.url)) == (200, 200)
+
+        # Only the first request was sent as a hash.
+        assert server.stats["requests"] == 3
+        assert transport._persisted_queries_unsupported == {background.url}
+
+
+def test_transient_failures_keep_persisted_queries() -> None:
+    server: StandInServer = StandInServer(failure_rate=1.0)
+    with BackgroundServer(server) as background:
+        assert asyncio.run(_query_twice(background.url)) == (503, 503)
+
+    assert not transport._persisted_queries_unsupported
+
+
+def test_http2_transport_sends_persisted_and_compressed_queries() -> None:
+    pytest.importorskip("h2", reason="The http2 extra is not installed")
+
+    # Compress every request, over plain HTTP the requests are sent with HTTP/1.1.
+    server: StandInServer = StandInServer()
+    connection: ConnectionConfigModel = ConnectionConfigModel(
+        transport=TransportKind.HTTP2, compression_threshold=1
+    )
+    with BackgroundServer(server) as background:
+        assert asyncio.run(_query_twice(background.url, connection)) == (200, 200)
+
+    assert server.stats["persisted_query_misses"] == 1
+    assert server.stats["persisted_query_hits"] == 1
+    assert server.stats["requests"] == 3
+
+
+def test_transports_without_send_cannot_be_created() -> None:
+    class IncompleteTransport(transport.RawTransport):
+        @property
+        def connected(self) -> bool:
+            return True
+
+    with pytest.raises(TypeError, match="_send"):
+        IncompleteTransport()  # type: ignore[abstract]